@@ -0,0 +1,126 @@
+# analise_desempenho.py
+"""
+Modo de análise de desempenho (--profile): executa as etapas da geração da fatura
+sob cProfile e/ou tracemalloc e grava, ao lado do PDF, um relatório por etapa com
+as funções de maior tempo acumulado e as maiores alocações de memória.
+"""
+
+import io
+import time
+import tracemalloc
+from contextlib import contextmanager, nullcontext
+from datetime import datetime
+
+# "cpu" (cProfile), "memoria" (tracemalloc) ou "completo" (os dois; o tracemalloc deixa
+# a execução bem mais lenta e distorce os tempos do cProfile)
+MODOS_ANALISE = ("cpu", "memoria", "completo")
+# Linhas de funções e de alocações listadas por etapa no relatório
+LINHAS_RELATORIO = 25
+
+
+def criar_analise(modo=None):
+    """Analisador do modo informado; sem modo, o analisador vazio."""
+    if not modo:
+        return ANALISE_DESLIGADA
+    return AnaliseDesempenho(modo)
+
+
+class AnaliseDesempenho:
+
+    habilitada = True
+
+    def __init__(self, modo="cpu", linhas=LINHAS_RELATORIO):
+        if modo not in MODOS_ANALISE:
+            raise ValueError(f"Modo de análise inválido: {modo}. Use um de {', '.join(MODOS_ANALISE)}.")
+        self.modo = modo
+        self.cpu = modo in ("cpu", "completo")
+        self.memoria = modo in ("memoria", "completo")
+        self.linhas = linhas
+        self.etapas = []
+
+    @contextmanager
+    def etapa(self, nome):
+        """Mede a etapa: tempo, perfil de CPU e pico/maiores alocações de memória."""
+        import cProfile
+        
+        perfilador = cProfile.Profile() if self.cpu else None
+        iniciou_tracemalloc = False
+        inicial = None
+        if self.memoria:
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+                iniciou_tracemalloc = True
+            tracemalloc.reset_peak()
+            memoria_inicial = tracemalloc.get_traced_memory()[0]
+            inicial = tracemalloc.take_snapshot()
+
+        inicio = time.perf_counter()
+        if perfilador:
+            perfilador.enable()
+        try:
+            yield
+        finally:
+            if perfilador:
+                perfilador.disable()
+            resultado = {'nome': nome, 'segundos': time.perf_counter() - inicio, 'perfilador': perfilador}
+            if self.memoria:
+                resultado['pico_bytes'] = tracemalloc.get_traced_memory()[1] - memoria_inicial
+                # Crescimento por linha de código durante a etapa (o que ficou alocado ao final)
+                resultado['alocacoes'] = tracemalloc.take_snapshot().compare_to(inicial, 'lineno')[:self.linhas]
+                if iniciou_tracemalloc:
+                    tracemalloc.stop()
+            self.etapas.append(resultado)
+
+    def gravar(self, base):
+        """
+        Grava `<base>.desempenho.txt` e, no modo de CPU, um `<base>.cpu-<etapa>.prof` por etapa
+        (abre no snakeviz ou em `python -m pstats`). Devolve os arquivos gravados.
+        """
+        import pstats
+        
+        if not self.etapas:
+            return []
+
+        arquivos = []
+        relatorio = [f"Análise de desempenho ({self.modo}) - {datetime.now().isoformat(timespec='seconds')}"]
+        for etapa in self.etapas:
+            relatorio += ["", f"=== Etapa: {etapa['nome']} ===", f"Tempo: {etapa['segundos']:.3f} s"]
+            if 'pico_bytes' in etapa:
+                relatorio.append(f"Pico de memória acima do início da etapa: {etapa['pico_bytes'] / 2**20:.2f} MB")
+
+            perfilador = etapa['perfilador']
+            if perfilador:
+                arquivo_prof = f"{base}.cpu-{etapa['nome']}.prof"
+                perfilador.dump_stats(arquivo_prof)
+                arquivos.append(arquivo_prof)
+
+                saida = io.StringIO()
+                estatisticas = pstats.Stats(perfilador, stream=saida)
+                estatisticas.strip_dirs().sort_stats(pstats.SortKey.CUMULATIVE).print_stats(self.linhas)
+                relatorio += ["", "Funções com maior tempo acumulado:", saida.getvalue().strip()]
+
+            if 'alocacoes' in etapa:
+                relatorio += ["", "Maiores alocações da etapa (memória ainda em uso ao final):"]
+                relatorio += [f"  {alocacao}" for alocacao in etapa['alocacoes']]
+
+        arquivo_relatorio = f"{base}.desempenho.txt"
+        with open(arquivo_relatorio, 'w', encoding='utf-8') as arquivo:
+            arquivo.write("\n".join(relatorio) + "\n")
+        arquivos.insert(0, arquivo_relatorio)
+        return arquivos
+
+
+class AnaliseDesligada:
+    """Analisador usado fora do modo --profile: as etapas não são medidas."""
+
+    habilitada = False
+    _CONTEXTO_VAZIO = nullcontext()
+
+    def etapa(self, nome):
+        return self._CONTEXTO_VAZIO
+
+    def gravar(self, base):
+        return []
+
+
+ANALISE_DESLIGADA = AnaliseDesligada()
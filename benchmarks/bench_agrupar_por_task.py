@@ -0,0 +1,81 @@
+# bench_agrupar_por_task.py
+"""
+Benchmark de ProcessarDados._agrupar_por_task.
+Compara o agrupamento em uma única passada com a versão anterior (uma máscara por task).
+
+Uso:
+    python benchmarks/bench_agrupar_por_task.py
+    python benchmarks/bench_agrupar_por_task.py --registros 1000 100000 --tasks 10 500
+"""
+
+import argparse
+import contextlib
+import io
+import os
+import sys
+
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from dados_sinteticos import gerar_registros  # noqa: E402
+from medicao import medir  # noqa: E402
+from processar_dados import ProcessarDados  # noqa: E402
+
+INICIO, FIM = "01/08/2025", "31/08/2025"
+
+
+def gerar_registros_normalizados(quantidade, quantidade_tasks):
+    # Registros sintéticos da API já normalizados, como chegam ao agrupamento
+    registros = gerar_registros(
+        quantidade, quantidade_tasks=quantidade_tasks, quantidade_descricoes=max(20, quantidade_tasks * 4)
+    )
+    with contextlib.redirect_stdout(io.StringIO()):
+        return ProcessarDados(backend="pandas").normalizar_registros(registros, INICIO, FIM).para_dataframe()
+
+
+def agrupar_legado(registros_processados):
+    # Implementação anterior, mantida aqui apenas como referência de desempenho
+    df = pd.DataFrame(registros_processados)
+    df['task_group'] = df['task_name'].fillna('').astype(str).str.strip()
+    df.loc[df['task_group'] == '', 'task_group'] = 'Sem task'
+
+    resultados = {}
+    for task in sorted(df['task_group'].unique()):
+        task_df = df[df['task_group'] == task]
+        resultados[task] = (
+            task_df.groupby('description')['duration']
+            .sum()
+            .reset_index()
+            .sort_values('duration', ascending=False)
+        )
+    return resultados
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--registros", type=int, nargs="+", default=[1_000, 10_000, 100_000, 1_000_000])
+    parser.add_argument("--tasks", type=int, nargs="+", default=[10, 100, 1_000, 5_000])
+    parser.add_argument("--repeticoes", type=int, default=3)
+    parser.add_argument("--sem-legado", action="store_true", help="não mede a implementação anterior")
+    args = parser.parse_args(argv)
+
+    processador = ProcessarDados()
+    print(f"{'registros':>10} {'tasks':>6} {'passada única (s)':>18} {'legado (s)':>12} {'ganho':>7}")
+
+    for quantidade in args.registros:
+        for quantidade_tasks in args.tasks:
+            registros = gerar_registros_normalizados(quantidade, quantidade_tasks)
+            atual = medir(
+                lambda: processador._agrupar_por_task(registros, INICIO, FIM),
+                args.repeticoes,
+            )
+            if args.sem_legado:
+                print(f"{quantidade:>10} {quantidade_tasks:>6} {atual:>18.4f} {'-':>12} {'-':>7}")
+                continue
+            legado = medir(lambda: agrupar_legado(registros), args.repeticoes)
+            print(f"{quantidade:>10} {quantidade_tasks:>6} {atual:>18.4f} {legado:>12.4f} {legado / atual:>6.1f}x")
+
+
+if __name__ == "__main__":
+    main()
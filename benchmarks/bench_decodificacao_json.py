@@ -0,0 +1,72 @@
+# bench_decodificacao_json.py
+"""
+Benchmark da decodificação das páginas da consulta `records`: módulo json x orjson,
+com e sem a redução dos registros aos campos usados na fatura. Mede o tempo para
+decodificar todas as páginas e a memória ocupada pelos registros mantidos
+(como no cliente assíncrono e no cache de respostas, que guardam o período todo).
+
+Uso:
+    python benchmarks/bench_decodificacao_json.py
+    python benchmarks/bench_decodificacao_json.py --registros 100000 --campos-extras 40
+"""
+
+import argparse
+import json
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from dados_sinteticos import gerar_registros  # noqa: E402
+from medicao import medir, medir_memoria  # noqa: E402
+import decodificacao_json  # noqa: E402
+
+
+def gerar_paginas(quantidade, tamanho_pagina, campos_extras):
+    registros = gerar_registros(quantidade, campos_extras=campos_extras)
+    return [
+        json.dumps({'data': {'records': {'count': quantidade, 'data': registros[i:i + tamanho_pagina]}}}).encode()
+        for i in range(0, quantidade, tamanho_pagina)
+    ]
+
+
+def decodificar(paginas, carregar, enxugar):
+    registros = []
+    for pagina in paginas:
+        dados = carregar(pagina)['data']['records']['data']
+        registros.extend(decodificacao_json.enxugar_registros(dados) if enxugar else dados)
+    return registros
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--registros", type=int, nargs="+", default=[10_000, 100_000])
+    parser.add_argument("--tamanho-pagina", type=int, default=500)
+    parser.add_argument("--campos-extras", type=int, default=20,
+                        help="campos de dynamicFields não lidos pela fatura, por registro (padrão: 20)")
+    parser.add_argument("--repeticoes", type=int, default=3)
+    args = parser.parse_args(argv)
+
+    decodificadores = {'json': json.loads}
+    try:
+        import orjson
+        decodificadores['orjson'] = orjson.loads
+    except ImportError:
+        print("orjson não instalado: medindo só o módulo json (pip install orjson)")
+
+    # enxugar_registros respeita API_ENXUGAR_REGISTROS; aqui as duas variantes são medidas
+    decodificacao_json.API_ENXUGAR_REGISTROS = True
+
+    print(f"{'registros':>10} {'variante':<18} {'tempo (s)':>10} {'mantida (MB)':>13} {'pico (MB)':>10}")
+    for quantidade in args.registros:
+        paginas = gerar_paginas(quantidade, args.tamanho_pagina, args.campos_extras)
+        for nome, carregar in decodificadores.items():
+            for enxugar in (False, True):
+                tempo = medir(lambda: decodificar(paginas, carregar, enxugar), args.repeticoes)
+                _, mantida, pico = medir_memoria(lambda: decodificar(paginas, carregar, enxugar))
+                variante = f"{nome}{' + enxuto' if enxugar else ''}"
+                print(f"{quantidade:>10} {variante:<18} {tempo:>10.4f} {mantida:>13.1f} {pico:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+# bench_gerar_pdf.py
+"""
+Benchmark da geração da tabela de serviços e do PDF completo (GerarPDF).
+Compara a tabela de serviços atual (linhas montadas por colunas e uma Table por
+página) com a versão anterior (iterrows, um Paragraph por descrição e uma Table
+única dividida a cada página), renderizando só essa seção.
+
+Uso:
+    python benchmarks/bench_gerar_pdf.py
+    python benchmarks/bench_gerar_pdf.py --linhas 1000 10000 --sem-pdf
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pandas as pd  # noqa: E402
+from reportlab.platypus import Paragraph, SimpleDocTemplate, Table  # noqa: E402
+from dados_sinteticos import gerar_resultados  # noqa: E402
+from gerar_PDF import GerarPDF  # noqa: E402
+from medicao import medir  # noqa: E402
+
+INFO_FATURA = {
+    'fatura_numero': 1,
+    'razao_social': 'Empresa LTDA', 'cnpj': '00.000.000/0001-00', 'endereco': 'Rua A, 1', 'pix': 'pix@empresa',
+    'cliente_nome': 'Cliente LTDA', 'cliente_cnpj': '11.111.111/0001-11', 'cliente_endereco': 'Rua B, 2',
+    'data_desenvolvimento_inicio': '01/08/2025', 'data_desenvolvimento_fim': '31/08/2025',
+}
+
+
+def tabela_servicos_legado(gerador, resultados, taxa_hora):
+    # Versão anterior (iterrows, Paragraph por linha e Table única), mantida como referência
+    dados_tabela = [["Task", "Taxa por hora (R$)", "Horas", "Total (R$)"]]
+    linhas_task = []
+    for task, dados in resultados.items():
+        if dados.empty:
+            continue
+        horas_task = float(dados['duration'].sum())
+        linhas_task.append(len(dados_tabela))
+        dados_tabela.append([
+            Paragraph(f"<b>{task}</b>", gerador.estilos['tag']),
+            gerador._fmt_brl(taxa_hora),
+            f"{horas_task:.2f}".replace('.', ','),
+            gerador._fmt_brl(horas_task * taxa_hora)
+        ])
+        for _, row in dados.iterrows():
+            dados_tabela.append([
+                Paragraph(row['description'], gerador.estilos['descricao']),
+                gerador._fmt_brl(taxa_hora),
+                f"{row['duration']:.2f}".replace('.', ','),
+                gerador._fmt_brl(row['duration'] * taxa_hora)
+            ])
+    tabela = Table(dados_tabela, colWidths=[200, 100, 80, 120])
+    tabela.setStyle(gerador._estilo_tabela_servicos(linhas_task))
+    return tabela
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--linhas", type=int, nargs="+", default=[100, 1_000, 5_000, 10_000])
+    parser.add_argument("--repeticoes", type=int, default=3)
+    parser.add_argument("--sem-pdf", action="store_true", help="mede só a tabela de serviços")
+    parser.add_argument("--sem-legado", action="store_true", help="não mede a versão anterior (lenta acima de 10 mil linhas)")
+    args = parser.parse_args(argv)
+
+    gerador = GerarPDF()
+    taxa_hora = 60.0
+    print(f"{'linhas':>8} {'tabela (s)':>11} {'legado (s)':>11} {'ganho':>7} {'PDF (s)':>9}")
+
+    with tempfile.TemporaryDirectory() as diretorio:
+        for linhas in args.linhas:
+            resultados = gerar_resultados(linhas)
+            arquivo = os.path.join(diretorio, "fatura.pdf")
+
+            def renderizar(tabela):
+                SimpleDocTemplate(arquivo).build([tabela])
+
+            atual = medir(lambda: renderizar(gerador._criar_tabela_servicos(resultados, taxa_hora)[0]),
+                          args.repeticoes)
+            legado = ganho = "-"
+            if not args.sem_legado:
+                tempo_legado = medir(lambda: renderizar(tabela_servicos_legado(gerador, resultados, taxa_hora)),
+                                     args.repeticoes)
+                legado, ganho = f"{tempo_legado:.4f}", f"{tempo_legado / atual:.1f}x"
+            pdf = "-"
+            if not args.sem_pdf:
+                pdf = f"{medir(lambda: gerador.gerar_pdf_fatura(resultados, INFO_FATURA, arquivo, taxa_hora), 1):.3f}"
+            print(f"{linhas:>8} {atual:>11.4f} {legado:>11} {ganho:>7} {pdf:>9}")
+
+
+if __name__ == "__main__":
+    main()
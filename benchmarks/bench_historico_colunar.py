@@ -0,0 +1,67 @@
+# bench_historico_colunar.py
+"""
+Benchmark do histórico colunar (requer pyarrow): refazer a fatura de um período
+a partir dos registros brutos (normalização + agrupamento) x a partir da partição
+gravada (leitura só das colunas da fatura + agrupamento), e a consulta de horas
+por task em vários meses, para os formatos arrow e parquet.
+
+Uso:
+    python benchmarks/bench_historico_colunar.py
+    python benchmarks/bench_historico_colunar.py --registros 300000 --meses 24
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from dados_sinteticos import gerar_registros  # noqa: E402
+from historico_colunar import HistoricoColunar, FORMATOS_HISTORICO  # noqa: E402
+from medicao import medir  # noqa: E402
+from processar_dados import ProcessarDados  # noqa: E402
+
+INICIO, FIM = "01/08/2025", "31/08/2025"
+PERFIL, CONTA = "padrao", "benchmark@example.com"
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--registros", type=int, default=100_000, help="registros por mês (padrão: 100000)")
+    parser.add_argument("--meses", type=int, default=12, help="meses gravados para a consulta de horas (padrão: 12)")
+    parser.add_argument("--repeticoes", type=int, default=3)
+    args = parser.parse_args(argv)
+
+    registros = gerar_registros(args.registros)
+    processador = ProcessarDados(backend="pandas")
+    normalizados = processador.normalizar_registros(registros, INICIO, FIM)
+
+    bruto = medir(lambda: processador.processar_dados_api(registros, INICIO, FIM), args.repeticoes)
+    print(f"{args.registros} registros; a partir dos registros brutos: {bruto:.4f} s\n")
+    print(f"{'formato':<8} {'gravar (s)':>10} {'tamanho (MB)':>13} {'refazer fatura (s)':>19} "
+          f"{'horas/task {0} meses (s)'.format(args.meses):>24}")
+
+    with tempfile.TemporaryDirectory() as diretorio:
+        for formato in FORMATOS_HISTORICO:
+            historico = HistoricoColunar(os.path.join(diretorio, formato), formato)
+            gravar = medir(lambda: historico.gravar(PERFIL, CONTA, INICIO, FIM, normalizados), args.repeticoes)
+            tamanho = os.path.getsize(historico._arquivo(PERFIL, CONTA, INICIO, FIM)) / 2**20
+
+            refazer = medir(
+                lambda: processador.agrupar_registros(historico.ler(PERFIL, CONTA, INICIO, FIM), INICIO, FIM),
+                args.repeticoes,
+            )
+
+            # Os mesmos registros gravados como meses anteriores
+            for mes in range(1, args.meses):
+                ano, numero = divmod(8 - mes - 1, 12)
+                inicio = f"01/{numero + 1:02d}/{2025 + ano}"
+                historico.gravar(PERFIL, CONTA, inicio, inicio.replace("01/", "28/", 1), normalizados)
+            consulta = medir(lambda: historico.horas_por_task(PERFIL, CONTA), args.repeticoes)
+
+            print(f"{formato:<8} {gravar:>10.4f} {tamanho:>13.1f} {refazer:>19.4f} {consulta:>24.4f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,221 @@
+# bench_pipeline.py
+"""
+Benchmark de ponta a ponta com registros sintéticos e um substituto local da API
+GraphQL (sem rede nem credenciais). Mede tempo e pico de memória de cada etapa:
+busca paginada (ClienteAPI), processar_dados_api (backends pandas e leve),
+_agrupar_por_task e gerar_pdf_fatura. Os resultados são gravados em JSON para
+comparar execuções entre commits.
+
+Uso:
+    python benchmarks/bench_pipeline.py
+    python benchmarks/bench_pipeline.py --registros 1000 100000 --latencia 0.02
+    python benchmarks/bench_pipeline.py --comparar benchmarks/resultados/abc1234.json
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+from datetime import datetime
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RAIZ)
+
+from dados_sinteticos import gerar_registros  # noqa: E402
+from medicao import cronometrar, medir_memoria  # noqa: E402
+from servidor_graphql import ServidorGraphQL  # noqa: E402
+
+INICIO, FIM = "01/08/2025", "31/08/2025"
+INFO_FATURA = {
+    'fatura_numero': 1,
+    'razao_social': 'Empresa LTDA', 'cnpj': '00.000.000/0001-00', 'endereco': 'Rua A, 1', 'pix': 'pix@empresa',
+    'cliente_nome': 'Cliente LTDA', 'cliente_cnpj': '11.111.111/0001-11', 'cliente_endereco': 'Rua B, 2',
+    'data_desenvolvimento_inicio': INICIO, 'data_desenvolvimento_fim': FIM,
+}
+# Diferenças abaixo disso são ruído de medição, mesmo que a razão passe da tolerância
+MINIMO_SEGUNDOS = 0.005
+MINIMO_MEMORIA_MB = 1.0
+
+
+def configurar_ambiente(url):
+    # Antes de importar config: API local, sem caches em disco nem token reaproveitado
+    os.environ.update({
+        'API_URL': url,
+        'EMAIL': 'benchmark', 'PASSWORD': 'benchmark',
+        'TOKEN_CACHE_HABILITADO': 'false',
+        'CACHE_RESPOSTAS_HABILITADO': 'false',
+        'SINCRONIZACAO_INCREMENTAL': 'false',
+        'PDF_CACHE_HABILITADO': 'false',
+    })
+
+
+def commit_atual():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=RAIZ,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "desconhecido"
+
+
+def medir_etapa(funcao, repeticoes, memoria):
+    """Devolve {'segundos': melhor tempo, 'pico_memoria_mb': ...} e o resultado da última execução."""
+    with contextlib.redirect_stdout(io.StringIO()):
+        melhor, resultado = cronometrar(funcao, repeticoes)
+        medicao = {'segundos': round(melhor, 6)}
+        if memoria:
+            medicao['pico_memoria_mb'] = round(medir_memoria(funcao)[2], 3)
+    return medicao, resultado
+
+
+def medir_pipeline(servidor, quantidade, args, diretorio):
+    from cliente_api import ClienteAPI, criar_sessao
+    from gerar_PDF import GerarPDF
+    from processar_dados import ProcessarDados, RegistrosNormalizados
+
+    servidor.carregar(gerar_registros(quantidade, seed=args.seed, campos_extras=args.campos_extras))
+    etapas = {}
+
+    def buscar():
+        cliente = ClienteAPI(sessao=sessao)
+        return list(cliente.buscar_dados_timesheet_paginado(INICIO, FIM, args.tamanho_pagina))
+
+    sessao = criar_sessao()
+    etapas['busca'], registros = medir_etapa(buscar, args.repeticoes, args.memoria)
+    sessao.close()
+    # Os contadores do servidor acumulam todas as execuções da etapa
+    execucoes = args.repeticoes + (1 if args.memoria else 0)
+    etapas['busca']['requisicoes'] = (servidor.consultas + servidor.logins) // execucoes
+    etapas['busca']['bytes_recebidos'] = servidor.bytes_enviados // execucoes
+
+    resultados = None
+    for backend in ("pandas", "leve"):
+        processador = ProcessarDados(backend=backend)
+        etapas[f'processar_dados_api[{backend}]'], resultado = medir_etapa(
+            lambda: processador.processar_dados_api(registros, INICIO, FIM), args.repeticoes, args.memoria
+        )
+        if backend == "pandas":
+            resultados = resultado
+
+    # Entrada do agrupamento: os registros já normalizados, como em _processar_pandas
+    processador = ProcessarDados(backend="pandas")
+    inicio_dt, fim_dt = datetime.strptime(INICIO, "%d/%m/%Y"), datetime.strptime(FIM, "%d/%m/%Y")
+    normalizados = RegistrosNormalizados()
+    for i in range(0, len(registros), processador.TAMANHO_LOTE):
+        lote_df = processador._normalizar_lote(registros[i:i + processador.TAMANHO_LOTE], inicio_dt, fim_dt)
+        if not lote_df.empty:
+            normalizados.adicionar_lote(lote_df)
+    etapas['_agrupar_por_task'], _ = medir_etapa(
+        lambda: processador._agrupar_por_task(normalizados, INICIO, FIM), args.repeticoes, args.memoria
+    )
+
+    if not args.sem_pdf:
+        gerador = GerarPDF()
+        gerador.cache_habilitado = False
+        arquivo = os.path.join(diretorio, f"fatura_{quantidade}.pdf")
+        etapas['gerar_pdf_fatura'], _ = medir_etapa(
+            lambda: gerador.gerar_pdf_fatura(resultados, INFO_FATURA, arquivo, 60.0),
+            args.repeticoes_pdf, args.memoria
+        )
+        etapas['gerar_pdf_fatura']['bytes_pdf'] = os.path.getsize(arquivo)
+
+    return {'registros': quantidade, 'linhas_fatura': sum(len(df) for df in resultados.values()), 'etapas': etapas}
+
+
+def comparar(base, atual, tolerancia):
+    """Imprime a comparação etapa a etapa e devolve a lista de regressões."""
+    regressoes = []
+    anteriores = {r['registros']: r['etapas'] for r in base['resultados']}
+    print(f"\nComparação com {base.get('commit', '?')} ({base.get('data', '?')}), tolerância {tolerancia:.0%}")
+    print(f"{'registros':>10} {'etapa':<32} {'antes (s)':>10} {'agora (s)':>10} {'razão':>7} {'mem antes':>10} {'mem agora':>10}")
+    for resultado in atual['resultados']:
+        etapas_base = anteriores.get(resultado['registros'])
+        if etapas_base is None:
+            continue
+        for etapa, medicao in resultado['etapas'].items():
+            anterior = etapas_base.get(etapa)
+            if anterior is None:
+                continue
+            razao = medicao['segundos'] / anterior['segundos'] if anterior['segundos'] else float('inf')
+            marcador = ""
+            if razao > 1 + tolerancia and medicao['segundos'] - anterior['segundos'] > MINIMO_SEGUNDOS:
+                marcador = "  <- mais lento"
+                regressoes.append(f"{resultado['registros']} registros, {etapa}: {razao:.2f}x o tempo")
+            mem_antes, mem_agora = anterior.get('pico_memoria_mb'), medicao.get('pico_memoria_mb')
+            if mem_antes and mem_agora and mem_agora > mem_antes * (1 + tolerancia) \
+                    and mem_agora - mem_antes > MINIMO_MEMORIA_MB:
+                marcador += "  <- mais memória"
+                regressoes.append(f"{resultado['registros']} registros, {etapa}: "
+                                  f"{mem_agora:.1f} MB > {mem_antes:.1f} MB")
+            mem_antes_texto = f"{mem_antes:.1f}" if mem_antes is not None else "-"
+            mem_agora_texto = f"{mem_agora:.1f}" if mem_agora is not None else "-"
+            print(f"{resultado['registros']:>10} {etapa:<32} {anterior['segundos']:>10.4f} "
+                  f"{medicao['segundos']:>10.4f} {razao:>6.2f}x {mem_antes_texto:>10} {mem_agora_texto:>10}{marcador}")
+    return regressoes
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--registros", type=int, nargs="+", default=[1_000, 10_000, 50_000],
+                        help="tamanhos do período sintético (padrão: 1000 10000 50000)")
+    parser.add_argument("--tamanho-pagina", type=int, default=500)
+    parser.add_argument("--latencia", type=float, default=0.0,
+                        help="atraso simulado por requisição à API, em segundos (padrão: 0)")
+    parser.add_argument("--repeticoes", type=int, default=3, help="execuções por etapa; vale o menor tempo")
+    parser.add_argument("--repeticoes-pdf", type=int, default=1)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--campos-extras", type=int, default=0,
+                        help="campos de dynamicFields não lidos pela fatura, por registro (padrão: 0)")
+    parser.add_argument("--sem-memoria", dest="memoria", action="store_false",
+                        help="não mede o pico de memória (tracemalloc)")
+    parser.add_argument("--sem-pdf", action="store_true", help="não mede gerar_pdf_fatura")
+    parser.add_argument("--saida", help="arquivo JSON de resultados (padrão: benchmarks/resultados/<commit>.json)")
+    parser.add_argument("--comparar", metavar="JSON", help="resultados anteriores para comparar")
+    parser.add_argument("--tolerancia", type=float, default=0.2,
+                        help="piora relativa aceita na comparação (padrão: 0.2 = 20%%)")
+    args = parser.parse_args(argv)
+
+    commit = commit_atual()
+    saida = args.saida or os.path.join(RAIZ, "benchmarks", "resultados", f"{commit}.json")
+    execucao = {
+        'commit': commit,
+        'data': datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'plataforma': platform.platform(),
+        'parametros': {chave: valor for chave, valor in vars(args).items() if chave not in ('saida', 'comparar')},
+        'resultados': [],
+    }
+
+    with ServidorGraphQL(latencia=args.latencia) as servidor, tempfile.TemporaryDirectory() as diretorio:
+        configurar_ambiente(servidor.url)
+        print(f"{'registros':>10} {'etapa':<32} {'tempo (s)':>10} {'pico (MB)':>10}")
+        for quantidade in args.registros:
+            resultado = medir_pipeline(servidor, quantidade, args, diretorio)
+            execucao['resultados'].append(resultado)
+            for etapa, medicao in resultado['etapas'].items():
+                pico = medicao.get('pico_memoria_mb')
+                print(f"{quantidade:>10} {etapa:<32} {medicao['segundos']:>10.4f} "
+                      f"{pico if pico is not None else '-':>10}")
+
+    os.makedirs(os.path.dirname(os.path.abspath(saida)), exist_ok=True)
+    with open(saida, 'w', encoding='utf-8') as arquivo:
+        json.dump(execucao, arquivo, ensure_ascii=False, indent=2)
+    print(f"\nResultados gravados em {saida}")
+
+    if args.comparar:
+        with open(args.comparar, encoding='utf-8') as arquivo:
+            regressoes = comparar(json.load(arquivo), execucao, args.tolerancia)
+        if regressoes:
+            print("\nRegressões:")
+            for regressao in regressoes:
+                print(f"  - {regressao}")
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
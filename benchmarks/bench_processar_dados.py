@@ -0,0 +1,165 @@
+# bench_processar_dados.py
+"""
+Benchmark de ProcessarDados.processar_dados_api.
+Compara a normalização vetorizada (pandas), o backend leve (sem pandas)
+e a versão anterior (um dict por registro). Antes das medições, confere que
+pandas, leve e auto (com troca para pandas no meio) dão o mesmo resultado,
+inclusive em casos de borda (descrições de tipos mistos, durações 'nan'/'inf' e
+registros normalizados sem task).
+
+Uso:
+    python benchmarks/bench_processar_dados.py
+    python benchmarks/bench_processar_dados.py --registros 10000 200000
+"""
+
+import argparse
+import contextlib
+import io
+import os
+import sys
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from dados_sinteticos import gerar_registros  # noqa: E402
+from medicao import medir  # noqa: E402
+from processar_dados import ProcessarDados, RegistrosNormalizados  # noqa: E402
+
+
+def casos_de_borda():
+    """Entradas que os backends precisam tratar igual, além dos registros gerados."""
+    def registro(descricao, duracao, task="Task 1", dia="2025-08-05"):
+        return {
+            'dynamicFields': {'start_date': dia, 'duration': duracao, 'tag': 'development', 'description': descricao},
+            'dynamicAssociations': {'task': task},
+        }
+
+    return {
+        'descricoes de tipos mistos': [
+            registro(12, "1"), registro("Texto", "2"), registro(12, "0.5"), registro(9, "1"), registro("10", "1"),
+            registro(2.5, "1"), registro("Abc", "1", task=" Task 2 "),
+        ],
+        'duracoes nao finitas': [
+            registro("A", "nan"), registro("A", "2"), registro("B", "inf"), registro("B", "1"),
+            registro("C", "-inf"), registro("D", float('nan')), registro("E", float('inf')),
+        ],
+    }
+
+
+def verificar_equivalencia(registros, periodo):
+    """Devolve os nomes dos casos em que algum backend diverge do pandas."""
+    def resumir(resultado):
+        return {
+            task: (tabela['description'].tolist(), [round(horas, 9) for horas in tabela['duration'].tolist()])
+            for task, tabela in resultado.items()
+        }
+
+    divergentes = []
+    casos = {'registros gerados': registros, **casos_de_borda()}
+    with contextlib.redirect_stdout(io.StringIO()):
+        for nome, dados in casos.items():
+            referencia = resumir(ProcessarDados(backend="pandas").processar_dados_api(dados, *periodo))
+            for backend, limiar in (("leve", None), ("auto", 0), ("auto", 2)):
+                resultado = resumir(ProcessarDados(backend=backend, limiar_leve=limiar).processar_dados_api(
+                    iter(dados), *periodo
+                ))
+                if resultado != referencia:
+                    divergentes.append(f"{nome} ({backend}, limiar {limiar})")
+
+        # Registros já normalizados (histórico colunar, de_tabela) guardam a task ausente como
+        # código -1: o agrupamento deve mandá-los para 'Sem task', como o backend leve
+        dia = datetime.strptime(periodo[0], "%d/%m/%Y")
+        for nome, linhas in (
+            ('task ausente nos normalizados', [('a', 1.0, None), ('b', 2.0, 'B'), ('c', 0.5, None)]),
+            ('todas as tasks ausentes', [('a', 1.0, None), ('b', 2.0, None)]),
+        ):
+            referencia = resumir(ProcessarDados(backend="leve").processar_dados_api([
+                {'dynamicFields': {'start_date': periodo[0][6:] + "-" + periodo[0][3:5] + "-" + periodo[0][:2],
+                                   'duration': str(horas), 'tag': 'development', 'description': descricao},
+                 'dynamicAssociations': {} if task is None else {'task': task}}
+                for descricao, horas, task in linhas
+            ], *periodo))
+            normalizados = RegistrosNormalizados.de_tabela([
+                {'start_date': dia, 'description': descricao, 'duration': horas, 'tag': 'development', 'task_name': task}
+                for descricao, horas, task in linhas
+            ])
+            try:
+                resultado = resumir(ProcessarDados(backend="pandas").agrupar_registros(normalizados, *periodo))
+            except Exception as e:
+                resultado = repr(e)
+            if resultado != referencia:
+                divergentes.append(f"{nome} (pandas sobre registros normalizados)")
+    return divergentes
+
+
+def normalizar_legado(processador, dados_api, data_inicio, data_fim):
+    # Laço anterior (um strptime e um dict por registro), mantido como referência de desempenho
+    data_inicio_dt = datetime.strptime(data_inicio, "%d/%m/%Y")
+    data_fim_dt = datetime.strptime(data_fim, "%d/%m/%Y")
+    registros_processados = []
+    for registro in dados_api:
+        dynamic_fields = registro.get('dynamicFields', {})
+        dynamic_associations = registro.get('dynamicAssociations', {})
+        start_date_str = dynamic_fields.get('start_date', '')
+        description = dynamic_fields.get('description', '')
+        duration_str = dynamic_fields.get('duration', '0')
+        tag = dynamic_fields.get('tag', 'development')
+        task = dynamic_associations.get('task', '')
+        task_name = task.strip() if isinstance(task, str) else ''
+        task_id = dynamic_fields.get('task', '')
+        if not description and task_name:
+            description = task_name
+        elif not description and task_id:
+            description = str(task_id)
+        elif not description:
+            description = 'Sem descrição'
+        if not start_date_str:
+            continue
+        try:
+            start_date_dt = processador._processar_data(start_date_str)
+            if not (data_inicio_dt <= start_date_dt <= data_fim_dt):
+                continue
+        except Exception:
+            continue
+        try:
+            duration = float(str(duration_str).replace(',', '.'))
+        except (ValueError, TypeError):
+            duration = 0.0
+        registros_processados.append({
+            'start_date': start_date_dt,
+            'description': description,
+            'duration': duration,
+            'tag': tag,
+            'task_name': task_name,
+        })
+    return processador._agrupar_por_task(registros_processados, data_inicio, data_fim)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--registros", type=int, nargs="+", default=[1_000, 10_000, 100_000, 500_000])
+    parser.add_argument("--repeticoes", type=int, default=3)
+    args = parser.parse_args(argv)
+
+    processador = ProcessarDados(backend="pandas")
+    processador_leve = ProcessarDados(backend="leve")
+    periodo = ("01/08/2025", "31/08/2025")
+    # O import do pandas (sob demanda) fica fora das medições
+    processador.processar_dados_api(gerar_registros(10), *periodo)
+    divergentes = verificar_equivalencia(gerar_registros(5000, quantidade_tasks=50), periodo)
+    if divergentes:
+        print("Backends com resultados diferentes do pandas: " + "; ".join(divergentes))
+        return 1
+    print("Backends equivalentes (registros gerados e casos de borda).")
+    print(f"{'registros':>10} {'vetorizado (s)':>15} {'leve (s)':>10} {'legado (s)':>12} {'ganho':>7}")
+
+    for quantidade in args.registros:
+        registros = gerar_registros(quantidade, quantidade_tasks=50)
+        atual = medir(lambda: processador.processar_dados_api(registros, *periodo), args.repeticoes)
+        leve = medir(lambda: processador_leve.processar_dados_api(registros, *periodo), args.repeticoes)
+        legado = medir(lambda: normalizar_legado(processador, registros, *periodo), args.repeticoes)
+        print(f"{quantidade:>10} {atual:>15.4f} {leve:>10.4f} {legado:>12.4f} {legado / atual:>6.1f}x")
+
+
+if __name__ == "__main__":
+    sys.exit(main())
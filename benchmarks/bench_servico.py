@@ -0,0 +1,104 @@
+# bench_servico.py
+"""
+Benchmark do modo serviço: latência por fatura de uma execução a frio da CLI
+(novo processo: imports, login e estilos a cada fatura) x um pedido ao serviço
+já aquecido (POST /faturas com "aguardar"), contra o substituto local da API.
+
+Uso:
+    python benchmarks/bench_servico.py
+    python benchmarks/bench_servico.py --registros 5000 --faturas 6
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import urllib.request
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RAIZ)
+
+from dados_sinteticos import gerar_registros  # noqa: E402
+from servidor_graphql import ServidorGraphQL  # noqa: E402
+
+AMBIENTE = {
+    'EMAIL': 'benchmark@example.com', 'PASSWORD': 'benchmark', 'NUMERO_FATURA': '1', 'TAXA_HORA': '50',
+    'RAZAO_SOCIAL': 'Emissor', 'CNPJ': '-', 'ENDERECO': '-', 'PIX': '-',
+    'CLIENTE_NOME': 'Cliente', 'CLIENTE_CNPJ': '-', 'CLIENTE_ENDERECO': '-',
+    # Cada fatura é de fato buscada, processada e renderizada nos dois modos
+    'TOKEN_CACHE_HABILITADO': 'false', 'CACHE_RESPOSTAS_HABILITADO': 'false', 'PDF_CACHE_HABILITADO': 'false',
+    'ROLLUP_MENSAL_HABILITADO': 'false', 'HISTORICO_COLUNAR_HABILITADO': 'false', 'PERFIS_ARQUIVO': '',
+}
+
+
+def medir_cli(meses, ambiente, diretorio):
+    tempos = []
+    for mes in meses:
+        inicio = time.perf_counter()
+        subprocess.run(
+            [sys.executable, os.path.join(RAIZ, "gerador_fatura.py")],
+            env={**ambiente, 'MES_COMPLETO': mes}, cwd=diretorio, check=True, stdout=subprocess.DEVNULL,
+        )
+        tempos.append(time.perf_counter() - inicio)
+    return tempos
+
+
+def medir_servico(meses, porta, processos):
+    from servico_faturas import ServicoFaturas, criar_servidor
+
+    servico = ServicoFaturas(processos=processos, trabalhadores=2)
+    servico.iniciar()
+    servidor = criar_servidor(servico, f"127.0.0.1:{porta}")
+    threading.Thread(target=servidor.serve_forever, daemon=True).start()
+    url = f"http://127.0.0.1:{servidor.server_address[1]}/faturas"
+
+    tempos = []
+    try:
+        for mes in meses:
+            corpo = json.dumps({'mes': mes, 'aguardar': True}).encode()
+            inicio = time.perf_counter()
+            with urllib.request.urlopen(urllib.request.Request(url, corpo, {'Content-Type': 'application/json'})) as r:
+                resposta = json.loads(r.read())
+            tempos.append(time.perf_counter() - inicio)
+            if resposta['status'] != "concluida":
+                raise RuntimeError(f"Pedido {mes} terminou como {resposta['status']}: {resposta['erro']}")
+    finally:
+        servidor.shutdown()
+        servidor.server_close()
+        servico.parar()
+    return tempos
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--registros", type=int, default=1000, help="registros por mês (padrão: 1000)")
+    parser.add_argument("--faturas", type=int, default=4, help="faturas (meses) medidas em cada modo (padrão: 4)")
+    parser.add_argument("--processos", type=int, default=1, help="processos de PDF do serviço (padrão: 1)")
+    parser.add_argument("--latencia", type=float, default=0.0, help="atraso simulado por requisição à API")
+    args = parser.parse_args(argv)
+
+    meses = [f"{mes:02d}/2025" for mes in range(1, args.faturas + 1)]
+    registros = []
+    for indice, mes in enumerate(meses, 1):
+        registros += gerar_registros(args.registros, ano=2025, mes=int(mes[:2]), seed=indice)
+
+    with ServidorGraphQL(registros, latencia=args.latencia) as api, tempfile.TemporaryDirectory() as diretorio:
+        ambiente = {**os.environ, **AMBIENTE, 'API_URL': api.url}
+        os.environ.update({**AMBIENTE, 'API_URL': api.url})
+        cli = medir_cli(meses, ambiente, diretorio)
+        os.chdir(diretorio)
+        servico = medir_servico(meses, 0, args.processos)
+        os.chdir(RAIZ)
+
+    print(f"\n{args.registros} registros por fatura, {len(meses)} fatura(s)")
+    print(f"{'modo':<10} {'primeira (s)':>13} {'mediana (s)':>12}")
+    for nome, tempos in (("cli", cli), ("servico", servico)):
+        print(f"{nome:<10} {tempos[0]:>13.3f} {sorted(tempos)[len(tempos) // 2]:>12.3f}")
+
+
+if __name__ == "__main__":
+    main()
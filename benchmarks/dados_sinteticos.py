@@ -0,0 +1,93 @@
+# dados_sinteticos.py
+"""
+Gerador de registros de timesheet sintéticos, no formato devolvido pela consulta
+`records` da API (id, updatedAt, dynamicFields e dynamicAssociations), e de
+resultados já agrupados por task, como os que o GerarPDF recebe.
+"""
+
+import random
+from calendar import monthrange
+
+TAGS = ("development", "meeting", "tests", "support")
+DURACOES = ("1", "1,5", "0.25", "2", "4", "0,5", 3, 1.75)
+VERBOS = ("Ajuste", "Correção", "Revisão", "Implementação", "Deploy", "Reunião sobre", "Testes de")
+ASSUNTOS = ("tela de cadastro", "API de pagamentos", "relatório mensal", "importação de notas",
+            "fechamento contábil", "integração com o ERP", "painel administrativo")
+# Descrição que quebra em várias linhas na tabela de serviços do PDF
+DESCRICAO_LONGA = "Correção do cálculo de impostos no fechamento mensal do módulo financeiro"
+
+
+def gerar_registros(quantidade, ano=2025, mes=8, quantidade_tasks=20, quantidade_descricoes=300, seed=42,
+                    campos_extras=0):
+    """
+    Gera `quantidade` registros do mês informado, com a mistura de formatos vista na API:
+    datas ISO com hora, só a data ou dd/mm/aaaa; durações em texto (com vírgula ou ponto)
+    ou numéricas; descrições vazias (que caem no nome ou no id da task) e registros sem task.
+    `campos_extras` acrescenta campos em dynamicFields que a fatura não lê, como nas
+    planilhas reais (responsável, cliente, observações...).
+    """
+    aleatorio = random.Random(seed)
+    dias = monthrange(ano, mes)[1]
+    tasks = [f"PROJ-{100 + i} {aleatorio.choice(ASSUNTOS).capitalize()}" for i in range(quantidade_tasks)]
+    descricoes = [
+        f"{aleatorio.choice(VERBOS)} {aleatorio.choice(ASSUNTOS)} #{i}" for i in range(quantidade_descricoes)
+    ]
+
+    registros = []
+    for i in range(quantidade):
+        dia = aleatorio.randint(1, dias)
+        formato = aleatorio.random()
+        if formato < 0.7:
+            start_date = f"{ano}-{mes:02d}-{dia:02d}T{aleatorio.randint(8, 19):02d}:{aleatorio.choice((0, 15, 30, 45)):02d}:00.000Z"
+        elif formato < 0.9:
+            start_date = f"{ano}-{mes:02d}-{dia:02d}"
+        else:
+            start_date = f"{dia:02d}/{mes:02d}/{ano}"
+
+        campos = {
+            'start_date': start_date,
+            'duration': aleatorio.choice(DURACOES),
+            'tag': aleatorio.choice(TAGS),
+            'description': aleatorio.choice(descricoes) if aleatorio.random() < 0.95 else "",
+        }
+        for extra in range(campos_extras):
+            campos[f"campo_{extra}"] = f"valor {extra} do registro {i}" if extra % 3 else extra * 1.5
+        associacoes = {}
+        if aleatorio.random() < 0.9:
+            associacoes['task'] = aleatorio.choice(tasks)
+        else:
+            campos['task'] = str(aleatorio.randint(1, 9999))
+
+        registros.append({
+            'id': f"{ano}{mes:02d}-{i}",
+            'updatedAt': f"{ano}-{mes:02d}-{dia:02d}T20:{i // 60 % 60:02d}:{i % 60:02d}.000Z",
+            'dynamicFields': campos,
+            'dynamicAssociations': associacoes,
+        })
+    return registros
+
+
+def gerar_resultados(linhas, quantidade_tasks=10, seed=42):
+    """
+    Gera um resultado já agrupado ({task: DataFrame com 'description' e 'duration'}, como
+    o de `ProcessarDados.processar_dados_api`) com `linhas // quantidade_tasks` descrições
+    por task, algumas longas o bastante para quebrar linha no PDF.
+    """
+    import pandas as pd
+
+    aleatorio = random.Random(seed)
+    duracoes = [float(str(duracao).replace(',', '.')) for duracao in DURACOES]
+
+    def descricao(i):
+        if aleatorio.random() < 0.2:
+            return f"{DESCRICAO_LONGA} #{i}"
+        return f"{aleatorio.choice(VERBOS)} {aleatorio.choice(ASSUNTOS)} #{i}"
+
+    resultados = {}
+    for task in range(quantidade_tasks):
+        quantidade = linhas // quantidade_tasks
+        resultados[f"PROJ-{100 + task} {aleatorio.choice(ASSUNTOS).capitalize()}"] = pd.DataFrame({
+            'description': [descricao(i) for i in range(quantidade)],
+            'duration': [aleatorio.choice(duracoes) for _ in range(quantidade)],
+        })
+    return resultados
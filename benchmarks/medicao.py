@@ -0,0 +1,35 @@
+# medicao.py
+"""
+Medições usadas pelos benchmarks: melhor tempo de N execuções e memória (mantida e
+pico) de uma execução sob tracemalloc, feita à parte porque deixa o código bem mais lento.
+"""
+
+import time
+import tracemalloc
+
+
+def cronometrar(funcao, repeticoes):
+    """Melhor tempo, em segundos, de `repeticoes` execuções de `funcao` e o resultado da última."""
+    melhor = float('inf')
+    resultado = None
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        resultado = funcao()
+        melhor = min(melhor, time.perf_counter() - inicio)
+    return melhor, resultado
+
+
+def medir(funcao, repeticoes):
+    """Melhor tempo, em segundos, de `repeticoes` execuções de `funcao`."""
+    return cronometrar(funcao, repeticoes)[0]
+
+
+def medir_memoria(funcao):
+    """Executa `funcao` uma vez e devolve o resultado, a memória mantida por ele e o pico, em MB."""
+    tracemalloc.start()
+    try:
+        resultado = funcao()
+        mantida, pico = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return resultado, mantida / 2**20, pico / 2**20
@@ -0,0 +1,151 @@
+# servidor_graphql.py
+"""
+Substituto local da API GraphQL para benchmarks: atende a mutation `logIn` e a
+consulta `records` (filtros de data, tags e updatedAt, paginação limit/offset)
+a partir de uma lista de registros em memória, em uma thread do próprio processo.
+"""
+
+import json
+import re
+import threading
+import time
+from datetime import datetime
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+TOKEN = "token-benchmark"
+
+REGEX_ARGUMENTO = {
+    'start_date_gte': re.compile(r'start_date_gte:\s*"([^"]*)"'),
+    'start_date_lt': re.compile(r'start_date_lt:\s*"([^"]*)"'),
+    'start_date_regex': re.compile(r'start_date_regex:\s*"([^"]*)"'),
+    'updated_at_gte': re.compile(r'updatedAt_gte:\s*"([^"]*)"'),
+    'tag_in': re.compile(r'tag_in:\s*(\[[^\]]*\])'),
+    'limit': re.compile(r'limit:\s*(\d+)'),
+    'offset': re.compile(r'offset:\s*(\d+)'),
+}
+
+
+def _data_iso(start_date):
+    # Normaliza a data do registro para YYYY-MM-DD, como o servidor real faria ao filtrar
+    if not isinstance(start_date, str):
+        return ""
+    if len(start_date) >= 10 and start_date[4] == '-':
+        return start_date[:10]
+    try:
+        return datetime.strptime(start_date[:10], "%d/%m/%Y").strftime("%Y-%m-%d")
+    except ValueError:
+        return ""
+
+
+class ServidorGraphQL:
+    """
+    Uso:
+        with ServidorGraphQL(registros, latencia=0.05) as servidor:
+            os.environ['API_URL'] = servidor.url
+    """
+
+    def __init__(self, registros=(), latencia=0.0, porta=0):
+        self.latencia = latencia
+        self.porta = porta
+        self._trava = threading.Lock()
+        self._servidor = None
+        self.carregar(registros)
+
+    def carregar(self, registros):
+        """Troca os registros servidos e zera os contadores (o servidor pode estar rodando)."""
+        # Ordenados como a consulta real (id ASC), com a data ISO pré-calculada
+        ordenados = sorted(registros, key=lambda r: str(r.get('id') or ''))
+        datas = [_data_iso((r.get('dynamicFields') or {}).get('start_date')) for r in ordenados]
+        with self._trava:
+            self.registros, self._datas = ordenados, datas
+            self._filtrados = {}
+            self.consultas = self.logins = self.bytes_enviados = 0
+
+    @property
+    def url(self):
+        return f"http://127.0.0.1:{self._servidor.server_port}/graphql"
+
+    def __enter__(self):
+        servidor = self
+
+        class Manipulador(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def do_POST(self):
+                corpo = json.loads(self.rfile.read(int(self.headers['Content-Length'])))
+                status, resposta = servidor.responder(corpo.get('query', ''), self.headers.get('Authorization'))
+                dados = json.dumps(resposta).encode('utf-8') if resposta is not None else b""
+                with servidor._trava:
+                    servidor.bytes_enviados += len(dados)
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(dados)))
+                self.end_headers()
+                self.wfile.write(dados)
+
+        self._servidor = ThreadingHTTPServer(('127.0.0.1', self.porta), Manipulador)
+        self._servidor.daemon_threads = True
+        threading.Thread(target=self._servidor.serve_forever, daemon=True).start()
+        return self
+
+    def __exit__(self, tipo, valor, traceback):
+        self._servidor.shutdown()
+        self._servidor.server_close()
+        return False
+
+    def responder(self, query, autorizacao):
+        if self.latencia:
+            time.sleep(self.latencia)
+
+        if 'logIn' in query:
+            with self._trava:
+                self.logins += 1
+            return 200, {'data': {'logIn': {'token': TOKEN, 'preAuthToken': None, 'email': 'benchmark', 'role': 'user'}}}
+
+        if autorizacao != TOKEN:
+            return 401, None
+
+        with self._trava:
+            self.consultas += 1
+
+        argumentos = {nome: regex.search(query) for nome, regex in REGEX_ARGUMENTO.items()}
+        argumentos = {nome: m.group(1) for nome, m in argumentos.items() if m}
+        filtrados = self._filtrar(
+            argumentos.get('start_date_gte'), argumentos.get('start_date_lt'), argumentos.get('start_date_regex'),
+            argumentos.get('updated_at_gte'), argumentos.get('tag_in')
+        )
+
+        pagina = filtrados
+        if 'limit' in argumentos:
+            inicio = int(argumentos.get('offset', 0))
+            pagina = filtrados[inicio:inicio + int(argumentos['limit'])]
+        return 200, {'data': {'records': {'count': len(filtrados), 'data': pagina}}}
+
+    def _filtrar(self, data_gte, data_lt, data_regex, updated_at_gte, tag_in):
+        # O mesmo filtro é pedido uma vez por página: guarda o resultado de cada combinação
+        chave = (data_gte, data_lt, data_regex, updated_at_gte, tag_in)
+        with self._trava:
+            if chave in self._filtrados:
+                return self._filtrados[chave]
+
+        tags = set(json.loads(tag_in)) if tag_in else None
+        regex = re.compile(data_regex) if data_regex else None
+        filtrados = []
+        for registro, data in zip(self.registros, self._datas):
+            campos = registro.get('dynamicFields') or {}
+            if data_gte and not (data and data >= data_gte):
+                continue
+            if data_lt and not (data and data < data_lt):
+                continue
+            if regex and not regex.search(str(campos.get('start_date', ''))):
+                continue
+            if updated_at_gte and (registro.get('updatedAt') or '') < updated_at_gte:
+                continue
+            if tags is not None and campos.get('tag') not in tags:
+                continue
+            filtrados.append(registro)
+
+        with self._trava:
+            self._filtrados[chave] = filtrados
+        return filtrados
@@ -0,0 +1,85 @@
+# verificar_importtime.py
+"""
+Verificação de regressão do tempo de inicialização da CLI com `python -X importtime`.
+Falha (código de saída 1) se os caminhos que não geram PDF passarem do orçamento
+ou voltarem a importar módulos pesados (pandas, reportlab, requests).
+
+Uso:
+    python benchmarks/verificar_importtime.py
+    python benchmarks/verificar_importtime.py --orcamento-ms 150 --repeticoes 5
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Caminhos da CLI que não processam dados nem geram PDF
+CENARIOS = {
+    'import gerador_fatura': ['-c', 'import gerador_fatura'],
+    'gerador_fatura.py --help': ['gerador_fatura.py', '--help'],
+    'import gerador_lote': ['-c', 'import gerador_lote'],
+}
+
+# Módulos que só podem ser carregados quando o processamento, o PDF ou a API começam
+MODULOS_PESADOS = ('pandas', 'numpy', 'reportlab', 'requests', 'aiohttp')
+
+
+def medir(argumentos):
+    """Executa o cenário com -X importtime e devolve (tempo total em ms, módulos importados)."""
+    processo = subprocess.run(
+        [sys.executable, '-X', 'importtime', *argumentos],
+        cwd=RAIZ, capture_output=True, text=True,
+    )
+    if processo.returncode != 0:
+        raise RuntimeError(f"Falha ao executar {' '.join(argumentos)}:\n{processo.stderr}")
+
+    total_us = 0
+    modulos = set()
+    for linha in processo.stderr.splitlines():
+        if not linha.startswith('import time:') or 'self [us]' in linha:
+            continue
+        _, cumulativo, nome = linha[len('import time:'):].split('|')
+        modulos.add(nome.strip())
+        # Só as linhas de primeiro nível: o cumulativo já inclui os submódulos
+        if not nome[1:].startswith(' '):
+            total_us += int(cumulativo)
+    return total_us / 1000, modulos
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--orcamento-ms', type=float, default=150.0,
+                        help="tempo máximo de import por cenário, em ms (padrão: 150)")
+    parser.add_argument('--repeticoes', type=int, default=3,
+                        help="execuções por cenário; vale o menor tempo (padrão: 3)")
+    args = parser.parse_args()
+
+    falhas = []
+    print(f"{'cenário':<28} {'import (ms)':>12}  orçamento {args.orcamento_ms:.0f} ms")
+    for nome, argumentos in CENARIOS.items():
+        medicoes = [medir(argumentos) for _ in range(max(1, args.repeticoes))]
+        tempo = min(ms for ms, _ in medicoes)
+        pesados = sorted({modulo.split('.')[0] for modulo in medicoes[0][1]} & set(MODULOS_PESADOS))
+
+        situacao = "ok"
+        if tempo > args.orcamento_ms:
+            situacao = "ACIMA DO ORÇAMENTO"
+            falhas.append(f"{nome}: {tempo:.1f} ms > {args.orcamento_ms:.0f} ms")
+        if pesados:
+            situacao = f"importa {', '.join(pesados)}"
+            falhas.append(f"{nome}: importa {', '.join(pesados)} na inicialização")
+        print(f"{nome:<28} {tempo:>12.1f}  {situacao}")
+
+    if falhas:
+        print("\nRegressão no tempo de inicialização:")
+        for falha in falhas:
+            print(f"  - {falha}")
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,174 @@
+# cache_respostas.py
+"""
+Cache local das respostas de timesheet da API.
+Guarda os registros de cada período comprimidos em SQLite, com TTL e limite de tamanho.
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import time
+import zlib
+from config import (
+    CACHE_RESPOSTAS_ARQUIVO,
+    CACHE_TTL_MES_ABERTO,
+    CACHE_TTL_MES_FECHADO,
+    CACHE_TAMANHO_MAXIMO_MB,
+)
+from decodificacao_json import carregar_json
+
+
+class CacheRespostas:
+
+    def __init__(self, arquivo=None, ttl_mes_aberto=None, ttl_mes_fechado=None, tamanho_maximo_mb=None):
+        self.arquivo = arquivo or CACHE_RESPOSTAS_ARQUIVO
+        self.ttl_mes_aberto = CACHE_TTL_MES_ABERTO if ttl_mes_aberto is None else ttl_mes_aberto
+        self.ttl_mes_fechado = CACHE_TTL_MES_FECHADO if ttl_mes_fechado is None else ttl_mes_fechado
+        tamanho_maximo_mb = CACHE_TAMANHO_MAXIMO_MB if tamanho_maximo_mb is None else tamanho_maximo_mb
+        self.tamanho_maximo = int(tamanho_maximo_mb * 1024 * 1024)
+        self._inicializado = False
+
+    @staticmethod
+    def gerar_chave(query, periodo):
+        return hashlib.sha256(f"{periodo}\n{query}".encode('utf-8')).hexdigest()
+
+    def buscar(self, chave):
+        """Devolve um iterador dos registros em cache, ou None se ausente/expirada."""
+        agora = time.time()
+        with self._conectar() as conn:
+            linha = conn.execute(
+                "SELECT conteudo, expira_em FROM respostas WHERE chave = ?", (chave,)
+            ).fetchone()
+            if linha is None:
+                return None
+
+            conteudo, expira_em = linha
+            if expira_em is not None and expira_em <= agora:
+                conn.execute("DELETE FROM respostas WHERE chave = ?", (chave,))
+                return None
+
+            conn.execute("UPDATE respostas SET acessado_em = ? WHERE chave = ?", (agora, chave))
+
+        return self._iterar_registros(bytes(conteudo))
+
+    @staticmethod
+    def _iterar_registros(conteudo, tamanho_bloco=64 * 1024):
+        # Descomprime em blocos, uma linha JSON por registro
+        descompressor = zlib.decompressobj()
+        resto = b""
+        for inicio in range(0, len(conteudo), tamanho_bloco):
+            resto += descompressor.decompress(conteudo[inicio:inicio + tamanho_bloco])
+            *linhas, resto = resto.split(b"\n")
+            for linha in linhas:
+                if linha:
+                    yield carregar_json(linha)
+        resto += descompressor.flush()
+        for linha in resto.split(b"\n"):
+            if linha:
+                yield carregar_json(linha)
+
+    def gravador(self, chave, periodo, periodo_fechado):
+        return _GravadorResposta(self, chave, periodo, periodo_fechado)
+
+    def remover(self, chave):
+        with self._conectar() as conn:
+            conn.execute("DELETE FROM respostas WHERE chave = ?", (chave,))
+
+    def _gravar(self, chave, periodo, conteudo, periodo_fechado):
+        agora = time.time()
+        ttl = self.ttl_mes_fechado if periodo_fechado else self.ttl_mes_aberto
+        if ttl <= 0 and not periodo_fechado:
+            return
+        # TTL 0 para meses fechados significa "não expira"
+        expira_em = agora + ttl if ttl > 0 else None
+
+        with self._conectar() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO respostas "
+                "(chave, periodo, criado_em, acessado_em, expira_em, tamanho, conteudo) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (chave, periodo, agora, agora, expira_em, len(conteudo), sqlite3.Binary(conteudo)),
+            )
+            self._expurgar(conn, agora)
+
+    def _expurgar(self, conn, agora):
+        conn.execute("DELETE FROM respostas WHERE expira_em IS NOT NULL AND expira_em <= ?", (agora,))
+
+        total = conn.execute("SELECT COALESCE(SUM(tamanho), 0) FROM respostas").fetchone()[0]
+        if total <= self.tamanho_maximo:
+            return
+
+        # Remove as entradas usadas há mais tempo até caber no limite
+        for chave, tamanho in conn.execute(
+            "SELECT chave, tamanho FROM respostas ORDER BY acessado_em ASC"
+        ).fetchall():
+            if total <= self.tamanho_maximo:
+                break
+            conn.execute("DELETE FROM respostas WHERE chave = ?", (chave,))
+            total -= tamanho
+
+    def _conectar(self):
+        # Uma conexão por operação: permite uso a partir de várias threads
+        if not self._inicializado:
+            diretorio = os.path.dirname(self.arquivo)
+            if diretorio:
+                os.makedirs(diretorio, mode=0o700, exist_ok=True)
+        conn = sqlite3.connect(self.arquivo, timeout=30)
+        if not self._inicializado:
+            with conn:
+                conn.execute(
+                    "CREATE TABLE IF NOT EXISTS respostas ("
+                    "chave TEXT PRIMARY KEY, periodo TEXT NOT NULL, criado_em REAL NOT NULL, "
+                    "acessado_em REAL NOT NULL, expira_em REAL, tamanho INTEGER NOT NULL, "
+                    "conteudo BLOB NOT NULL)"
+                )
+            self._inicializado = True
+        return ConexaoSQLite(conn)
+
+
+class ConexaoSQLite:
+    """Context manager que confirma a transação e fecha a conexão ao sair."""
+
+    def __init__(self, conn):
+        self.conn = conn
+
+    def __enter__(self):
+        return self.conn
+
+    def __exit__(self, tipo, valor, traceback):
+        try:
+            if tipo is None:
+                self.conn.commit()
+            else:
+                self.conn.rollback()
+        finally:
+            self.conn.close()
+        return False
+
+
+class _GravadorResposta:
+    """
+    Comprime os registros à medida que as páginas chegam, para não manter
+    a resposta inteira descomprimida em memória.
+    """
+
+    def __init__(self, cache, chave, periodo, periodo_fechado):
+        self.cache = cache
+        self.chave = chave
+        self.periodo = periodo
+        self.periodo_fechado = periodo_fechado
+        self._compressor = zlib.compressobj(6)
+        self._partes = []
+
+    def adicionar(self, registro):
+        linha = json.dumps(registro, ensure_ascii=False, separators=(',', ':')) + "\n"
+        parte = self._compressor.compress(linha.encode('utf-8'))
+        if parte:
+            self._partes.append(parte)
+
+    def concluir(self):
+        self._partes.append(self._compressor.flush())
+        conteudo = b"".join(self._partes)
+        self._partes = []
+        self.cache._gravar(self.chave, self.periodo, conteudo, self.periodo_fechado)
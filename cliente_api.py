@@ -4,91 +4,540 @@ Cliente para interação com a API GraphQL.
 Responsável por autenticação e consultas de dados.
 """
 
-import requests
-from datetime import datetime
-from config import API_URL, API_HEADERS, LOGIN_CREDENTIALS
+import base64
+import json
+import os
+import random
+import tempfile
+import threading
+import time
+from datetime import datetime, timedelta
+from config import (
+    API_URL,
+    API_HEADERS,
+    API_TAMANHO_PAGINA,
+    API_POOL_TAMANHO,
+    API_TIMEOUT_CONEXAO,
+    API_TIMEOUT_LEITURA,
+    API_MAX_TENTATIVAS,
+    API_BACKOFF_BASE,
+    API_BACKOFF_MAX,
+    API_FILTRO_SERVIDOR,
+    FILTRAR_POR_TAGS,
+    LOGIN_CREDENTIALS,
+    TAGS_INTERESSE,
+    TOKEN_CACHE_HABILITADO,
+    TOKEN_CACHE_ARQUIVO,
+    TOKEN_VALIDADE_PADRAO,
+    TOKEN_MARGEM_EXPIRACAO,
+    CACHE_RESPOSTAS_HABILITADO,
+    SINCRONIZACAO_INCREMENTAL,
+)
+from cache_respostas import CacheRespostas
+from repositorio_registros import RepositorioRegistros
+from metricas import METRICAS_DESLIGADAS
+from decodificacao_json import carregar_json, enxugar_registros
+
+# Projeção explícita da consulta de timesheet. dynamicFields/dynamicAssociations são
+# escalares JSON no esquema, então a projeção acontece no nível do registro.
+CAMPOS_TIMESHEET = ("id", "updatedAt", "dynamicFields", "dynamicAssociations")
+
+# Respostas transitórias que justificam repetir uma consulta
+STATUS_RETENTAVEIS = {429, 500, 502, 503, 504}
+
+# Trechos de mensagens de erro GraphQL que indicam token inválido ou expirado
+# O arquivo de cache de token é compartilhado por todos os clientes (perfis) do processo:
+# a leitura, alteração e regravação das entradas acontecem sob esta trava
+_TRAVA_TOKEN_CACHE = threading.Lock()
+
+INDICADORES_ERRO_AUTENTICACAO = (
+    "unauthorized", "unauthenticated", "not authenticated", "jwt", "invalid token", "token expired", "expired token",
+)
+
+# Códigos e trechos de mensagens de erro GraphQL que indicam consulta recusada pelo esquema
+# (campo ou argumento de filtro desconhecido), e não uma falha passageira do servidor
+CODIGOS_ERRO_ESQUEMA = ("graphql_validation_failed", "graphql_parse_failed")
+INDICADORES_ERRO_ESQUEMA = (
+    "cannot query field", "unknown argument", "unknown type", "is not defined by type", "syntax error",
+)
+
+
+def payload_login(credenciais):
+    """Mutation de login com as credenciais (email e password) informadas."""
+    return {
+        "query": """mutation login($email: String!, $password: String!) {
+            logIn(input: { email: $email, password: $password }) {
+                token
+                preAuthToken
+                email
+                role 
+            }
+        }""",
+        "variables": {
+            "email": credenciais["email"],
+            "password": credenciais["password"]
+        }
+    }
+
+
+def calcular_backoff(tentativa, retry_after=None):
+    """Espera antes da próxima tentativa: backoff exponencial com jitter completo, respeitando Retry-After numérico."""
+    espera = min(API_BACKOFF_MAX, API_BACKOFF_BASE * (2 ** (tentativa - 1)))
+    espera = random.uniform(0, espera)
+    try:
+        if retry_after is not None:
+            espera = max(espera, min(API_BACKOFF_MAX, float(retry_after)))
+    except ValueError:
+        pass
+    return espera
+
+
+def criar_sessao(tamanho_pool=None):
+    """
+    Cria uma sessão HTTP com keep-alive e pool de conexões, compartilhável
+    entre instâncias de ClienteAPI.
+    """
+    # requests só é importado quando a API é de fato consultada
+    import requests
+    from requests.adapters import HTTPAdapter
+
+    tamanho_pool = tamanho_pool or API_POOL_TAMANHO
+    sessao = requests.Session()
+    # As repetições são feitas em ClienteAPI._post, apenas para consultas idempotentes
+    adaptador = HTTPAdapter(pool_connections=tamanho_pool, pool_maxsize=tamanho_pool, max_retries=0)
+    sessao.mount("https://", adaptador)
+    sessao.mount("http://", adaptador)
+    return sessao
+
+
+class ErroConsultaGraphQL(Exception):
+    
+    def __init__(self, erros, de_esquema=False):
+        super().__init__(f"Erro na consulta GraphQL: {erros}")
+        self.erros = erros
+        self.de_esquema = de_esquema
+
+
+class ErroAutenticacao(Exception):
+    pass
+
+
+class PlanoBusca:
+    """
+    Como obter os registros de um período (ver `ClienteAPI.planejar_busca`): já prontos
+    em `registros` (cache de respostas) ou consultando a API a partir de `alterados_desde`
+    e passando as páginas recebidas por `concluir` (gravação no cache ou mescla no repositório).
+    """
+
+    def __init__(self, registros=None, alterados_desde=None, concluir=None):
+        self.registros = registros
+        self.alterados_desde = alterados_desde
+        self.concluir = concluir or (lambda registros: registros)
 
 
 class ClienteAPI:
     
-    def __init__(self):
+    def __init__(self, sessao=None, cache=None, repositorio=None, credenciais=None, tags_interesse=None,
+                 metricas=None):
         self.token = None
+        self.credenciais = dict(credenciais or LOGIN_CREDENTIALS)
         self.headers = API_HEADERS.copy()
+        # Criada sob demanda: períodos servidos do cache não abrem conexões
+        self._sessao = sessao
+        self.timeout = (API_TIMEOUT_CONEXAO, API_TIMEOUT_LEITURA)
+        # Serializa login/renovação quando o cliente é compartilhado entre threads
+        self._trava_login = threading.Lock()
+        self.filtro_servidor = API_FILTRO_SERVIDOR
+        self.filtrar_por_tags = FILTRAR_POR_TAGS
+        self.tags_interesse = list(TAGS_INTERESSE if tags_interesse is None else tags_interesse)
+        if cache is None and CACHE_RESPOSTAS_HABILITADO:
+            cache = CacheRespostas()
+        self.cache = cache
+        if repositorio is None and SINCRONIZACAO_INCREMENTAL:
+            repositorio = RepositorioRegistros()
+        self.repositorio = repositorio
+        self.metricas = metricas or METRICAS_DESLIGADAS
     
+    @property
+    def sessao(self):
+        if self._sessao is None:
+            self._sessao = criar_sessao()
+        return self._sessao
+
     def fazer_login(self):
-        login_payload = {
-            "query": """mutation login($email: String!, $password: String!) {
-                logIn(input: { email: $email, password: $password }) {
-                    token
-                    preAuthToken
-                    email
-                    role 
-                }
-            }""",
-            "variables": {
-                "email": LOGIN_CREDENTIALS["email"],
-                "password": LOGIN_CREDENTIALS["password"]
-            }
-        }
-        
         try:
-            response = requests.post(API_URL, headers=self.headers, json=login_payload)
-            response.raise_for_status()
-            
-            data = response.json()
-            if 'errors' in data:
-                raise Exception(f"Erro no login: {data['errors']}")
-                
-            self.token = data['data']['logIn']['token']
-            print("Login realizado com sucesso!")
-            print(f"Token obtido: {self.token[:20]}...{self.token[-10:] if len(self.token) > 30 else self.token}")
-            return self.token
+            with self.metricas.etapa('login'):
+                # A mutation de login não é repetida automaticamente
+                response = self._post(payload_login(self.credenciais), self.headers, idempotente=False)
+                response.raise_for_status()
+                data = response.json()
+            return self.registrar_login(data)
             
         except Exception as e:
             print(f"Erro ao fazer login: {e}")
             raise
     
+    def registrar_login(self, data):
+        """Guarda (em memória e no cache de token) o token da resposta do login e o devolve."""
+        if 'errors' in data:
+            raise Exception(f"Erro no login: {data['errors']}")
+        
+        self.token = data['data']['logIn']['token']
+        print("Login realizado com sucesso!")
+        print(f"Token obtido: {self.token[:20]}...{self.token[-10:] if len(self.token) > 30 else self.token}")
+        self._salvar_token_cache(self.token)
+        return self.token
+    
+    def garantir_login(self):
+        """
+        Reaproveita o token em memória ou do cache local enquanto não estiver
+        perto de expirar; caso contrário, faz um novo login.
+        """
+        with self._trava_login:
+            if self.token:
+                return self.token
+
+            token = self.carregar_token_cache()
+            if token:
+                self.token = token
+                print("Token reaproveitado do cache local.")
+                return self.token
+
+            return self.fazer_login()
+
+    def _chave_token_cache(self):
+        return f"{API_URL}|{self.credenciais['email']}"
+
+    def _ler_arquivo_token_cache(self):
+        try:
+            with open(TOKEN_CACHE_ARQUIVO, encoding='utf-8') as arquivo:
+                conteudo = json.load(arquivo)
+            return conteudo if isinstance(conteudo, dict) else {}
+        except (OSError, ValueError):
+            return {}
+
+    def carregar_token_cache(self):
+        """Token da conta guardado no cache local, se ainda não estiver perto de expirar."""
+        if not TOKEN_CACHE_HABILITADO:
+            return None
+
+        entrada = self._ler_arquivo_token_cache().get(self._chave_token_cache())
+        if not entrada:
+            return None
+
+        if entrada.get('expira_em', 0) - TOKEN_MARGEM_EXPIRACAO <= time.time():
+            return None
+        return entrada.get('token')
+
+    def _salvar_token_cache(self, token):
+        if not TOKEN_CACHE_HABILITADO:
+            return
+
+        with _TRAVA_TOKEN_CACHE:
+            conteudo = self._ler_arquivo_token_cache()
+            # Remove entradas vencidas de outras contas/URLs
+            agora = time.time()
+            conteudo = {k: v for k, v in conteudo.items() if v.get('expira_em', 0) > agora}
+            conteudo[self._chave_token_cache()] = {
+                'token': token,
+                'expira_em': self._expiracao_token(token),
+            }
+
+            try:
+                self._gravar_arquivo_privado(TOKEN_CACHE_ARQUIVO, json.dumps(conteudo))
+            except OSError as e:
+                print(f"Não foi possível gravar o cache de token: {e}")
+
+    def invalidar_token_cache(self):
+        """Descarta o token em memória e o da conta no cache local (token recusado pela API)."""
+        self.token = None
+        with _TRAVA_TOKEN_CACHE:
+            conteudo = self._ler_arquivo_token_cache()
+            if conteudo.pop(self._chave_token_cache(), None) is not None:
+                try:
+                    self._gravar_arquivo_privado(TOKEN_CACHE_ARQUIVO, json.dumps(conteudo))
+                except OSError:
+                    pass
+
+    @staticmethod
+    def _gravar_arquivo_privado(caminho, texto):
+        # Diretório 0700 e arquivo 0600, com troca atômica para não deixar cache truncado
+        diretorio = os.path.dirname(caminho)
+        if diretorio:
+            os.makedirs(diretorio, mode=0o700, exist_ok=True)
+        # Temporário de nome único (e já 0600), para threads e processos não gravarem no mesmo
+        fd, temporario = tempfile.mkstemp(dir=diretorio or None, prefix=os.path.basename(caminho) + ".", suffix=".tmp")
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as arquivo:
+                arquivo.write(texto)
+            os.replace(temporario, caminho)
+        except BaseException:
+            os.unlink(temporario)
+            raise
+
+    @staticmethod
+    def _expiracao_token(token):
+        # Usa o campo `exp` do JWT quando o token puder ser decodificado
+        try:
+            payload = token.split('.')[1]
+            payload += '=' * (-len(payload) % 4)
+            exp = json.loads(base64.urlsafe_b64decode(payload)).get('exp')
+            if exp:
+                return float(exp)
+        except (IndexError, ValueError, AttributeError, TypeError):
+            pass
+        return time.time() + TOKEN_VALIDADE_PADRAO
+
     def buscar_dados_timesheet(self, data_inicio, data_fim):
         if not self.token:
             raise Exception("Token não encontrado. Faça login primeiro.")
         
+        records, _ = self._consultar_com_fallback(data_inicio, data_fim)
+        print(f"Dados recuperados com sucesso! Total de registros: {records['count']}")
+        return records['data']
+
+    def buscar_dados_timesheet_paginado(self, data_inicio, data_fim, tamanho_pagina=None, atualizar=False):
+        """
+        Percorre a consulta `records` página a página e devolve um gerador de registros,
+        mantendo em memória apenas a página corrente.
+
+        Com a sincronização incremental habilitada, usa o repositório local de registros
+        (ver `sincronizar_timesheet`). Senão, com o cache de respostas habilitado, períodos
+        já consultados são servidos localmente (sem login nem rede); `atualizar=True`
+        ignora o cache e o regrava.
+        O login é feito sob demanda, apenas quando a API precisa ser consultada.
+        """
+        tamanho_pagina = tamanho_pagina or API_TAMANHO_PAGINA
+        if tamanho_pagina <= 0:
+            raise ValueError("O tamanho da página deve ser maior que zero.")
+
+        plano = self.planejar_busca(data_inicio, data_fim, atualizar)
+        if plano.registros is not None:
+            return plano.registros
+
+        self.garantir_login()
+        return plano.concluir(
+            self._iterar_paginas(data_inicio, data_fim, tamanho_pagina, alterados_desde=plano.alterados_desde)
+        )
+
+    def planejar_busca(self, data_inicio, data_fim, atualizar=False, repositorio=None):
+        """
+        Decide, sem acessar a API, de onde vêm os registros do período: o repositório de
+        sincronização incremental (só os alterados desde a marca d'água), o cache de
+        respostas (sem consulta, ou com gravação das páginas recebidas) ou a API direto.
+        Usado pelos clientes síncrono e assíncrono.
+        """
+        repositorio = self.repositorio if repositorio is None else repositorio
+        periodo = self._chave_periodo(data_inicio, data_fim)
+
+        if repositorio is not None:
+            if atualizar:
+                repositorio.limpar_periodo(periodo)
+            marca = repositorio.marca_dagua(periodo)
+            if marca:
+                print(f"Sincronizando registros alterados desde {marca}...")
+            else:
+                print("Primeira sincronização do período: buscando todos os registros...")
+
+            def mesclar(alterados):
+                print(f"Registros novos ou alterados: {repositorio.mesclar(periodo, alterados)}")
+                return repositorio.registros(periodo)
+
+            return PlanoBusca(alterados_desde=marca, concluir=mesclar)
+
+        if self.cache is None:
+            return PlanoBusca()
+
+        chave = self.cache.gerar_chave(self.query_timesheet(data_inicio, data_fim)['query'], periodo)
+        if not atualizar:
+            registros = self.cache.buscar(chave)
+            if registros is not None:
+                print(f"Dados do período {data_inicio} a {data_fim} obtidos do cache local.")
+                self.metricas.incrementar('periodos_do_cache')
+                return PlanoBusca(registros=registros)
+
+        periodo_fechado = datetime.strptime(data_fim, "%d/%m/%Y").date() < datetime.today().date()
+        gravador = self.cache.gravador(chave, periodo, periodo_fechado)
+        return PlanoBusca(concluir=lambda registros: self._iterar_e_gravar(registros, gravador))
+
+    def _chave_periodo(self, data_inicio, data_fim):
+        # Inclui a conta: perfis diferentes podem consultar o mesmo período
+        return f"{self.credenciais['email']}|{data_inicio}-{data_fim}"
+
+    @staticmethod
+    def _iterar_e_gravar(registros, gravador):
+        for registro in registros:
+            gravador.adicionar(registro)
+            yield registro
+        # Só grava no cache se o período foi lido até o fim
+        gravador.concluir()
+
+    def sincronizar_timesheet(self, data_inicio, data_fim, repositorio, tamanho_pagina=None, atualizar=False):
+        """
+        Sincroniza o período com o repositório local buscando apenas os registros
+        alterados desde a última marca d'água de `updatedAt`, e devolve um iterador
+        com todos os registros do período já mesclados.
+
+        `atualizar=True` descarta o período local e refaz a sincronização completa
+        (necessário para refletir registros excluídos na API).
+        """
+        tamanho_pagina = tamanho_pagina or API_TAMANHO_PAGINA
+        if tamanho_pagina <= 0:
+            raise ValueError("O tamanho da página deve ser maior que zero.")
+
+        plano = self.planejar_busca(data_inicio, data_fim, atualizar, repositorio=repositorio)
+        self.garantir_login()
+        return plano.concluir(
+            self._iterar_paginas(data_inicio, data_fim, tamanho_pagina, alterados_desde=plano.alterados_desde)
+        )
+
+    def _iterar_paginas(self, data_inicio, data_fim, tamanho_pagina, alterados_desde=None):
+        # O filtro (no servidor ou por mês) é decidido na primeira página e mantido
+        # nas seguintes, para não misturar os deslocamentos de consultas diferentes
+        records, filtro_servidor = self._consultar_com_fallback(
+            data_inicio, data_fim, limite=tamanho_pagina, alterados_desde=alterados_desde
+        )
+        total = records['count']
+        print(f"Total de registros no período: {total} (páginas de {tamanho_pagina})")
+        vistos = set()
+
+        # As páginas vêm ordenadas por id, que não muda quando um registro é editado durante
+        # a leitura. Registros que entram no filtro no meio da leitura ainda deslocam os
+        # seguintes: os repetidos são descartados e, se o `count` mais recente passar do
+        # total lido, o período é relido uma vez.
+        for releitura in (False, True):
+            deslocamento = 0
+            while True:
+                if deslocamento or releitura:
+                    records = self._consultar_autenticado(self.query_timesheet(
+                        data_inicio, data_fim, tamanho_pagina, deslocamento, alterados_desde,
+                        filtro_servidor=filtro_servidor
+                    ))
+                pagina = records['data'] or []
+                total = records['count']
+
+                self.metricas.incrementar('paginas')
+                self.metricas.incrementar('registros_api', len(pagina))
+                for registro in pagina:
+                    if registro['id'] not in vistos:
+                        vistos.add(registro['id'])
+                        yield registro
+
+                deslocamento += len(pagina)
+                if len(pagina) < tamanho_pagina or deslocamento >= total:
+                    break
+
+            if len(vistos) >= total or releitura:
+                break
+            print(f"Registros lidos ({len(vistos)}) abaixo do total ({total}): relendo o período...")
+
+        print(f"Dados recuperados com sucesso! Registros lidos: {len(vistos)}")
+
+    def _consultar_com_fallback(self, data_inicio, data_fim, limite=None, alterados_desde=None):
+        """
+        Consulta a primeira página do período e devolve `(records, filtro_servidor)`, indicando
+        se os filtros foram aplicados no servidor: as páginas seguintes devem usar o mesmo.
+        """
+        if self.filtro_servidor:
+            try:
+                return self._consultar_autenticado(
+                    self.query_timesheet(data_inicio, data_fim, limite, 0, alterados_desde, filtro_servidor=True)
+                ), True
+            except ErroConsultaGraphQL as e:
+                # Só uma recusa do esquema justifica abandonar os filtros; outros erros sobem
+                if not e.de_esquema:
+                    raise
+                # O esquema não aceitou os filtros: volta para o filtro por mês e
+                # deixa o recorte exato de datas/tags para o ProcessarDados.
+                print(f"Filtro no servidor indisponível ({e}). Usando filtro por mês.")
+                self.filtro_servidor = False
+
+        return self._consultar_autenticado(
+            self.query_timesheet(data_inicio, data_fim, limite, 0, filtro_servidor=False)
+        ), False
+
+    def query_timesheet(self, data_inicio, data_fim, limite=None, deslocamento=None, alterados_desde=None,
+                        filtro_servidor=None):
+        """
+        Payload da consulta `records` do período. Sem `filtro_servidor`, vale o do cliente:
+        janela exata de datas (e tags) no servidor, ou apenas o mês.
+        """
         data_inicio_dt = datetime.strptime(data_inicio, "%d/%m/%Y")
-        
-        periodo = data_inicio_dt.strftime("%Y-%m")
-        
-        query_payload = {
+        data_fim_dt = datetime.strptime(data_fim, "%d/%m/%Y")
+        if filtro_servidor is None:
+            filtro_servidor = self.filtro_servidor
+
+        # Sem filtro no servidor, a sincronização incremental também vira uma leitura completa
+        filtro_alteracao = ""
+        if alterados_desde and filtro_servidor:
+            # `gte` para não perder registros com o mesmo `updatedAt` da marca; o repositório deduplica
+            filtro_alteracao = "\n                    updatedAt_gte: %s" % json.dumps(alterados_desde)
+
+        if filtro_servidor:
+            # Janela exata [início, dia seguinte ao fim) sobre datas ISO
+            filtros = [
+                'start_date_gte: %s' % json.dumps(data_inicio_dt.strftime("%Y-%m-%d")),
+                'start_date_lt: %s' % json.dumps((data_fim_dt + timedelta(days=1)).strftime("%Y-%m-%d")),
+            ]
+            if self.filtrar_por_tags:
+                filtros.append('tag_in: %s' % json.dumps(self.tags_interesse))
+        else:
+            filtros = ['start_date_regex: %s' % json.dumps(data_inicio_dt.strftime("%Y-%m"))]
+
+        argumentos = ""
+        if limite is not None:
+            argumentos = f" limit: {int(limite)} offset: {int(deslocamento or 0)}"
+
+        # Ordem por id, estável mesmo com registros editados durante a paginação
+        return {
             "query": """{
                 records(where: { 
                     sheet: { key_regex: "timesheet" } 
-                    dynamicFields: { start_date_regex: "%s"}
-                } order: { updatedAt: DESC}) {
+                    dynamicFields: { %s }%s
+                } order: { id: ASC }%s) {
                     count
                     data {
-                        id
-                        dynamicFields
-                        dynamicAssociations
+                        %s
                     }
                 }
-            }""" % periodo,
+            }""" % (" ".join(filtros), filtro_alteracao, argumentos, "\n                        ".join(CAMPOS_TIMESHEET)),
             "variables": {}
         }
 
+    def _consultar_autenticado(self, query_payload):
+        token_usado = self.token
+        try:
+            return self._consultar_records(query_payload)
+        except ErroAutenticacao as e:
+            # Token expirado ou revogado: descarta o cache, refaz o login e repete uma vez.
+            # Se outra thread já renovou o token, apenas repete a consulta.
+            with self._trava_login:
+                if self.token == token_usado:
+                    print(f"Token recusado pela API ({e}). Refazendo login...")
+                    self.invalidar_token_cache()
+                    self.fazer_login()
+            return self._consultar_records(query_payload)
+
+    def _consultar_records(self, query_payload):
+        import requests
+
         headers_auth = self.headers.copy()
         headers_auth['Authorization'] = self.token
         
         try:
             print("Enviando requisição com autenticação padrão...")
-            response = requests.post(API_URL, headers=headers_auth, json=query_payload)
+            response = self._post(query_payload, headers_auth, idempotente=True)
 
+            if response.status_code in (401, 403):
+                raise ErroAutenticacao(f"status {response.status_code}")
             if response.status_code == 200:
-                data = response.json()
-                if 'errors' not in data:
-                    print(f"Dados recuperados com sucesso! Total de registros: {data['data']['records']['count']}")
-                    return data['data']['records']['data']
-                else:
-                    print(f"Erro na consulta: {data['errors']}")
+                with self.metricas.etapa('decodificar_json'):
+                    data = carregar_json(response.content)
+                return self.extrair_records(data)
             else:
                 print(f"Status {response.status_code} na resposta da API.")
+        except (ErroConsultaGraphQL, ErroAutenticacao):
+            raise
         except requests.exceptions.HTTPError as e:
             print(f"Erro HTTP: {e}")
             raise
@@ -96,3 +545,65 @@ class ClienteAPI:
             print(f"Erro geral: {e}")
             raise
         raise Exception("Erro ao buscar dados do timesheet.")
+
+    def extrair_records(self, data):
+        """`records` de uma resposta 200 da consulta, ou o erro GraphQL correspondente."""
+        if 'errors' not in data:
+            records = data['data']['records']
+            records['data'] = enxugar_registros(records['data'])
+            return records
+        if self._erro_de_autenticacao(data['errors']):
+            raise ErroAutenticacao(data['errors'])
+        print(f"Erro na consulta: {data['errors']}")
+        raise ErroConsultaGraphQL(data['errors'], de_esquema=self._erro_de_esquema(data['errors']))
+
+    @staticmethod
+    def _erro_de_autenticacao(erros):
+        for erro in erros or []:
+            mensagem = str(erro.get('message', '') if isinstance(erro, dict) else erro).lower()
+            codigo = str((erro.get('extensions') or {}).get('code', '') if isinstance(erro, dict) else '').lower()
+            if codigo in ('unauthenticated', 'unauthorized', 'forbidden'):
+                return True
+            if any(indicador in mensagem for indicador in INDICADORES_ERRO_AUTENTICACAO):
+                return True
+        return False
+
+    @staticmethod
+    def _erro_de_esquema(erros):
+        for erro in erros or []:
+            mensagem = str(erro.get('message', '') if isinstance(erro, dict) else erro).lower()
+            codigo = str((erro.get('extensions') or {}).get('code', '') if isinstance(erro, dict) else '').lower()
+            if codigo in CODIGOS_ERRO_ESQUEMA:
+                return True
+            if any(indicador in mensagem for indicador in INDICADORES_ERRO_ESQUEMA):
+                return True
+        return False
+
+    def _post(self, payload, headers, idempotente):
+        import requests
+
+        tentativas = API_MAX_TENTATIVAS if idempotente else 1
+
+        for tentativa in range(1, tentativas + 1):
+            ultima = tentativa == tentativas
+            try:
+                with self.metricas.etapa('requisicao_api'):
+                    response = self.sessao.post(API_URL, headers=headers, json=payload, timeout=self.timeout)
+            except (requests.exceptions.ConnectionError, requests.exceptions.Timeout) as e:
+                if ultima:
+                    raise
+                print(f"Falha de conexão ({e.__class__.__name__}), tentativa {tentativa}/{tentativas}.")
+                self._aguardar_backoff(tentativa)
+                continue
+
+            self.metricas.incrementar('requisicoes')
+            self.metricas.incrementar('bytes_baixados', len(response.content))
+            if response.status_code in STATUS_RETENTAVEIS and not ultima:
+                print(f"Status {response.status_code} na resposta da API, tentativa {tentativa}/{tentativas}.")
+                self._aguardar_backoff(tentativa, response.headers.get('Retry-After'))
+                continue
+
+            return response
+
+    def _aguardar_backoff(self, tentativa, retry_after=None):
+        time.sleep(calcular_backoff(tentativa, retry_after))
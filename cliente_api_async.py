@@ -0,0 +1,233 @@
+# cliente_api_async.py
+"""
+Cliente assíncrono para a API GraphQL (aiohttp).
+Permite buscar vários períodos e perfis ao mesmo tempo em um único event loop,
+com limite de requisições simultâneas e de conexões por host.
+"""
+
+import asyncio
+import time
+from cliente_api import ErroConsultaGraphQL, ErroAutenticacao, STATUS_RETENTAVEIS, payload_login, calcular_backoff
+from decodificacao_json import carregar_json
+from config import (
+    API_URL,
+    API_TAMANHO_PAGINA,
+    API_POOL_TAMANHO,
+    API_TIMEOUT_CONEXAO,
+    API_TIMEOUT_LEITURA,
+    API_MAX_TENTATIVAS,
+    API_REQUISICOES_SIMULTANEAS,
+    API_CONEXOES_POR_HOST,
+)
+
+
+def _importar_aiohttp():
+    # Dependência opcional: só é exigida quando o modo assíncrono é usado
+    try:
+        import aiohttp
+    except ImportError:
+        raise ImportError("O cliente assíncrono requer o pacote aiohttp (pip install aiohttp).")
+    return aiohttp
+
+
+def criar_sessao_assincrona(tamanho_pool=None, conexoes_por_host=None):
+    """
+    Cria uma sessão aiohttp com pool de conexões limitado no total e por host.
+    Deve ser chamada (e fechada) dentro do event loop que fará as requisições.
+    """
+    aiohttp = _importar_aiohttp()
+    conector = aiohttp.TCPConnector(
+        limit=tamanho_pool or API_POOL_TAMANHO,
+        limit_per_host=conexoes_por_host or API_CONEXOES_POR_HOST,
+    )
+    timeout = aiohttp.ClientTimeout(sock_connect=API_TIMEOUT_CONEXAO, sock_read=API_TIMEOUT_LEITURA)
+    return aiohttp.ClientSession(connector=conector, timeout=timeout)
+
+
+class ClienteAPIAssincrono:
+    """
+    Faz, com aiohttp, as requisições de um ClienteAPI: `fazer_login` e
+    `buscar_dados_timesheet` são corrotinas. Credenciais, token (e seu cache), montagem
+    das consultas, cache de respostas, repositório de sincronização incremental e
+    métricas são os do ClienteAPI informado.
+    """
+
+    def __init__(self, cliente, sessao, semaforo=None):
+        self.cliente = cliente
+        self.sessao = sessao
+        # O semáforo pode ser compartilhado entre clientes para limitar o total de requisições
+        self._semaforo = semaforo or asyncio.Semaphore(API_REQUISICOES_SIMULTANEAS)
+        self._trava_login = asyncio.Lock()
+
+    async def fazer_login(self):
+        try:
+            # A mutation de login não é repetida automaticamente
+            inicio = time.perf_counter()
+            status, data = await self._post(
+                payload_login(self.cliente.credenciais), self.cliente.headers, idempotente=False
+            )
+            self.cliente.metricas.registrar_etapa('login', time.perf_counter() - inicio)
+            if status != 200:
+                raise Exception(f"Status {status} na resposta do login.")
+            return self.cliente.registrar_login(data)
+
+        except Exception as e:
+            print(f"Erro ao fazer login: {e}")
+            raise
+
+    async def garantir_login(self):
+        async with self._trava_login:
+            if self.cliente.token:
+                return self.cliente.token
+
+            token = await asyncio.to_thread(self.cliente.carregar_token_cache)
+            if token:
+                self.cliente.token = token
+                print("Token reaproveitado do cache local.")
+                return token
+
+            return await self.fazer_login()
+
+    async def buscar_dados_timesheet(self, data_inicio, data_fim, tamanho_pagina=None, atualizar=False):
+        """
+        Devolve a lista de registros do período. As páginas após a primeira são
+        buscadas ao mesmo tempo; cache de respostas e sincronização incremental seguem
+        `ClienteAPI.planejar_busca`, como em `ClienteAPI.buscar_dados_timesheet_paginado`.
+        """
+        tamanho_pagina = tamanho_pagina or API_TAMANHO_PAGINA
+        if tamanho_pagina <= 0:
+            raise ValueError("O tamanho da página deve ser maior que zero.")
+
+        # Cache e repositório são SQLite com compressão: o trabalho síncrono roda em uma
+        # thread para não travar o event loop enquanto outros períodos são buscados
+        plano = await asyncio.to_thread(self.cliente.planejar_busca, data_inicio, data_fim, atualizar)
+        if plano.registros is not None:
+            return await asyncio.to_thread(list, plano.registros)
+
+        await self.garantir_login()
+        registros = await self._buscar_paginas(
+            data_inicio, data_fim, tamanho_pagina, alterados_desde=plano.alterados_desde
+        )
+        return await asyncio.to_thread(lambda: list(plano.concluir(registros)))
+
+    async def _buscar_paginas(self, data_inicio, data_fim, tamanho_pagina, alterados_desde=None):
+        # A primeira página informa o total; as demais são pedidas em paralelo.
+        # O filtro decidido na primeira página vale para as demais (ver ClienteAPI._iterar_paginas)
+        primeira, filtro_servidor = await self._consultar_com_fallback(
+            data_inicio, data_fim, limite=tamanho_pagina, alterados_desde=alterados_desde
+        )
+        total = primeira['count']
+        print(f"Total de registros no período: {total} (páginas de {tamanho_pagina})")
+
+        def consultar(deslocamento):
+            return self._consultar_autenticado(self.cliente.query_timesheet(
+                data_inicio, data_fim, tamanho_pagina, deslocamento, alterados_desde,
+                filtro_servidor=filtro_servidor
+            ))
+
+        # Como em ClienteAPI._iterar_paginas: ids repetidos são descartados e, se faltarem
+        # registros frente ao `count` mais recente, o período é relido uma vez
+        registros = {}
+        paginas = [primeira]
+        for releitura in (False, True):
+            if len(primeira['data'] or []) == tamanho_pagina and total > tamanho_pagina:
+                paginas += await asyncio.gather(*(
+                    consultar(deslocamento) for deslocamento in range(tamanho_pagina, total, tamanho_pagina)
+                ))
+            for pagina in paginas:
+                self.cliente.metricas.incrementar('paginas')
+                self.cliente.metricas.incrementar('registros_api', len(pagina['data'] or []))
+                for registro in pagina['data'] or []:
+                    registros.setdefault(registro['id'], registro)
+            total = paginas[-1]['count']
+
+            if len(registros) >= total or releitura:
+                break
+            print(f"Registros lidos ({len(registros)}) abaixo do total ({total}): relendo o período...")
+            primeira = await consultar(0)
+            total = primeira['count']
+            paginas = [primeira]
+
+        print(f"Dados recuperados com sucesso! Registros lidos: {len(registros)}")
+        return list(registros.values())
+
+    async def _consultar_com_fallback(self, data_inicio, data_fim, limite=None, alterados_desde=None):
+        # Primeira página e filtro usado, como em ClienteAPI._consultar_com_fallback
+        cliente = self.cliente
+        if cliente.filtro_servidor:
+            try:
+                return await self._consultar_autenticado(
+                    cliente.query_timesheet(data_inicio, data_fim, limite, 0, alterados_desde, filtro_servidor=True)
+                ), True
+            except ErroConsultaGraphQL as e:
+                if not e.de_esquema:
+                    raise
+                if cliente.filtro_servidor:
+                    print(f"Filtro no servidor indisponível ({e}). Usando filtro por mês.")
+                    cliente.filtro_servidor = False
+
+        return await self._consultar_autenticado(
+            cliente.query_timesheet(data_inicio, data_fim, limite, 0, filtro_servidor=False)
+        ), False
+
+    async def _consultar_autenticado(self, query_payload):
+        token_usado = self.cliente.token
+        try:
+            return await self._consultar_records(query_payload)
+        except ErroAutenticacao as e:
+            # Token recusado: só a primeira corrotina a perceber refaz o login
+            async with self._trava_login:
+                if self.cliente.token == token_usado:
+                    print(f"Token recusado pela API ({e}). Refazendo login...")
+                    await asyncio.to_thread(self.cliente.invalidar_token_cache)
+                    await self.fazer_login()
+            return await self._consultar_records(query_payload)
+
+    async def _consultar_records(self, query_payload):
+        headers_auth = self.cliente.headers.copy()
+        headers_auth['Authorization'] = self.cliente.token
+
+        print("Enviando requisição com autenticação padrão...")
+        status, data = await self._post(query_payload, headers_auth, idempotente=True)
+
+        if status in (401, 403):
+            raise ErroAutenticacao(f"status {status}")
+        if status != 200:
+            print(f"Status {status} na resposta da API.")
+            raise Exception("Erro ao buscar dados do timesheet.")
+        return self.cliente.extrair_records(data)
+
+    async def _post(self, payload, headers, idempotente):
+        aiohttp = _importar_aiohttp()
+        metricas = self.cliente.metricas
+        tentativas = API_MAX_TENTATIVAS if idempotente else 1
+
+        for tentativa in range(1, tentativas + 1):
+            ultima = tentativa == tentativas
+            try:
+                async with self._semaforo:
+                    inicio = time.perf_counter()
+                    async with self.sessao.post(API_URL, headers=headers, json=payload) as response:
+                        status = response.status
+                        retry_after = response.headers.get('Retry-After')
+                        corpo = await response.read()
+                    metricas.registrar_etapa('requisicao_api', time.perf_counter() - inicio)
+            except (aiohttp.ClientConnectionError, asyncio.TimeoutError) as e:
+                if ultima:
+                    raise
+                print(f"Falha de conexão ({e.__class__.__name__}), tentativa {tentativa}/{tentativas}.")
+                await asyncio.sleep(calcular_backoff(tentativa))
+                continue
+
+            metricas.incrementar('requisicoes')
+            metricas.incrementar('bytes_baixados', len(corpo))
+            if status in STATUS_RETENTAVEIS and not ultima:
+                print(f"Status {status} na resposta da API, tentativa {tentativa}/{tentativas}.")
+                await asyncio.sleep(calcular_backoff(tentativa, retry_after))
+                continue
+
+            data = None
+            if status == 200:
+                with metricas.etapa('decodificar_json'):
+                    data = carregar_json(corpo)
+            return status, data
@@ -11,7 +11,7 @@ from dotenv import load_dotenv
 
 load_dotenv()
 
-API_URL = "https://digitalize.oxean.com.br/graphql"
+API_URL = os.getenv("API_URL") or "https://digitalize.oxean.com.br/graphql"
 API_HEADERS = {
     'Content-Type': 'application/json'
 }
@@ -45,7 +45,7 @@ PDF_CONFIG = {
     }
 }
 
-TAGS_INTERESSE = os.getenv("TAGS_INTERESSE", "development,meeting").split(",")
+TAGS_INTERESSE = [t.strip() for t in os.getenv("TAGS_INTERESSE", "development,meeting").split(",") if t.strip()]
 
 # Horas extras manuais (podem variar por mês), padrão 0.0
 def _env_float(name: str, default: float = 0.0) -> float:
@@ -55,10 +55,117 @@ def _env_float(name: str, default: float = 0.0) -> float:
     except Exception:
         return default
 
+def _env_int(name: str, default: int = 0) -> int:
+    try:
+        val = os.getenv(name)
+        return int(val) if val not in (None, "") else default
+    except ValueError:
+        return default
+
 HORAS_EXTRA = _env_float("HORAS_EXTRA", 0.0)
 INTERNET_VALOR = _env_float("INTERNET_VALOR", 120.0)
 TRANSPORTE_VALOR = _env_float("TRANSPORTE_VALOR", 160.0)
 
+# Quantidade de registros por página na consulta de timesheet
+API_TAMANHO_PAGINA = _env_int("API_TAMANHO_PAGINA", 500)
+
+def _env_bool(name: str, default: bool = False) -> bool:
+    val = os.getenv(name)
+    if val in (None, ""):
+        return default
+    return val.strip().lower() in ("1", "true", "sim", "yes", "on")
+
+# Conexão HTTP: tamanho do pool, timeouts (segundos) e repetições com backoff
+API_POOL_TAMANHO = _env_int("API_POOL_TAMANHO", 10)
+API_TIMEOUT_CONEXAO = _env_float("API_TIMEOUT_CONEXAO", 5.0)
+API_TIMEOUT_LEITURA = _env_float("API_TIMEOUT_LEITURA", 60.0)
+API_MAX_TENTATIVAS = max(1, _env_int("API_MAX_TENTATIVAS", 4))
+API_BACKOFF_BASE = _env_float("API_BACKOFF_BASE", 0.5)
+API_BACKOFF_MAX = _env_float("API_BACKOFF_MAX", 30.0)
+
+# Cache local do token de autenticação (evita um login por execução)
+TOKEN_CACHE_HABILITADO = _env_bool("TOKEN_CACHE_HABILITADO", True)
+TOKEN_CACHE_ARQUIVO = os.path.expanduser(
+    os.getenv("TOKEN_CACHE_ARQUIVO") or os.path.join("~", ".cache", "gerador-fatura", "token.json")
+)
+# Validade assumida (segundos) quando o token não é um JWT com `exp`
+TOKEN_VALIDADE_PADRAO = _env_int("TOKEN_VALIDADE_PADRAO", 3600)
+# Renova o token quando faltar menos que isso (segundos) para expirar
+TOKEN_MARGEM_EXPIRACAO = _env_int("TOKEN_MARGEM_EXPIRACAO", 120)
+
+# Cache local das respostas de timesheet (SQLite comprimido)
+CACHE_RESPOSTAS_HABILITADO = _env_bool("CACHE_RESPOSTAS_HABILITADO", True)
+CACHE_RESPOSTAS_ARQUIVO = os.path.expanduser(
+    os.getenv("CACHE_RESPOSTAS_ARQUIVO") or os.path.join("~", ".cache", "gerador-fatura", "respostas.sqlite3")
+)
+# TTL em segundos; 0 desativa o cache do mês corrente e, para meses fechados, significa "sem expiração"
+CACHE_TTL_MES_ABERTO = _env_int("CACHE_TTL_MES_ABERTO", 900)
+CACHE_TTL_MES_FECHADO = _env_int("CACHE_TTL_MES_FECHADO", 0)
+CACHE_TAMANHO_MAXIMO_MB = _env_float("CACHE_TAMANHO_MAXIMO_MB", 200.0)
+
+# Não gera de novo um PDF cujas entradas (resultados, dados da fatura, taxa, adicionais
+# e horas do mês) não mudaram desde a última geração
+PDF_CACHE_HABILITADO = _env_bool("PDF_CACHE_HABILITADO", True)
+
+# Sincronização incremental: mantém os registros de cada período em um repositório local
+# e busca apenas os alterados desde a última sincronização (marca d'água de `updatedAt`)
+SINCRONIZACAO_INCREMENTAL = _env_bool("SINCRONIZACAO_INCREMENTAL", False)
+REPOSITORIO_REGISTROS_ARQUIVO = os.path.expanduser(
+    os.getenv("REPOSITORIO_REGISTROS_ARQUIVO") or os.path.join("~", ".cache", "gerador-fatura", "registros.sqlite3")
+)
+
+# Histórico colunar (opcional, requer pyarrow): grava os registros normalizados de cada período
+# em uma partição Arrow/Parquet, para refazer faturas (--do-historico) e consultar horas sem a API
+HISTORICO_COLUNAR_HABILITADO = _env_bool("HISTORICO_COLUNAR_HABILITADO", False)
+HISTORICO_COLUNAR_DIRETORIO = os.path.expanduser(
+    os.getenv("HISTORICO_COLUNAR_DIRETORIO") or os.path.join("~", ".cache", "gerador-fatura", "historico")
+)
+# "arrow" (IPC sem compressão, lido direto do arquivo mapeado em memória) ou "parquet" (comprimido)
+HISTORICO_COLUNAR_FORMATO = (os.getenv("HISTORICO_COLUNAR_FORMATO") or "arrow").strip().lower()
+
+# Agregados mensais por task (SQLite), atualizados a cada período processado e lidos pelo --resumo
+ROLLUP_MENSAL_HABILITADO = _env_bool("ROLLUP_MENSAL_HABILITADO", True)
+ROLLUP_MENSAL_ARQUIVO = os.path.expanduser(
+    os.getenv("ROLLUP_MENSAL_ARQUIVO") or os.path.join("~", ".cache", "gerador-fatura", "rollup.sqlite3")
+)
+
+# Geração em lote (--from/--to): períodos buscados ao mesmo tempo
+LOTE_BUSCAS_SIMULTANEAS = max(1, _env_int("LOTE_BUSCAS_SIMULTANEAS", 4))
+# Busca dos períodos do lote com o cliente assíncrono (requer aiohttp)
+API_ASSINCRONO = _env_bool("API_ASSINCRONO", False)
+# Cliente assíncrono: requisições em andamento ao mesmo tempo e conexões por host
+API_REQUISICOES_SIMULTANEAS = max(1, _env_int("API_REQUISICOES_SIMULTANEAS", 8))
+API_CONEXOES_POR_HOST = max(1, _env_int("API_CONEXOES_POR_HOST", 8))
+# Arquivo de perfis (emissor/cliente/taxa/credenciais) usado quando --perfis não é informado
+PERFIS_ARQUIVO = os.getenv("PERFIS_ARQUIVO") or None
+
+# Modo serviço (--servico): endereço ("host:porta" ou "unix:/caminho.sock"), threads que
+# atendem os pedidos e tamanho máximo da fila (pedidos além disso são recusados)
+SERVICO_ENDERECO = os.getenv("SERVICO_ENDERECO") or "127.0.0.1:8765"
+SERVICO_TRABALHADORES = max(1, _env_int("SERVICO_TRABALHADORES", 4))
+SERVICO_FILA_MAXIMA = max(1, _env_int("SERVICO_FILA_MAXIMA", 32))
+
+# Métricas por etapa (opcional): "jsonl" (uma linha por execução) ou "prometheus" (textfile);
+# vazio desliga a instrumentação. O arquivo padrão depende do formato.
+METRICAS_FORMATO = (os.getenv("METRICAS_FORMATO") or "").strip().lower()
+METRICAS_ARQUIVO = os.getenv("METRICAS_ARQUIVO") or None
+
+# Envia a janela exata de datas (e as tags, se habilitado) como filtro da consulta.
+# Se a API recusar, o cliente volta ao filtro por mês e o recorte fica no ProcessarDados.
+API_FILTRO_SERVIDOR = _env_bool("API_FILTRO_SERVIDOR", True)
+# Descarta registros cujas tags não estão em TAGS_INTERESSE (desligado por padrão,
+# pois a fatura considera todas as tags)
+FILTRAR_POR_TAGS = _env_bool("FILTRAR_POR_TAGS", False)
+
+# Agregação dos registros: "pandas", "leve" (sem pandas) ou "auto" (leve até o limiar de linhas da fatura)
+BACKEND_AGREGACAO = (os.getenv("BACKEND_AGREGACAO") or "auto").strip().lower()
+AGREGACAO_LIMIAR_LEVE = max(0, _env_int("AGREGACAO_LIMIAR_LEVE", 5000))
+
+# Decodificação das respostas: "auto" (orjson se instalado), "orjson" ou "json"
+API_DECODIFICADOR_JSON = (os.getenv("API_DECODIFICADOR_JSON") or "auto").strip().lower()
+# Mantém de cada registro só os campos usados na fatura (reduz a memória de períodos grandes)
+API_ENXUGAR_REGISTROS = _env_bool("API_ENXUGAR_REGISTROS", True)
+
 # Dias úteis por mês (substituível por variáveis de ambiente WORKING_DAYS_*)
 _DEFAULT_WORKING_DAYS = {
     'JANUARY': 21,
@@ -97,6 +204,10 @@ _MONTH_CODE_MAP = {
     '07': 'JULY', '08': 'AUGUST', '09': 'SEPTEMBER', '10': 'OCTOBER', '11': 'NOVEMBER', '12': 'DECEMBER'
 }
 
-WORKING_HOURS_BY_MONTH = {
-    code: WORKING_DAYS_BY_MONTH_NAME[name] * 8 for code, name in _MONTH_CODE_MAP.items()
-}
+def working_hours_by_month(working_days_by_month_name):
+    """Converte dias úteis por nome do mês em horas por código 'MM' (dias * 8)."""
+    return {
+        code: working_days_by_month_name[name] * 8 for code, name in _MONTH_CODE_MAP.items()
+    }
+
+WORKING_HOURS_BY_MONTH = working_hours_by_month(WORKING_DAYS_BY_MONTH_NAME)
@@ -0,0 +1,66 @@
+# decodificacao_json.py
+"""
+Decodificação das respostas da API e das linhas dos caches locais.
+Usa o orjson quando instalado (dependência opcional, várias vezes mais rápido que
+o módulo json) e reduz cada registro aos campos lidos pelo ProcessarDados.
+"""
+
+import json
+from config import API_DECODIFICADOR_JSON, API_ENXUGAR_REGISTROS
+
+DECODIFICADORES_JSON = ("auto", "orjson", "json")
+
+# Campos dos registros de timesheet usados na fatura (id e updatedAt já vêm projetados na consulta)
+CAMPOS_DINAMICOS = ("start_date", "description", "duration", "tag", "task")
+ASSOCIACOES = ("task",)
+_CONJUNTO_DINAMICOS = frozenset(CAMPOS_DINAMICOS)
+_CONJUNTO_ASSOCIACOES = frozenset(ASSOCIACOES)
+
+_carregar = None
+
+
+def _escolher_decodificador(decodificador=None):
+    decodificador = decodificador or API_DECODIFICADOR_JSON
+    if decodificador not in DECODIFICADORES_JSON:
+        raise ValueError(
+            f"Decodificador JSON inválido: {decodificador}. Use um de {', '.join(DECODIFICADORES_JSON)}."
+        )
+    if decodificador == "json":
+        return json.loads
+    # Dependência opcional: no modo "auto", sem orjson, fica com o módulo json
+    try:
+        import orjson
+    except ImportError:
+        if decodificador == "orjson":
+            raise ImportError("O decodificador orjson requer o pacote orjson (pip install orjson).")
+        return json.loads
+    return orjson.loads
+
+
+def carregar_json(conteudo):
+    """Decodifica bytes ou str com o decodificador configurado (escolhido no primeiro uso)."""
+    global _carregar
+    if _carregar is None:
+        _carregar = _escolher_decodificador()
+    return _carregar(conteudo)
+
+
+def enxugar_registros(registros):
+    """
+    Reduz, no próprio registro recém-decodificado, dynamicFields e dynamicAssociations
+    aos campos lidos na fatura, liberando o resto do JSON. Com API_ENXUGAR_REGISTROS=false,
+    devolve os registros como vieram.
+    """
+    if not API_ENXUGAR_REGISTROS or not registros:
+        return registros
+
+    for registro in registros:
+        campos = registro.get('dynamicFields')
+        if campos and not campos.keys() <= _CONJUNTO_DINAMICOS:
+            registro['dynamicFields'] = {campo: campos[campo] for campo in CAMPOS_DINAMICOS if campo in campos}
+        associacoes = registro.get('dynamicAssociations')
+        if associacoes and not associacoes.keys() <= _CONJUNTO_ASSOCIACOES:
+            registro['dynamicAssociations'] = {
+                campo: associacoes[campo] for campo in ASSOCIACOES if campo in associacoes
+            }
+    return registros
@@ -4,80 +4,389 @@ Gerador de Faturas - Arquivo Principal
 Responsável por orquestrar todo o processo de geração de faturas.
 """
 
+import argparse
+import os
+import sqlite3
 from cliente_api import ClienteAPI
-from processar_dados import ProcessarDados
-from gerar_PDF import GerarPDF
 from utils_data import UtilsData
-from config import (
-    NUMERO_FATURA, 
-    TAXA_HORA, 
-    MES_COMPLETO, 
-    INFO_FATURA
-)
+from perfis import perfil_padrao
+from metricas import criar_metricas, exportar_metricas, FORMATOS_METRICAS
+from analise_desempenho import criar_analise, MODOS_ANALISE
+from historico_colunar import HistoricoColunar
+from rollup_mensal import RollupMensal
+from config import PERFIS_ARQUIVO, HISTORICO_COLUNAR_HABILITADO, ROLLUP_MENSAL_HABILITADO, SERVICO_ENDERECO
 
 class GeradorFatura:
     
-    def __init__(self):
-        self.cliente_api = ClienteAPI()
-        self.processar_dados = ProcessarDados()
-        self.gerar_PDF = GerarPDF()
+    def __init__(self, cliente_api=None, perfil=None, sessao=None, metricas=None, analise=None, historico=None,
+                 rollup=None):
+        # Sem perfil explícito, usa as configurações do .env
+        self.perfil = perfil or perfil_padrao()
+        # Desligadas (METRICAS_FORMATO vazio), as métricas não fazem nada
+        self.metricas = metricas or criar_metricas()
+        # Modo --profile: cProfile/tracemalloc por etapa, com relatório ao lado do PDF
+        self.analise = analise or criar_analise()
+        # Histórico colunar (opcional): os registros normalizados de cada período em Arrow/Parquet
+        if historico is None and HISTORICO_COLUNAR_HABILITADO:
+            historico = HistoricoColunar()
+        self.historico = historico
+        # Horas por task de cada mês processado, para os relatórios de resumo (--resumo)
+        if rollup is None and ROLLUP_MENSAL_HABILITADO:
+            rollup = RollupMensal()
+        self.rollup = rollup
+        self.cliente_api = cliente_api or ClienteAPI(
+            sessao=sessao,
+            credenciais=self.perfil['credenciais'],
+            tags_interesse=self.perfil['tags_interesse'],
+            metricas=self.metricas
+        )
+        self._processar_dados = None
+        self._gerar_PDF = None
         self.utils_data = UtilsData()
     
-    def gerar_fatura(self):
+    @property
+    def processar_dados(self):
+        # pandas e reportlab só são importados quando o processamento ou o PDF começam,
+        # para que --help, períodos sem dados e falhas de login não paguem esse custo
+        if self._processar_dados is None:
+            from processar_dados import ProcessarDados
+            self._processar_dados = ProcessarDados(tags_interesse=self.perfil['tags_interesse'])
+        return self._processar_dados
+    
+    @property
+    def gerar_PDF(self):
+        if self._gerar_PDF is None:
+            from gerar_PDF import GerarPDF
+            self._gerar_PDF = GerarPDF(**self.parametros_pdf())
+        return self._gerar_PDF
+    
+    def parametros_pdf(self):
+        return {
+            'horas_extra': self.perfil['horas_extra'],
+            'internet_valor': self.perfil['internet_valor'],
+            'transporte_valor': self.perfil['transporte_valor'],
+            'horas_por_mes': self.perfil['horas_por_mes'],
+        }
+    
+    def gerar_fatura(self, mes_completo=None, numero_fatura=None, atualizar_cache=False, do_historico=False):
+        mes_completo = mes_completo or self.perfil['mes_completo']
+        numero_fatura = self.perfil['numero_fatura'] if numero_fatura is None else numero_fatura
+        self.metricas.reiniciar(perfil=self.perfil['nome'], mes=mes_completo)
+        if self.analise.habilitada:
+            self._carregar_dependencias()
         try:
-            data_inicio, data_fim = self.utils_data.calcular_periodo(MES_COMPLETO)
-            print(f"Período selecionado: {data_inicio} a {data_fim}")
-            
-            info_fatura = self._preparar_info_fatura(data_inicio, data_fim)
-            
-            print("\nFazendo login na API...")
-            self.cliente_api.fazer_login()
-            
-            print("Buscando dados de timesheet...")
-            dados_api = self.cliente_api.buscar_dados_timesheet(data_inicio, data_fim)
-            
-            print("Processando dados...")
-            resultados = self.processar_dados.processar_dados_api(dados_api, data_inicio, data_fim)
-            
-            if not resultados:
-                print("Nenhum dado encontrado para o período especificado.")
-                return
-            
-            nome_arquivo_pdf = self.utils_data.formatar_nome_arquivo(
-                NUMERO_FATURA, data_inicio, data_fim
-            )
-            
-            print("Gerando PDF...")
-            pdf_gerado, total_final = self.gerar_PDF.gerar_pdf_fatura(
-                resultados, info_fatura, nome_arquivo_pdf, TAXA_HORA
-            )
-            
-            print(f"\nFatura gerada com sucesso: {pdf_gerado}")
-            print(f"Valor total da fatura: R$ {total_final:.2f}")
-            
-            return pdf_gerado, total_final
-            
+            with self.metricas.etapa('total'):
+                return self._gerar_fatura(mes_completo, numero_fatura, atualizar_cache, do_historico)
         except Exception as e:
+            self.metricas.incrementar('erros')
             print(f"Erro ao processar: {e}")
             raise
+        finally:
+            # Uma falha ao gravar as métricas não pode derrubar a geração da fatura
+            exportar_metricas(self.metricas)
+            self._gravar_analise(mes_completo, numero_fatura)
+    
+    def _gerar_fatura(self, mes_completo, numero_fatura, atualizar_cache, do_historico=False):
+        data_inicio, data_fim = self.utils_data.calcular_periodo(mes_completo)
+        print(f"Período selecionado: {data_inicio} a {data_fim}")
+        
+        info_fatura = self._preparar_info_fatura(data_inicio, data_fim, numero_fatura)
+        
+        with self.metricas.etapa('busca_e_processamento'), self.analise.etapa('busca_e_processamento'):
+            resultados = self.buscar_resultados(data_inicio, data_fim, atualizar_cache, do_historico)
+        self._registrar_metricas_processamento(resultados)
+        
+        if not resultados:
+            print("Nenhum dado encontrado para o período especificado.")
+            return
+        
+        nome_arquivo_pdf = self.utils_data.formatar_nome_arquivo(
+            numero_fatura, data_inicio, data_fim
+        )
+        
+        print("Gerando PDF...")
+        with self.metricas.etapa('pdf'), self.analise.etapa('pdf'):
+            pdf_gerado, total_final = self.gerar_PDF.gerar_pdf_fatura(
+                resultados, info_fatura, nome_arquivo_pdf, self.perfil['taxa_hora']
+            )
+        self._registrar_metricas_pdf(resultados, pdf_gerado)
+        
+        print(f"\nFatura gerada com sucesso: {pdf_gerado}")
+        print(f"Valor total da fatura: R$ {total_final:.2f}")
+        
+        return pdf_gerado, total_final
+    
+    def _registrar_metricas_processamento(self, resultados):
+        if not self.metricas.habilitada:
+            return
+        # A busca é consumida durante o processamento: o tempo de processamento é o que
+        # sobra da etapa depois de descontar login, requisições e decodificação do JSON
+        self.metricas.registrar_etapa('processamento', max(0.0,
+            self.metricas.segundos('busca_e_processamento')
+            - self.metricas.segundos('login', 'requisicao_api', 'decodificar_json')
+        ))
+        estatisticas = self.processar_dados.estatisticas
+        self.metricas.incrementar('registros_lidos', estatisticas['registros_lidos'])
+        self.metricas.incrementar(
+            'registros_descartados', estatisticas['registros_lidos'] - estatisticas['registros_no_periodo']
+        )
+        self.metricas.incrementar('tasks', len(resultados or {}))
+        self.metricas.incrementar('linhas_agrupadas', sum(len(dados) for dados in (resultados or {}).values()))
+    
+    def _registrar_metricas_pdf(self, resultados, pdf_gerado):
+        if not self.metricas.habilitada:
+            return
+        reaproveitado = self.gerar_PDF.pdf_reaproveitado
+        self.metricas.incrementar('pdf_reaproveitado', int(reaproveitado))
+        if not reaproveitado:
+            self.metricas.incrementar('linhas_renderizadas', sum(len(dados) for dados in resultados.values()))
+        self.metricas.incrementar('pdf_bytes', os.path.getsize(pdf_gerado))
     
-    def _preparar_info_fatura(self, data_inicio, data_fim):
-        info = INFO_FATURA.copy()
+    def _carregar_dependencias(self):
+        # No modo --profile, importa requests, pandas e reportlab antes das etapas
+        # para que o custo dos imports não esconda os pontos quentes do relatório
+        self.cliente_api.sessao
+        if self.processar_dados.backend != "leve":
+            import pandas  # noqa: F401
+        self.gerar_PDF
+    
+    def _gravar_analise(self, mes_completo, numero_fatura):
+        if not self.analise.habilitada:
+            return
+        try:
+            # Mesmo nome do PDF (que pode não ter sido gerado, se a execução falhou ou não teve dados)
+            data_inicio, data_fim = self.utils_data.calcular_periodo(mes_completo)
+            base = os.path.splitext(self.utils_data.formatar_nome_arquivo(numero_fatura, data_inicio, data_fim))[0]
+            arquivos = self.analise.gravar(base)
+        except (OSError, ValueError) as e:
+            print(f"Não foi possível gravar a análise de desempenho: {e}")
+            return
+        for arquivo in arquivos:
+            print(f"Análise de desempenho gravada em {arquivo}")
+    
+    def buscar_resultados(self, data_inicio, data_fim, atualizar_cache=False, do_historico=False):
+        # Com do_historico, refaz a fatura a partir do período gravado no histórico colunar
+        # (só as colunas usadas na fatura, sem login nem normalização)
+        if do_historico and not atualizar_cache:
+            resultados = self._resultados_do_historico(data_inicio, data_fim)
+            if resultados is not None:
+                return resultados
+        
+        # O login é feito sob demanda: períodos em cache não acessam a API.
+        # Os registros chegam página a página e são consumidos à medida que são lidos.
+        print("\nBuscando e processando dados de timesheet...")
+        dados_api = self.cliente_api.buscar_dados_timesheet_paginado(
+            data_inicio, data_fim, atualizar=atualizar_cache
+        )
+        return self.processar_resultados(dados_api, data_inicio, data_fim)
+    
+    def processar_resultados(self, dados_api, data_inicio, data_fim):
+        if self.historico is None:
+            resultados = self.processar_dados.processar_dados_api(dados_api, data_inicio, data_fim)
+        else:
+            # Com o histórico habilitado, as linhas normalizadas do período são gravadas antes do agrupamento
+            registros = self.processar_dados.normalizar_registros(dados_api, data_inicio, data_fim)
+            try:
+                self.historico.gravar(
+                    self.perfil['nome'], self.perfil['credenciais']['email'], data_inicio, data_fim, registros
+                )
+            except (OSError, ImportError) as e:
+                # Uma falha ao gravar o histórico não pode derrubar a geração da fatura
+                print(f"Não foi possível gravar o período no histórico colunar: {e}")
+            resultados = self.processar_dados.agrupar_registros(registros, data_inicio, data_fim)
+        self.registrar_rollup(data_inicio, resultados)
+        return resultados
+    
+    def registrar_rollup(self, data_inicio, resultados):
+        """Atualiza o agregado mensal do período (só o mês processado; os demais não mudam)."""
+        if self.rollup is None:
+            return
+        mes = data_inicio[3:]
+        try:
+            self.rollup.registrar_mes(
+                self.perfil['nome'], self.perfil['credenciais']['email'], mes, resultados,
+                horas_mes=self.perfil['horas_por_mes'].get(mes[:2], 0),
+                taxa_hora=self.perfil['taxa_hora'],
+                adicionais=self.perfil['internet_valor'] + self.perfil['transporte_valor'],
+            )
+        except (OSError, sqlite3.Error) as e:
+            print(f"Não foi possível atualizar o agregado mensal de {mes}: {e}")
+    
+    def _resultados_do_historico(self, data_inicio, data_fim):
+        historico = self.historico or HistoricoColunar()
+        registros = historico.ler(self.perfil['nome'], self.perfil['credenciais']['email'], data_inicio, data_fim)
+        if registros is None:
+            print(f"Período {data_inicio} a {data_fim} não está no histórico colunar; consultando a API.")
+            return None
+        print(f"\nDados do período {data_inicio} a {data_fim} obtidos do histórico colunar.")
+        self.processar_dados.estatisticas = {'registros_lidos': len(registros), 'registros_no_periodo': len(registros)}
+        resultados = self.processar_dados.agrupar_registros(registros, data_inicio, data_fim)
+        self.registrar_rollup(data_inicio, resultados)
+        return resultados
+    
+    def _preparar_info_fatura(self, data_inicio, data_fim, numero_fatura=None):
+        info = self.perfil['info_fatura'].copy()
         info.update({
-            'fatura_numero': NUMERO_FATURA,
+            'fatura_numero': self.perfil['numero_fatura'] if numero_fatura is None else numero_fatura,
             'data_desenvolvimento_inicio': data_inicio,
             'data_desenvolvimento_fim': data_fim
         })
         return info
 
 
-def main():
+def _criar_parser():
+    parser = argparse.ArgumentParser(description="Gera a fatura do período configurado a partir do timesheet.")
+    parser.add_argument(
+        "--refresh", "--atualizar",
+        dest="atualizar_cache",
+        action="store_true",
+        help="ignora o cache local de respostas e consulta a API novamente"
+    )
+    parser.add_argument(
+        "--from", "--de",
+        dest="mes_de",
+        metavar="MM/YYYY",
+        help="primeiro mês de um lote de faturas (usar junto com --to)"
+    )
+    parser.add_argument(
+        "--to", "--ate",
+        dest="mes_ate",
+        metavar="MM/YYYY",
+        help="último mês de um lote de faturas; numeradas em ordem a partir de NUMERO_FATURA"
+    )
+    parser.add_argument(
+        "--perfis",
+        dest="perfis",
+        metavar="ARQUIVO",
+        default=PERFIS_ARQUIVO,
+        help="arquivo JSON/TOML com vários perfis (emissor/cliente/taxa/credenciais) faturados na mesma execução"
+    )
+    parser.add_argument(
+        "--async",
+        dest="assincrono",
+        action="store_true",
+        default=None,
+        help="busca os períodos do lote ou dos perfis com o cliente assíncrono (requer aiohttp)"
+    )
+    parser.add_argument(
+        "--metricas",
+        dest="metricas",
+        choices=FORMATOS_METRICAS,
+        default=None,
+        help="grava o tempo de cada etapa e os contadores da execução em JSON lines ou textfile do Prometheus"
+    )
+    parser.add_argument(
+        "--profile", "--analisar-desempenho",
+        dest="analise",
+        nargs="?",
+        const="cpu",
+        choices=MODOS_ANALISE,
+        default=None,
+        help="executa a fatura sob cProfile (cpu, padrão), tracemalloc (memoria) ou os dois (completo) "
+             "e grava um relatório por etapa ao lado do PDF"
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=None,
+        help="processos usados para gerar os PDFs do lote, dos perfis ou do serviço (padrão: número de CPUs)"
+    )
+    parser.add_argument(
+        "--servico",
+        dest="servico",
+        nargs="?",
+        const=SERVICO_ENDERECO,
+        default=None,
+        metavar="ENDERECO",
+        help="atende pedidos de fatura por HTTP local (host:porta) ou socket Unix (unix:/caminho), "
+             f"mantendo imports, sessão e tokens carregados (padrão: {SERVICO_ENDERECO})"
+    )
+    parser.add_argument(
+        "--resumo",
+        dest="resumo",
+        choices=("trimestral", "anual"),
+        default=None,
+        help="gera um relatório de resumo de --from a --to (horas por task e mês, horas cobradas, "
+             "extras acumuladas e total cobrado, com subtotais por trimestre ou ano) a partir dos agregados mensais"
+    )
+    parser.add_argument(
+        "--do-historico",
+        dest="do_historico",
+        action="store_true",
+        help="refaz a fatura a partir do período gravado no histórico colunar, sem consultar a API (requer pyarrow)"
+    )
+    return parser
+
+
+def _executar_servico(args):
+    from servico_faturas import executar_servico
+    perfis = None
+    if args.perfis:
+        from perfis import carregar_perfis
+        perfis = carregar_perfis(args.perfis)
+        print(f"{len(perfis)} perfil(is) carregado(s) de {args.perfis}")
+    executar_servico(perfis, endereco=args.servico, processos=args.workers)
+
+
+def _gerar_resumos(args):
+    from gerador_resumo import GeradorResumo
+    perfis = [perfil_padrao()]
+    if args.perfis:
+        from perfis import carregar_perfis
+        perfis = carregar_perfis(args.perfis)
+        print(f"{len(perfis)} perfil(is) carregado(s) de {args.perfis}")
+    for perfil in perfis:
+        # Com vários perfis, cada resumo vai para o subdiretório do perfil, como no lote
+        resumo = GeradorResumo(
+            GeradorFatura(perfil=perfil), agrupamento=args.resumo,
+            subdiretorio=perfil['nome'] if len(perfis) > 1 else None
+        )
+        resumo.gerar_resumo(args.mes_de, args.mes_ate, atualizar_cache=args.atualizar_cache)
+
+
+def main(argv=None):
+    parser = _criar_parser()
+    args = parser.parse_args(argv)
+    if bool(args.mes_de) != bool(args.mes_ate):
+        parser.error("--from e --to devem ser usados juntos")
+    if args.servico and (args.mes_de or args.resumo or args.do_historico):
+        parser.error("--servico recebe o perfil e o mês em cada pedido (sem --from/--to, --resumo ou --do-historico)")
+    if args.analise and (args.mes_de or args.perfis or args.assincrono or args.servico or args.resumo):
+        # O cProfile só enxerga a thread que o ativou, e os PDFs do lote são gerados em outros processos
+        parser.error("--profile vale apenas para a fatura única (sem --from/--to, --perfis, --async, --servico ou --resumo)")
+    if args.metricas and (args.servico or args.resumo):
+        parser.error("--metricas vale para a fatura única e para os lotes (sem --servico ou --resumo)")
+    if args.resumo and not args.mes_de:
+        parser.error("--resumo requer --from e --to")
+    if args.do_historico and (args.mes_de or args.perfis or args.assincrono):
+        parser.error("--do-historico vale apenas para a fatura única (sem --from/--to, --perfis ou --async)")
+
     print("=== GERADOR DE FATURAS ===")
     print("Iniciando processo de geração...")
     
     try:
-        gerador = GeradorFatura()
-        gerador.gerar_fatura()
+        if args.servico:
+            _executar_servico(args)
+        elif args.resumo:
+            _gerar_resumos(args)
+        elif args.mes_de or args.perfis or args.assincrono:
+            from gerador_lote import GeradorFaturaLote
+            perfis = None
+            if args.perfis:
+                from perfis import carregar_perfis
+                perfis = carregar_perfis(args.perfis)
+                print(f"{len(perfis)} perfil(is) carregado(s) de {args.perfis}")
+            lote = GeradorFaturaLote(
+                perfis=perfis, processos=args.workers, assincrono=args.assincrono,
+                metricas=criar_metricas(args.metricas)
+            )
+            faturas = lote.gerar_faturas(args.mes_de, args.mes_ate, atualizar_cache=args.atualizar_cache)
+            if any(fatura['erro'] for fatura in faturas):
+                print("\nAlgumas faturas do lote não foram geradas.")
+                return 1
+        else:
+            gerador = GeradorFatura(metricas=criar_metricas(args.metricas), analise=criar_analise(args.analise))
+            gerador.gerar_fatura(atualizar_cache=args.atualizar_cache, do_historico=args.do_historico)
         
     except KeyboardInterrupt:
         print("\nProcesso interrompido pelo usuário.")
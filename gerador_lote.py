@@ -0,0 +1,244 @@
+# gerador_lote.py
+"""
+Geração de faturas em lote: vários meses e/ou vários perfis em uma execução.
+Compartilha o pool de conexões e um login por conta, busca os períodos em paralelo
+e gera os PDFs em um pool de processos.
+"""
+
+import os
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+from cliente_api import criar_sessao
+from gerador_fatura import GeradorFatura
+from metricas import criar_metricas, exportar_metricas
+from perfis import perfil_padrao
+from utils_data import UtilsData
+from config import LOTE_BUSCAS_SIMULTANEAS, API_ASSINCRONO, API_REQUISICOES_SIMULTANEAS
+
+# Instâncias reaproveitadas entre as faturas geradas por um mesmo processo do pool,
+# uma por combinação de parâmetros do PDF (perfis diferentes podem ter valores diferentes)
+_geradores_pdf = {}
+
+
+def _gerador_pdf(parametros_pdf):
+    chave = repr(sorted(parametros_pdf.items()))
+    gerador = _geradores_pdf.get(chave)
+    if gerador is None:
+        from gerar_PDF import GerarPDF
+        gerador = _geradores_pdf[chave] = GerarPDF(**parametros_pdf)
+    return gerador
+
+
+def aquecer_gerador_pdf(parametros_pdf):
+    """
+    Importa o reportlab e monta os estilos do PDF no processo atual antes da primeira
+    fatura. Devolve o pid, para aquecer cada processo de um pool.
+    """
+    _gerador_pdf(parametros_pdf)
+    return os.getpid()
+
+
+def renderizar_fatura(parametros_pdf, resultados, info_fatura, nome_arquivo, taxa_hora):
+    """Gera o PDF de uma fatura com o GerarPDF do processo; pode ser enviada a um pool de processos."""
+    return _gerador_pdf(parametros_pdf).gerar_pdf_fatura(resultados, info_fatura, nome_arquivo, taxa_hora)
+
+
+class GeradorFaturaLote:
+
+    def __init__(self, perfis=None, processos=None, buscas_simultaneas=None, assincrono=None, metricas=None):
+        self.perfis = perfis or [perfil_padrao()]
+        self.utils_data = UtilsData()
+        self.processos = processos or os.cpu_count() or 1
+        self.buscas_simultaneas = buscas_simultaneas or LOTE_BUSCAS_SIMULTANEAS
+        self.assincrono = API_ASSINCRONO if assincrono is None else assincrono
+
+        # Uma execução de métricas para o lote inteiro, compartilhada pelos geradores de todos os perfis
+        self.metricas = metricas or criar_metricas()
+
+        # Um GeradorFatura (e ClienteAPI) por perfil, todos sobre a mesma sessão HTTP
+        sessao = criar_sessao(max(self.buscas_simultaneas, 1))
+        self.geradores = {
+            perfil['nome']: GeradorFatura(perfil=perfil, sessao=sessao, metricas=self.metricas)
+            for perfil in self.perfis
+        }
+
+    def gerar_faturas(self, mes_de=None, mes_ate=None, atualizar_cache=False):
+        """
+        Gera as faturas de cada perfil para os meses de `mes_de` a `mes_ate`
+        (ou, sem intervalo, para o MES_COMPLETO de cada perfil).
+        """
+        faturas = []
+        for perfil in self.perfis:
+            if mes_de:
+                meses = self.utils_data.listar_meses(mes_de, mes_ate)
+            else:
+                meses = [perfil['mes_completo']]
+            for mes in meses:
+                faturas.append({
+                    'perfil': perfil['nome'], 'mes': mes, 'numero': None,
+                    'arquivo': None, 'total': None, 'erro': None
+                })
+
+        print(f"Lote de {len(faturas)} fatura(s) para {len(self.perfis)} perfil(is)")
+
+        self.metricas.reiniciar(
+            perfil=",".join(perfil['nome'] for perfil in self.perfis),
+            mes=f"{mes_de}-{mes_ate}" if mes_de else ",".join(sorted({fatura['mes'] for fatura in faturas})),
+        )
+        try:
+            with self.metricas.etapa('total'):
+                self._gerar_faturas(faturas, atualizar_cache)
+        finally:
+            self.metricas.incrementar('faturas_geradas', sum(1 for fatura in faturas if fatura['arquivo']))
+            self.metricas.incrementar('faturas_com_erro', sum(1 for fatura in faturas if fatura['erro']))
+            exportar_metricas(self.metricas)
+
+        self._imprimir_resumo(faturas)
+        return faturas
+
+    def _gerar_faturas(self, faturas, atualizar_cache):
+        # As buscas de todos os meses e perfis acontecem juntas: a etapa mede o tempo de parede
+        with self.metricas.etapa('busca_e_processamento'):
+            if self.assincrono:
+                import asyncio
+                buscas = asyncio.run(self._buscar_assincrono(faturas, atualizar_cache))
+            else:
+                buscas = self._buscar_em_threads(faturas, atualizar_cache)
+
+        numeros = {}
+        pendentes = []
+        for fatura, busca in zip(faturas, buscas):
+            gerador = self.geradores[fatura['perfil']]
+            try:
+                if isinstance(busca, Exception):
+                    raise busca
+                data_inicio, data_fim, resultados = busca
+            except Exception as e:
+                print(f"Erro ao buscar dados de {self._rotulo(fatura)}: {e}")
+                fatura['erro'] = str(e)
+                continue
+
+            if not resultados:
+                print(f"Nenhum dado encontrado para {self._rotulo(fatura)}.")
+                continue
+
+            # Numeração em ordem cronológica por perfil, apenas para os meses que geram fatura
+            try:
+                if fatura['perfil'] not in numeros:
+                    numeros[fatura['perfil']] = self._numero_inicial(gerador.perfil)
+            except ValueError as e:
+                print(f"Erro em {self._rotulo(fatura)}: {e}")
+                fatura['erro'] = str(e)
+                continue
+            fatura['numero'] = numeros[fatura['perfil']]
+            numeros[fatura['perfil']] += 1
+
+            info_fatura = gerador._preparar_info_fatura(data_inicio, data_fim, fatura['numero'])
+            nome_arquivo = self._nome_arquivo(fatura, data_inicio, data_fim)
+            pendentes.append((fatura, (
+                gerador.parametros_pdf(), resultados, info_fatura, nome_arquivo, gerador.perfil['taxa_hora']
+            )))
+
+        if pendentes:
+            print(f"Gerando {len(pendentes)} PDF(s)...")
+            with self.metricas.etapa('pdf'), ProcessPoolExecutor(
+                max_workers=min(self.processos, len(pendentes))
+            ) as executor:
+                futuros = [(fatura, executor.submit(renderizar_fatura, *argumentos)) for fatura, argumentos in pendentes]
+                for fatura, futuro in futuros:
+                    try:
+                        fatura['arquivo'], fatura['total'] = futuro.result()
+                    except Exception as e:
+                        print(f"Erro ao gerar o PDF de {self._rotulo(fatura)}: {e}")
+                        fatura['erro'] = str(e)
+                        continue
+                    if self.metricas.habilitada:
+                        self.metricas.incrementar('pdf_bytes', os.path.getsize(fatura['arquivo']))
+
+    def _buscar_em_threads(self, faturas, atualizar_cache):
+        # Busca e processamento concorrentes; cada ClienteAPI serializa o próprio login
+        with ThreadPoolExecutor(max_workers=min(self.buscas_simultaneas, len(faturas))) as executor:
+            futuros = [
+                executor.submit(self._buscar_mes, fatura['perfil'], fatura['mes'], atualizar_cache)
+                for fatura in faturas
+            ]
+        buscas = []
+        for futuro in futuros:
+            try:
+                buscas.append(futuro.result())
+            except Exception as e:
+                buscas.append(e)
+        return buscas
+
+    async def _buscar_assincrono(self, faturas, atualizar_cache):
+        """
+        Busca todos os períodos de todos os perfis ao mesmo tempo em um único event loop
+        (tempo total próximo ao da busca mais lenta) e depois processa cada um.
+        """
+        import asyncio
+        from cliente_api_async import ClienteAPIAssincrono, criar_sessao_assincrona
+
+        semaforo = asyncio.Semaphore(API_REQUISICOES_SIMULTANEAS)
+        periodos = [self.utils_data.calcular_periodo(fatura['mes']) for fatura in faturas]
+
+        async with criar_sessao_assincrona() as sessao:
+            # Cada cliente assíncrono usa o ClienteAPI do perfil: token, caches e métricas são os mesmos
+            clientes = {
+                nome: ClienteAPIAssincrono(gerador.cliente_api, sessao, semaforo=semaforo)
+                for nome, gerador in self.geradores.items()
+            }
+            registros = await asyncio.gather(*(
+                clientes[fatura['perfil']].buscar_dados_timesheet(data_inicio, data_fim, atualizar=atualizar_cache)
+                for fatura, (data_inicio, data_fim) in zip(faturas, periodos)
+            ), return_exceptions=True)
+
+        buscas = []
+        for fatura, (data_inicio, data_fim), dados_api in zip(faturas, periodos, registros):
+            if isinstance(dados_api, Exception):
+                buscas.append(dados_api)
+                continue
+            try:
+                gerador = self.geradores[fatura['perfil']]
+                buscas.append((data_inicio, data_fim, gerador.processar_resultados(dados_api, data_inicio, data_fim)))
+            except Exception as e:
+                buscas.append(e)
+        return buscas
+
+    def _buscar_mes(self, nome_perfil, mes, atualizar_cache):
+        data_inicio, data_fim = self.utils_data.calcular_periodo(mes)
+        resultados = self.geradores[nome_perfil].buscar_resultados(data_inicio, data_fim, atualizar_cache)
+        return data_inicio, data_fim, resultados
+
+    def _nome_arquivo(self, fatura, data_inicio, data_fim):
+        nome_arquivo = self.utils_data.formatar_nome_arquivo(fatura['numero'], data_inicio, data_fim)
+        if len(self.perfis) == 1:
+            return nome_arquivo
+        # Com vários perfis, separa os PDFs por perfil para evitar colisão de nomes
+        diretorio, arquivo = os.path.split(nome_arquivo)
+        diretorio = os.path.join(diretorio, fatura['perfil'])
+        os.makedirs(diretorio, exist_ok=True)
+        return os.path.join(diretorio, arquivo)
+
+    @staticmethod
+    def _numero_inicial(perfil):
+        try:
+            return int(perfil['numero_fatura'])
+        except (TypeError, ValueError):
+            raise ValueError(
+                f"numero_fatura do perfil {perfil['nome']} deve ser um número inteiro para gerar faturas em lote."
+            )
+
+    def _rotulo(self, fatura):
+        if len(self.perfis) == 1:
+            return fatura['mes']
+        return f"{fatura['perfil']} {fatura['mes']}"
+
+    def _imprimir_resumo(self, faturas):
+        print("\nResumo do lote:")
+        for fatura in faturas:
+            rotulo = self._rotulo(fatura)
+            if fatura['erro']:
+                print(f"  {rotulo}: erro ({fatura['erro']})")
+            elif fatura['arquivo']:
+                print(f"  {rotulo}: Fatura {fatura['numero']} - {fatura['arquivo']} - R$ {fatura['total']:.2f}")
+            else:
+                print(f"  {rotulo}: sem dados")
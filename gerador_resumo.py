@@ -0,0 +1,155 @@
+# gerador_resumo.py
+"""
+Relatórios de resumo (trimestral ou anual) de um intervalo de meses: horas por
+task em cada mês, horas registradas x cobradas (limite de WORKING_HOURS_BY_MONTH),
+horas extras acumuladas e total cobrado. Lê os agregados mensais do rollup;
+só os meses ainda ausentes dele são buscados e processados (uma vez).
+"""
+
+import os
+from gerador_fatura import GeradorFatura
+from rollup_mensal import RollupMensal
+from utils_data import UtilsData
+
+AGRUPAMENTOS_RESUMO = ("trimestral", "anual")
+
+
+class GeradorResumo:
+
+    def __init__(self, gerador=None, agrupamento="trimestral", rollup=None, subdiretorio=None):
+        if agrupamento not in AGRUPAMENTOS_RESUMO:
+            raise ValueError(f"Agrupamento de resumo inválido: {agrupamento}. Use um de {', '.join(AGRUPAMENTOS_RESUMO)}.")
+        self.gerador = gerador or GeradorFatura()
+        self.agrupamento = agrupamento
+        # O resumo sempre usa o rollup, mesmo com ROLLUP_MENSAL_HABILITADO=false nas faturas
+        self.rollup = rollup or self.gerador.rollup or RollupMensal()
+        self.gerador.rollup = self.rollup
+        self.subdiretorio = subdiretorio
+        self.utils_data = UtilsData()
+
+    def gerar_resumo(self, mes_de, mes_ate, atualizar_cache=False):
+        """Gera o PDF do resumo de mes_de a mes_ate ('MM/YYYY') e devolve (arquivo, resumo)."""
+        meses = self.utils_data.listar_meses(mes_de, mes_ate)
+        agregados = self.carregar_agregados(meses, atualizar_cache)
+        resumo = self.calcular_resumo(meses, agregados)
+        self._imprimir_resumo(resumo)
+
+        nome_arquivo = self.utils_data.formatar_nome_resumo(self.agrupamento, mes_de, mes_ate)
+        if self.subdiretorio:
+            diretorio, arquivo = os.path.split(nome_arquivo)
+            diretorio = os.path.join(diretorio, self.subdiretorio)
+            os.makedirs(diretorio, exist_ok=True)
+            nome_arquivo = os.path.join(diretorio, arquivo)
+
+        print("Gerando PDF do resumo...")
+        arquivo = self.gerador.gerar_PDF.gerar_pdf_resumo(resumo, self.gerador.perfil['info_fatura'], nome_arquivo)
+        print(f"\nResumo gerado com sucesso: {arquivo}")
+        return arquivo, resumo
+
+    def carregar_agregados(self, meses, atualizar_cache=False):
+        """
+        Agregados dos meses a partir do rollup. Os meses ausentes (ou todos, com
+        atualizar_cache) passam pela busca e pelo processamento, que atualizam o rollup.
+        """
+        # Só os agregados do próprio perfil: outro perfil com o mesmo login tem outra taxa e outros limites
+        perfil, conta = self.gerador.perfil['nome'], self.gerador.perfil['credenciais']['email']
+        agregados = {} if atualizar_cache else self.rollup.meses(perfil, conta, meses[0], meses[-1])
+        faltantes = [mes for mes in meses if mes not in agregados]
+        if not faltantes:
+            print(f"{len(meses)} mês(es) lido(s) dos agregados mensais.")
+            return agregados
+
+        print(f"Agregando {len(faltantes)} mês(es) a partir dos registros...")
+        for mes in faltantes:
+            data_inicio, data_fim = self.utils_data.calcular_periodo(mes)
+            try:
+                self.gerador.buscar_resultados(data_inicio, data_fim, atualizar_cache)
+            except Exception as e:
+                print(f"Erro ao buscar dados de {mes}: {e}")
+        return self.rollup.meses(perfil, conta, meses[0], meses[-1])
+
+    def calcular_resumo(self, meses, agregados):
+        """
+        Linhas do resumo por mês (horas por task, registradas, limite, cobradas, extras
+        do mês e acumuladas, total cobrado), subtotais por trimestre/ano e total geral.
+        O total cobrado segue a fatura: horas cobradas x taxa + internet e transporte,
+        só nos meses com horas. As extras acumuladas começam em zero no primeiro mês.
+        """
+        linhas = []
+        extras_acumuladas = 0.0
+        for mes in meses:
+            agregado = agregados.get(mes)
+            if agregado is None:
+                linhas.append({'mes': mes, 'grupo': self._grupo(mes), 'sem_dados': True, 'tasks': {}})
+                continue
+            horas = sum(agregado['tasks'].values())
+            horas_mes = agregado['horas_mes']
+            horas_cobradas = min(horas, horas_mes) if horas_mes > 0 else horas
+            extras_acumuladas += horas - horas_cobradas
+            linhas.append({
+                'mes': mes,
+                'grupo': self._grupo(mes),
+                'sem_dados': False,
+                'tasks': agregado['tasks'],
+                'horas_registradas': horas,
+                'horas_mes': horas_mes,
+                'horas_cobradas': horas_cobradas,
+                'extras_mes': horas - horas_cobradas,
+                'extras_acumuladas': extras_acumuladas,
+                'total_cobrado': horas_cobradas * agregado['taxa_hora'] + agregado['adicionais'] if horas else 0.0,
+            })
+
+        grupos = {}
+        for linha in linhas:
+            grupos.setdefault(linha['grupo'], []).append(linha)
+        return {
+            'agrupamento': self.agrupamento,
+            'mes_de': meses[0],
+            'mes_ate': meses[-1],
+            'meses': linhas,
+            'grupos': [self._somar(rotulo, linhas_grupo) for rotulo, linhas_grupo in grupos.items()],
+            'total': self._somar("TOTAL", linhas),
+        }
+
+    def _grupo(self, mes):
+        numero, ano = mes.split('/')
+        if self.agrupamento == "anual":
+            return ano
+        return f"T{(int(numero) - 1) // 3 + 1}/{ano}"
+
+    @staticmethod
+    def _somar(rotulo, linhas):
+        com_dados = [linha for linha in linhas if not linha['sem_dados']]
+        tasks = {}
+        for linha in com_dados:
+            for task, horas in linha['tasks'].items():
+                tasks[task] = tasks.get(task, 0.0) + horas
+        soma = {
+            campo: sum(linha[campo] for linha in com_dados)
+            for campo in ('horas_registradas', 'horas_mes', 'horas_cobradas', 'extras_mes', 'total_cobrado')
+        }
+        soma.update({
+            'rotulo': rotulo,
+            'meses': [linha['mes'] for linha in linhas],
+            'tasks': dict(sorted(tasks.items())),
+            'extras_acumuladas': com_dados[-1]['extras_acumuladas'] if com_dados else 0.0,
+        })
+        return soma
+
+    @staticmethod
+    def _imprimir_resumo(resumo):
+        print(f"\nResumo {resumo['agrupamento']} de {resumo['mes_de']} a {resumo['mes_ate']}:")
+        for linha in resumo['meses']:
+            if linha['sem_dados']:
+                print(f"  {linha['mes']}: sem dados")
+                continue
+            print(
+                f"  {linha['mes']}: {linha['horas_registradas']:.2f} h registradas, "
+                f"{linha['horas_cobradas']:.2f} h cobradas (limite {linha['horas_mes']:.0f} h), "
+                f"extras acumuladas {linha['extras_acumuladas']:.2f} h, R$ {linha['total_cobrado']:.2f}"
+            )
+        for grupo in resumo['grupos'] + [resumo['total']]:
+            print(
+                f"  {grupo['rotulo']}: {grupo['horas_registradas']:.2f} h registradas, "
+                f"{grupo['horas_cobradas']:.2f} h cobradas, R$ {grupo['total_cobrado']:.2f}"
+            )
@@ -10,9 +10,15 @@ from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
 from reportlab.lib import colors
 from reportlab.lib.units import inch
 from reportlab.lib.enums import TA_CENTER, TA_RIGHT, TA_LEFT
+from reportlab.pdfbase.pdfmetrics import stringWidth
+import hashlib
+import json
+import os
+from bisect import bisect_left
 from datetime import datetime
 from config import (
     PDF_CONFIG,
+    PDF_CACHE_HABILITADO,
     WORKING_HOURS_BY_MONTH,
     HORAS_EXTRA,
     INTERNET_VALOR,
@@ -20,12 +26,64 @@ from config import (
 )
 
 
+# Versão do layout: incrementar ao mudar a aparência do PDF, para que as faturas
+# já geradas não sejam reaproveitadas pelo cache de PDFs
+VERSAO_LAYOUT = 1
+
+# Larguras das colunas da tabela de serviços
+LARGURAS_TABELA_SERVICOS = [200, 100, 80, 120]
+# Padding horizontal padrão das células (esquerda + direita) de uma Table do ReportLab
+PADDING_HORIZONTAL_CELULA = 12
+
+# Larguras das colunas das tabelas do relatório de resumo (por mês e por task)
+LARGURAS_TABELA_RESUMO_MENSAL = [50, 70, 50, 60, 58, 60, 103]
+LARGURAS_TABELA_HORAS_TASK = [271, 80, 100]
+
+# Comandos fixos da tabela de serviços; as linhas de task são acrescentadas por índice
+ESTILO_BASE_TABELA_SERVICOS = (
+    ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
+    ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+    ('ALIGN', (0, 0), (-1, 0), 'CENTER'),
+    ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+    ('FONTSIZE', (0, 0), (-1, 0), 10),
+    ('BOTTOMPADDING', (0, 0), (-1, 0), 5),
+    ('BACKGROUND', (0, 1), (-1, -2), colors.white),
+    ('TEXTCOLOR', (0, 1), (-1, -1), colors.black),
+    ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
+    ('GRID', (0, 0), (-1, -1), 0.5, colors.black),
+    ('TOPPADDING', (0, 0), (-1, -1), 3),
+    ('BOTTOMPADDING', (0, 0), (-1, -1), 3),
+    # Um único ALIGN para todas as colunas; as descrições em texto simples ficam
+    # centralizadas, como o estilo 'descricao' dos Paragraphs
+    ('ALIGN', (0, 1), (-1, -1), 'CENTER'),
+)
+
+
 class GerarPDF:
 
-    def __init__(self):
+    def __init__(self, horas_extra=None, internet_valor=None, transporte_valor=None, horas_por_mes=None):
         self.estilos = self._criar_estilos()
+        self.horas_extra = HORAS_EXTRA if horas_extra is None else horas_extra
+        self.internet_valor = INTERNET_VALOR if internet_valor is None else internet_valor
+        self.transporte_valor = TRANSPORTE_VALOR if transporte_valor is None else transporte_valor
+        self.horas_por_mes = WORKING_HOURS_BY_MONTH if horas_por_mes is None else horas_por_mes
+        self.cache_habilitado = PDF_CACHE_HABILITADO
+        # Se a última chamada de gerar_pdf_fatura manteve o PDF existente em vez de renderizar
+        self.pdf_reaproveitado = False
     
     def gerar_pdf_fatura(self, resultados, info_fatura, nome_arquivo, taxa_hora):
+        self.pdf_reaproveitado = False
+        impressao_digital = None
+        if self.cache_habilitado:
+            impressao_digital = self.calcular_impressao_digital(resultados, info_fatura, taxa_hora)
+            total_anterior = self._total_se_inalterado(nome_arquivo, impressao_digital)
+            if total_anterior is not None:
+                print(f"PDF sem alterações desde a última geração, mantido: {nome_arquivo}")
+                self.pdf_reaproveitado = True
+                return nome_arquivo, total_anterior
+            # Uma geração interrompida não pode deixar para trás uma impressão digital válida
+            self._remover_impressao_digital(nome_arquivo)
+        
         doc = SimpleDocTemplate(
             nome_arquivo,
             pagesize=A4,
@@ -59,8 +117,177 @@ class GerarPDF:
         
         doc.build(elementos)
         
+        if impressao_digital is not None:
+            self._gravar_impressao_digital(nome_arquivo, impressao_digital, total_cobrado_final)
+        
         return nome_arquivo, total_cobrado_final
 
+    def gerar_pdf_resumo(self, resumo, info_fatura, nome_arquivo):
+        """
+        PDF do relatório de resumo montado por `GeradorResumo.calcular_resumo`: horas e
+        valores por mês (com subtotais por trimestre/ano) e horas por task em cada mês.
+        """
+        doc = SimpleDocTemplate(
+            nome_arquivo,
+            pagesize=A4,
+            rightMargin=PDF_CONFIG["margins"]["right"],
+            leftMargin=PDF_CONFIG["margins"]["left"],
+            topMargin=PDF_CONFIG["margins"]["top"],
+            bottomMargin=PDF_CONFIG["margins"]["bottom"]
+        )
+        
+        elementos = [
+            Paragraph(f"RESUMO {resumo['agrupamento'].upper()}", self.estilos['titulo']),
+            Paragraph(
+                f"{info_fatura.get('razao_social') or ''} - {info_fatura.get('cliente_nome') or ''}<br/>"
+                f"Período: {resumo['mes_de']} a {resumo['mes_ate']} - "
+                f"Emitido em {datetime.today().strftime('%d/%m/%Y')}",
+                self.estilos['descricao']
+            ),
+            Spacer(1, 0.3 * inch),
+            Paragraph("<b>Horas e valores por mês</b>", self.estilos['subtitulo']),
+            self._criar_tabela_resumo_mensal(resumo),
+            Spacer(1, 0.4 * inch),
+            Paragraph("<b>Horas por task</b>", self.estilos['subtitulo']),
+            self._criar_tabela_horas_task(resumo),
+        ]
+        
+        doc.build(elementos)
+        return nome_arquivo
+
+    def _criar_tabela_resumo_mensal(self, resumo):
+        def horas(valor):
+            return f"{valor:.2f}".replace('.', ',')
+
+        def linha_valores(rotulo, dados):
+            return [
+                rotulo, horas(dados['horas_registradas']), horas(dados['horas_mes']), horas(dados['horas_cobradas']),
+                horas(dados['extras_mes']), horas(dados['extras_acumuladas']), self._fmt_brl(dados['total_cobrado'])
+            ]
+
+        dados = [[
+            Paragraph(f"<b>{titulo}</b>", self.estilos['descricao']) for titulo in (
+                "Mês", "Registradas (H)", "Limite (H)", "Cobradas (H)",
+                "Extras no mês (H)", "Extras acum. (H)", "Total cobrado (R$)"
+            )
+        ]]
+        linhas_subtotal = []
+        grupos = {grupo['rotulo']: grupo for grupo in resumo['grupos']}
+        for indice, linha in enumerate(resumo['meses']):
+            if linha['sem_dados']:
+                dados.append([linha['mes'], "sem dados", "", "", "", "", ""])
+            else:
+                dados.append(linha_valores(linha['mes'], linha))
+            # Subtotal depois do último mês de cada trimestre/ano
+            proximo = resumo['meses'][indice + 1]['grupo'] if indice + 1 < len(resumo['meses']) else None
+            if proximo != linha['grupo']:
+                linhas_subtotal.append(len(dados))
+                dados.append(linha_valores(linha['grupo'], grupos[linha['grupo']]))
+        dados.append(linha_valores("TOTAL", resumo['total']))
+
+        estilo = TableStyle([
+            ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
+            ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
+            ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+            ('FONTSIZE', (0, 1), (-1, -1), 9),
+            ('GRID', (0, 0), (-1, -1), 0.5, colors.black),
+            ('TOPPADDING', (0, 0), (-1, -1), 3),
+            ('BOTTOMPADDING', (0, 0), (-1, -1), 3),
+            ('BACKGROUND', (0, -1), (-1, -1), colors.lightgrey),
+            ('FONTNAME', (0, -1), (-1, -1), 'Helvetica-Bold'),
+            ('LINEABOVE', (0, -1), (-1, -1), 1, colors.black),
+        ])
+        for linha in linhas_subtotal:
+            estilo.add('BACKGROUND', (0, linha), (-1, linha), colors.whitesmoke)
+            estilo.add('FONTNAME', (0, linha), (-1, linha), 'Helvetica-Bold')
+        tabela = Table(dados, colWidths=LARGURAS_TABELA_RESUMO_MENSAL, repeatRows=1)
+        tabela.setStyle(estilo)
+        return tabela
+
+    def _criar_tabela_horas_task(self, resumo):
+        # Por trimestre/ano: linha de destaque com o total do grupo e, por task, o total
+        # no grupo seguido das horas de cada mês
+        cabecalho = ["Task", "Mês", "Horas (H)"]
+        linhas = []
+        linhas_grupo = []
+        largura_task = LARGURAS_TABELA_HORAS_TASK[0] - PADDING_HORIZONTAL_CELULA
+        meses = {linha['mes']: linha for linha in resumo['meses']}
+
+        for grupo in resumo['grupos']:
+            linhas_grupo.append(len(linhas))
+            linhas.append([
+                Paragraph(f"<b>{grupo['rotulo']}</b>", self.estilos['tag']), "",
+                f"{grupo['horas_registradas']:.2f}".replace('.', ',')
+            ])
+            for task, horas_task in grupo['tasks'].items():
+                linhas.append([
+                    self._celula_descricao(task, largura_task), "Total",
+                    f"{horas_task:.2f}".replace('.', ',')
+                ])
+                for mes in grupo['meses']:
+                    horas_mes = meses[mes]['tasks'].get(task)
+                    if horas_mes is not None:
+                        linhas.append(["", mes, f"{horas_mes:.2f}".replace('.', ',')])
+
+        return TabelaPaginada(
+            cabecalho, linhas, LARGURAS_TABELA_HORAS_TASK, self._estilo_tabela_servicos, linhas_grupo
+        )
+
+    def calcular_impressao_digital(self, resultados, info_fatura, taxa_hora):
+        """
+        Hash estável de tudo o que define o conteúdo do PDF. A data de emissão não entra:
+        uma fatura que não mudou mantém a data em que foi gerada.
+        """
+        entradas = {
+            'versao_layout': VERSAO_LAYOUT,
+            'pdf_config': PDF_CONFIG,
+            'resultados': [
+                [str(task), [str(d) for d in dados['description'].tolist()],
+                 [float(h) for h in dados['duration'].tolist()]]
+                for task, dados in resultados.items()
+            ],
+            'info_fatura': info_fatura,
+            'taxa_hora': float(taxa_hora),
+            'horas_extra': float(self.horas_extra),
+            'internet_valor': float(self.internet_valor),
+            'transporte_valor': float(self.transporte_valor),
+            'horas_por_mes': self.horas_por_mes,
+        }
+        conteudo = json.dumps(entradas, sort_keys=True, ensure_ascii=False, separators=(',', ':'), default=str)
+        return hashlib.sha256(conteudo.encode('utf-8')).hexdigest()
+
+    @staticmethod
+    def _arquivo_impressao_digital(nome_arquivo):
+        return f"{nome_arquivo}.impressao.json"
+
+    def _total_se_inalterado(self, nome_arquivo, impressao_digital):
+        if not os.path.exists(nome_arquivo):
+            return None
+        try:
+            with open(self._arquivo_impressao_digital(nome_arquivo), encoding='utf-8') as arquivo:
+                conteudo = json.load(arquivo)
+            if conteudo.get('impressao_digital') == impressao_digital:
+                return float(conteudo['total'])
+        except (OSError, ValueError, KeyError, TypeError, AttributeError):
+            pass
+        return None
+
+    def _gravar_impressao_digital(self, nome_arquivo, impressao_digital, total):
+        caminho = self._arquivo_impressao_digital(nome_arquivo)
+        temporario = f"{caminho}.{os.getpid()}.tmp"
+        try:
+            with open(temporario, 'w', encoding='utf-8') as arquivo:
+                json.dump({'impressao_digital': impressao_digital, 'total': total}, arquivo)
+            os.replace(temporario, caminho)
+        except OSError as e:
+            print(f"Não foi possível gravar a impressão digital do PDF: {e}")
+
+    def _remover_impressao_digital(self, nome_arquivo):
+        try:
+            os.remove(self._arquivo_impressao_digital(nome_arquivo))
+        except OSError:
+            pass
+
     def _criar_estilos(self):
         estilos = getSampleStyleSheet()
         
@@ -111,7 +338,7 @@ class GerarPDF:
         try:
             data_inicio = info_fatura.get('data_desenvolvimento_inicio')
             mes_codigo = data_inicio.split('/')[1] if isinstance(data_inicio, str) and '/' in data_inicio else None
-            horas_mes = float(WORKING_HOURS_BY_MONTH.get(mes_codigo, 0))
+            horas_mes = float(self.horas_por_mes.get(mes_codigo, 0))
         except Exception:
             horas_mes = 0.0
 
@@ -176,8 +403,14 @@ class GerarPDF:
 
     def _criar_tabela_servicos(self, resultados, taxa_hora):
         cabecalho = ["Task", "Taxa por hora (R$)", "Horas", "Total (R$)"]
-        dados_tabela = [cabecalho]
-        total_geral = total_horas = 0
+        linhas = []
+        linhas_task = []
+        total_geral = 0
+
+        # Valores repetidos (taxa, durações comuns) são formatados uma vez só
+        taxa_formatada = self._fmt_brl(taxa_hora)
+        colunas_formatadas = {}
+        largura_descricao = LARGURAS_TABELA_SERVICOS[0] - PADDING_HORIZONTAL_CELULA
 
         for task, dados in resultados.items():
             if dados.empty:
@@ -187,32 +420,58 @@ class GerarPDF:
             horas_task = float(dados['duration'].sum())
             total_task = horas_task * taxa_hora
 
-            dados_tabela.append([
+            linhas_task.append(len(linhas))
+            linhas.append([
                 Paragraph(f"<b>{task}</b>", self.estilos['tag']),
-                self._fmt_brl(taxa_hora),
+                taxa_formatada,
                 f"{horas_task:.2f}".replace('.', ','),
                 self._fmt_brl(total_task)
             ])
             
-            for _, row in dados.iterrows():
-                duracao = row['duration']
+            # Iteração por colunas, sem montar uma Series por linha
+            for descricao, duracao in zip(dados['description'].tolist(), dados['duration'].tolist()):
                 total_linha = duracao * taxa_hora
                 total_geral += total_linha
-                total_horas += duracao
                 
-                dados_tabela.append([
-                    Paragraph(row['description'], self.estilos['descricao']),
-                    self._fmt_brl(taxa_hora),
-                    f"{duracao:.2f}".replace('.', ','),
-                    self._fmt_brl(total_linha)
+                if duracao not in colunas_formatadas:
+                    colunas_formatadas[duracao] = (
+                        f"{duracao:.2f}".replace('.', ','), self._fmt_brl(total_linha)
+                    )
+                horas_formatadas, total_formatado = colunas_formatadas[duracao]
+                
+                linhas.append([
+                    self._celula_descricao(descricao, largura_descricao),
+                    taxa_formatada,
+                    horas_formatadas,
+                    total_formatado
                 ])
 
-        tabela = Table(dados_tabela, colWidths=[200, 100, 80, 120])
-        estilo = self._estilo_tabela_servicos(len(dados_tabela), resultados)
-        tabela.setStyle(estilo)
+        # Uma Table por página (com o cabeçalho repetido), em vez de uma Table única
+        # dividida página a página
+        tabela = TabelaPaginada(
+            cabecalho, linhas, LARGURAS_TABELA_SERVICOS, self._estilo_tabela_servicos, linhas_task
+        )
         
         return tabela, total_geral
 
+    def _celula_descricao(self, descricao, largura):
+        """
+        Usa texto simples quando a descrição cabe em uma linha e não depende do
+        tratamento de marcação/espaços do Paragraph; senão, um Paragraph que quebra linhas.
+        """
+        estilo = self.estilos['descricao']
+        if (
+            isinstance(descricao, str)
+            and '<' not in descricao
+            and '&' not in descricao
+            and ' '.join(descricao.split()) == descricao
+            # Nenhum glifo da Helvetica passa de ~1,02 em: textos curtos cabem sem medir
+            and (len(descricao) * estilo.fontSize * 1.1 <= largura
+                 or stringWidth(descricao, estilo.fontName, estilo.fontSize) <= largura)
+        ):
+            return descricao
+        return Paragraph(descricao, estilo)
+
     def _criar_tabela_resumo(self, resultados, taxa_hora, info_fatura):
         cabecalho = [
             "Categoria",
@@ -256,7 +515,7 @@ class GerarPDF:
         ])
 
         # Linha Horas Extras (TOTAL) = HORAS_EXTRA + (TOTAL - COBRADAS)
-        horas_extras = float(HORAS_EXTRA) + (total_horas - float(horas_cobradas))
+        horas_extras = float(self.horas_extra) + (total_horas - float(horas_cobradas))
         dados.append([
             Paragraph("Horas Extras (TOTAL)", self.estilos['normal']),
             f"{horas_extras:.2f}".replace('.', ','),
@@ -275,7 +534,7 @@ class GerarPDF:
         row_total_cobrado = len(dados) - 1
 
         # Linha Internet (valor fixo, sem horas e taxa)
-        internet_valor = INTERNET_VALOR
+        internet_valor = self.internet_valor
         dados.append([
             Paragraph("Internet", self.estilos['normal']),
             "",
@@ -285,7 +544,7 @@ class GerarPDF:
         row_internet = len(dados) - 1
 
         # Linha Transporte (valor fixo, sem horas e taxa)
-        transporte_valor = TRANSPORTE_VALOR
+        transporte_valor = self.transporte_valor
         dados.append([
             Paragraph("Transporte", self.estilos['normal']),
             "",
@@ -320,8 +579,8 @@ class GerarPDF:
         explicacao = (
             "Cálculo das Horas Extras (TOTAL):\n"
             "HORAS_EXTRA + (Horas Mensais (TOTAL) - Horas Totais (Cobradas))\n"
-            f"{fmt2(float(HORAS_EXTRA))} + ({fmt2(total_horas)} - {fmt2(horas_cobradas)})\n"
-            f"{fmt2(float(HORAS_EXTRA))} + {fmt2(diff)}\n"
+            f"{fmt2(float(self.horas_extra))} + ({fmt2(total_horas)} - {fmt2(horas_cobradas)})\n"
+            f"{fmt2(float(self.horas_extra))} + {fmt2(diff)}\n"
             f"{fmt2(horas_extras)}"
         )
 
@@ -361,36 +620,92 @@ class GerarPDF:
         tabela.setStyle(estilo)
         return tabela, total_cobrado_final
 
-    def _estilo_tabela_servicos(self, num_linhas, resultados):
-        estilo = TableStyle([
-            ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
-            ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-            ('ALIGN', (0, 0), (-1, 0), 'CENTER'),
-            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-            ('FONTSIZE', (0, 0), (-1, 0), 10),
-            ('BOTTOMPADDING', (0, 0), (-1, 0), 5),
-            ('BACKGROUND', (0, 1), (-1, -2), colors.white),
-            ('TEXTCOLOR', (0, 1), (-1, -1), colors.black),
-            ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
-            ('GRID', (0, 0), (-1, -1), 0.5, colors.black),
-            ('TOPPADDING', (0, 0), (-1, -1), 3),
-            ('BOTTOMPADDING', (0, 0), (-1, -1), 3),
-            ('ALIGN', (1, 1), (1, -1), 'CENTER'),
-            ('ALIGN', (2, 1), (2, -1), 'CENTER'),
-            ('ALIGN', (3, 1), (3, -1), 'CENTER'),
-            # Removido estilo especial da última linha pois não há linha de totais aqui
-        ])
-        
-        linha = 1
-        for task in resultados:
-            if not resultados[task].empty:
-                estilo.add('BACKGROUND', (0, linha), (-1, linha), colors.lightgrey)
-                estilo.add('FONTSIZE', (0, linha), (-1, linha), 12)
-                estilo.add('FONTNAME', (0, linha), (-1, linha), 'Helvetica-Bold')
-                estilo.add('TEXTCOLOR', (0, linha), (-1, linha), colors.black)
-                linha += len(resultados[task]) + 1
-                
-        return estilo
+    def _estilo_tabela_servicos(self, linhas_task):
+        # `linhas_task` são índices na Table da página (0 = cabeçalho).
+        # Monta a lista de comandos de uma vez: base fixa + destaque das linhas de task
+        comandos = list(ESTILO_BASE_TABELA_SERVICOS)
+        for linha in linhas_task:
+            comandos.extend((
+                ('BACKGROUND', (0, linha), (-1, linha), colors.lightgrey),
+                ('FONTSIZE', (0, linha), (-1, linha), 12),
+                ('FONTNAME', (0, linha), (-1, linha), 'Helvetica-Bold'),
+                ('TEXTCOLOR', (0, linha), (-1, linha), colors.black),
+            ))
+        return TableStyle(comandos)
+
+class TabelaPaginada(Flowable):
+    """
+    Tabela longa montada uma página por vez. Cada página recebe uma Table com o
+    cabeçalho e só as linhas que cabem nela; o restante vira uma nova TabelaPaginada.
+    Dividir uma Table única copia todas as linhas restantes a cada página (custo
+    quadrático); aqui o custo por página depende só das linhas daquela página.
+
+    linhas_destaque: índices (em `linhas`) das linhas de task, ordenados.
+    estilo: função que recebe os índices dessas linhas na Table da página e devolve o TableStyle.
+    """
+
+    JANELA_INICIAL = 64
+
+    def __init__(self, cabecalho, linhas, col_widths, estilo, linhas_destaque=(), inicio=0):
+        super().__init__()
+        self.hAlign = 'CENTER'
+        self.cabecalho = cabecalho
+        self.linhas = linhas
+        self.col_widths = col_widths
+        self.estilo = estilo
+        self.linhas_destaque = list(linhas_destaque)
+        self.inicio = inicio
+        self._tabela = None
+        self._espaco = None
+
+    def _montar(self, fim):
+        primeira = bisect_left(self.linhas_destaque, self.inicio)
+        ultima = bisect_left(self.linhas_destaque, fim)
+        # +1: o cabeçalho ocupa a linha 0 da Table da página
+        destaques = [indice - self.inicio + 1 for indice in self.linhas_destaque[primeira:ultima]]
+        tabela = Table([self.cabecalho] + self.linhas[self.inicio:fim], colWidths=self.col_widths)
+        tabela.setStyle(self.estilo(destaques))
+        return tabela
+
+    def _ajustar(self, largura, altura):
+        if self._espaco == (largura, altura):
+            return
+        # Aumenta a janela de linhas até passar da altura disponível (ou acabar a tabela),
+        # para que a divisão aconteça sempre no fim da página
+        janela = self.JANELA_INICIAL
+        while True:
+            fim = min(len(self.linhas), self.inicio + janela)
+            tabela = self._montar(fim)
+            self.width, self.height = tabela.wrap(largura, altura)
+            if self.height > altura or fim == len(self.linhas):
+                break
+            janela *= 2
+        self._tabela = tabela
+        self._espaco = (largura, altura)
+
+    def wrap(self, availWidth, availHeight):
+        self._ajustar(availWidth, availHeight)
+        return self.width, self.height
+
+    def split(self, availWidth, availHeight):
+        self._ajustar(availWidth, availHeight)
+        partes = self._tabela.split(availWidth, availHeight)
+        if not partes:
+            return []
+        pagina = partes[0]
+        # Linhas de dados que couberam nesta página (sem contar o cabeçalho)
+        consumidas = pagina._nrows - 1
+        if consumidas <= 0:
+            return []
+        restante = TabelaPaginada(
+            self.cabecalho, self.linhas, self.col_widths, self.estilo,
+            self.linhas_destaque, self.inicio + consumidas
+        )
+        return [pagina, restante]
+
+    def draw(self):
+        self._tabela.drawOn(self.canv, 0, 0)
+
 
 class AnnotatedTable(Table):
     """
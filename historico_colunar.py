@@ -0,0 +1,204 @@
+# historico_colunar.py
+"""
+Histórico colunar dos registros normalizados (dependência opcional: pyarrow).
+Cada período processado vira uma partição Arrow (ou Parquet) em
+`<diretório>/perfil=<nome>/conta=<email>/periodo=<início>_<fim>/`, com as colunas de
+`RegistrosNormalizados`: tag, task e descrição ficam como dicionários (os mesmos
+códigos inteiros do processamento). As leituras carregam só as colunas pedidas,
+mapeando o arquivo em memória, sem passar de novo pela API nem pela normalização.
+"""
+
+import os
+from datetime import date, datetime
+from urllib.parse import quote
+from config import HISTORICO_COLUNAR_DIRETORIO, HISTORICO_COLUNAR_FORMATO
+
+FORMATOS_HISTORICO = ("arrow", "parquet")
+# Colunas lidas para refazer a fatura de um período
+COLUNAS_FATURA = ('description', 'duration', 'task_name')
+# Colunas lidas na consulta de horas por task
+COLUNAS_HORAS = ('duration', 'task_name')
+
+
+def _importar_pyarrow():
+    try:
+        import pyarrow
+        import pyarrow.compute  # noqa: F401
+    except ImportError:
+        raise ImportError("O histórico colunar requer o pacote pyarrow (pip install pyarrow).")
+    return pyarrow
+
+
+class HistoricoColunar:
+
+    def __init__(self, diretorio=None, formato=None):
+        self.diretorio = diretorio or HISTORICO_COLUNAR_DIRETORIO
+        self.formato = formato or HISTORICO_COLUNAR_FORMATO
+        if self.formato not in FORMATOS_HISTORICO:
+            raise ValueError(
+                f"Formato do histórico colunar inválido: {self.formato}. Use um de {', '.join(FORMATOS_HISTORICO)}."
+            )
+
+    def gravar(self, perfil, conta, data_inicio, data_fim, registros):
+        """
+        Grava (ou substitui) a partição do período com os `RegistrosNormalizados` informados.
+        A troca é atômica: leitores nunca veem uma partição pela metade.
+        """
+        pa = _importar_pyarrow()
+        import numpy as np
+
+        colunas = {
+            'start_date': pa.array(
+                np.frombuffer(registros.dias, dtype=np.int32) - registros.ORDINAL_EPOCA, type=pa.int32()
+            ).cast(pa.date32()),
+            'duration': pa.array(registros.coluna_duracoes(), type=pa.float64()),
+        }
+        for coluna in registros.COLUNAS_CATEGORICAS:
+            codigos = registros.coluna_codigos(coluna)
+            colunas[coluna] = pa.DictionaryArray.from_arrays(
+                pa.array(codigos, mask=codigos < 0, type=pa.int32()),
+                pa.array([str(valor) for valor in registros.categorias[coluna]], type=pa.string()),
+            )
+        tabela = pa.table({coluna: colunas[coluna] for coluna in registros.COLUNAS}).replace_schema_metadata({
+            'data_inicio': data_inicio,
+            'data_fim': data_fim,
+            'gravado_em': datetime.now().isoformat(timespec='seconds'),
+        })
+
+        arquivo = self._arquivo(perfil, conta, data_inicio, data_fim)
+        os.makedirs(os.path.dirname(arquivo), mode=0o700, exist_ok=True)
+        temporario = f"{arquivo}.{os.getpid()}.tmp"
+        try:
+            if self.formato == "arrow":
+                # Sem compressão: a leitura usa os buffers do arquivo mapeado, sem cópia
+                with pa.OSFile(temporario, 'wb') as destino, pa.ipc.new_file(destino, tabela.schema) as escritor:
+                    escritor.write_table(tabela)
+            else:
+                import pyarrow.parquet as pq
+                pq.write_table(tabela, temporario)
+            os.replace(temporario, arquivo)
+        finally:
+            if os.path.exists(temporario):
+                os.remove(temporario)
+        return arquivo
+
+    def ler(self, perfil, conta, data_inicio, data_fim, colunas=COLUNAS_FATURA):
+        """
+        `RegistrosNormalizados` do período com apenas as colunas pedidas (None: todas),
+        ou None se o período não está no histórico.
+        """
+        from processar_dados import RegistrosNormalizados
+
+        tabela = self._ler_tabela(self._arquivo(perfil, conta, data_inicio, data_fim), colunas)
+        if tabela is None:
+            return None
+        pa = _importar_pyarrow()
+        import numpy as np
+
+        dados = {'codigos': {}, 'categorias': {}}
+        for coluna in tabela.column_names:
+            valores = tabela.column(coluna).combine_chunks()
+            if coluna == 'start_date':
+                dias = valores.cast(pa.int32()).to_numpy(zero_copy_only=False)
+                dados['dias'] = (dias + RegistrosNormalizados.ORDINAL_EPOCA).astype(np.int32)
+            elif coluna == 'duration':
+                dados['duracoes'] = valores.to_numpy(zero_copy_only=False)
+            elif coluna in RegistrosNormalizados.COLUNAS_CATEGORICAS:
+                if not pa.types.is_dictionary(valores.type):
+                    valores = valores.dictionary_encode()
+                codigos = pa.compute.fill_null(valores.indices.cast(pa.int32()), -1)
+                dados['codigos'][coluna] = codigos.to_numpy(zero_copy_only=False)
+                dados['categorias'][coluna] = valores.dictionary.to_pylist()
+        return RegistrosNormalizados.de_colunas(**dados)
+
+    def periodos(self, perfil, conta):
+        """Períodos gravados do perfil e da conta, como (data_inicio, data_fim) 'dd/mm/YYYY', em ordem."""
+        diretorio_conta = self._diretorio_conta(perfil, conta)
+        try:
+            nomes = os.listdir(diretorio_conta)
+        except FileNotFoundError:
+            return []
+
+        periodos = []
+        for nome in nomes:
+            if not nome.startswith("periodo=") or not os.path.exists(
+                os.path.join(diretorio_conta, nome, f"registros.{self.formato}")
+            ):
+                continue
+            inicio, _, fim = nome[len("periodo="):].partition("_")
+            try:
+                periodos.append((date.fromisoformat(inicio), date.fromisoformat(fim)))
+            except ValueError:
+                continue
+        return [(inicio.strftime("%d/%m/%Y"), fim.strftime("%d/%m/%Y")) for inicio, fim in sorted(periodos)]
+
+    def horas_por_task(self, perfil, conta, data_inicio=None, data_fim=None):
+        """
+        Horas por task em cada período gravado entre data_inicio e data_fim ('dd/mm/YYYY';
+        None: sem limite), lendo só task e duração de cada partição. Devolve um DataFrame
+        com data_inicio, data_fim, task e horas, com os mesmos nomes de task da fatura.
+        """
+        import numpy as np
+        import pandas as pd
+
+        limite_inicio = datetime.strptime(data_inicio, "%d/%m/%Y") if data_inicio else None
+        limite_fim = datetime.strptime(data_fim, "%d/%m/%Y") if data_fim else None
+
+        linhas = []
+        for inicio, fim in self.periodos(perfil, conta):
+            if limite_inicio and datetime.strptime(inicio, "%d/%m/%Y") < limite_inicio:
+                continue
+            if limite_fim and datetime.strptime(fim, "%d/%m/%Y") > limite_fim:
+                continue
+            registros = self.ler(perfil, conta, inicio, fim, colunas=COLUNAS_HORAS)
+            if registros is None or not len(registros):
+                continue
+
+            # Soma por código de task (o código -1, task ausente, vai para a posição 0)
+            posicoes = registros.coluna_codigos('task_name') + 1
+            tamanho = len(registros.categorias['task_name']) + 1
+            somas = np.bincount(posicoes, weights=registros.coluna_duracoes(), minlength=tamanho)
+            usados = np.bincount(posicoes, minlength=tamanho) > 0
+            nomes = np.array(['Sem task'] + [
+                (task.strip() if isinstance(task, str) else '') or 'Sem task'
+                for task in registros.categorias['task_name']
+            ], dtype=object)
+            por_task = pd.Series(somas[usados], index=nomes[usados]).groupby(level=0, sort=True).sum()
+            linhas += [(inicio, fim, task, horas) for task, horas in por_task.items()]
+
+        return pd.DataFrame(linhas, columns=['data_inicio', 'data_fim', 'task', 'horas'])
+
+    def remover(self, perfil, conta, data_inicio, data_fim):
+        arquivo = self._arquivo(perfil, conta, data_inicio, data_fim)
+        if os.path.exists(arquivo):
+            os.remove(arquivo)
+
+    def _ler_tabela(self, arquivo, colunas):
+        pa = _importar_pyarrow()
+        colunas = list(colunas) if colunas else None
+        try:
+            if self.formato == "arrow":
+                # As colunas não pedidas nunca são tocadas: só as páginas usadas do arquivo são lidas
+                tabela = pa.ipc.open_file(pa.memory_map(arquivo, 'r')).read_all()
+                return tabela.select(colunas) if colunas else tabela
+            import pyarrow.parquet as pq
+            return pq.read_table(arquivo, columns=colunas, memory_map=True)
+        except FileNotFoundError:
+            return None
+
+    def _arquivo(self, perfil, conta, data_inicio, data_fim):
+        inicio = datetime.strptime(data_inicio, "%d/%m/%Y").date().isoformat()
+        fim = datetime.strptime(data_fim, "%d/%m/%Y").date().isoformat()
+        return os.path.join(
+            self._diretorio_conta(perfil, conta), f"periodo={inicio}_{fim}", f"registros.{self.formato}"
+        )
+
+    def _diretorio_conta(self, perfil, conta):
+        # Perfis com o mesmo login faturam registros diferentes (tags, contratos): cada um tem sua partição
+        return os.path.join(
+            self.diretorio, f"perfil={self._nome_particao(perfil)}", f"conta={self._nome_particao(conta)}"
+        )
+
+    @staticmethod
+    def _nome_particao(valor):
+        return quote(valor or "padrao", safe="@.+-_")
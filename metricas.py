@@ -0,0 +1,170 @@
+# metricas.py
+"""
+Instrumentação opcional da geração de faturas: tempo de cada etapa (login,
+requisições à API, decodificação do JSON, processamento e PDF) e contadores
+(registros, bytes baixados, tamanho do PDF), gravados em JSON lines ou no
+formato textfile do Prometheus. Desligada, usa um coletor que não faz nada.
+"""
+
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+from datetime import datetime
+from config import METRICAS_FORMATO, METRICAS_ARQUIVO
+
+FORMATOS_METRICAS = ("jsonl", "prometheus")
+ARQUIVOS_PADRAO = {"jsonl": "metricas.jsonl", "prometheus": "gerador_fatura.prom"}
+PREFIXO_PROMETHEUS = "gerador_fatura"
+
+
+def criar_metricas(formato=None, arquivo=None):
+    """Coletor do formato informado (ou de METRICAS_FORMATO); sem formato, o coletor vazio."""
+    formato = METRICAS_FORMATO if formato is None else formato
+    if not formato:
+        return METRICAS_DESLIGADAS
+    return Metricas(formato, arquivo)
+
+
+def exportar_metricas(metricas):
+    """Grava a execução do coletor e informa o arquivo; uma falha ao gravar só é informada."""
+    try:
+        arquivo = metricas.exportar()
+    except OSError as e:
+        print(f"Não foi possível gravar as métricas: {e}")
+        return None
+    if arquivo:
+        print(f"Métricas gravadas em {arquivo}")
+    return arquivo
+
+
+class Metricas:
+    """
+    Acumula, por execução, o tempo e a quantidade de execuções de cada etapa e os
+    contadores. Pode ser compartilhada entre threads.
+    """
+
+    habilitada = True
+
+    def __init__(self, formato, arquivo=None):
+        if formato not in FORMATOS_METRICAS:
+            raise ValueError(f"Formato de métricas inválido: {formato}. Use um de {', '.join(FORMATOS_METRICAS)}.")
+        self.formato = formato
+        self.arquivo = arquivo or METRICAS_ARQUIVO or ARQUIVOS_PADRAO[formato]
+        self._trava = threading.Lock()
+        self.reiniciar()
+
+    def reiniciar(self, **rotulos):
+        """Começa uma nova execução, identificada pelos rótulos (perfil, período...)."""
+        with self._trava:
+            self.rotulos = {chave: str(valor) for chave, valor in rotulos.items()}
+            self.etapas = {}
+            self.contadores = {}
+
+    @contextmanager
+    def etapa(self, nome):
+        inicio = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.registrar_etapa(nome, time.perf_counter() - inicio)
+
+    def registrar_etapa(self, nome, segundos):
+        with self._trava:
+            acumulado = self.etapas.setdefault(nome, [0.0, 0])
+            acumulado[0] += segundos
+            acumulado[1] += 1
+
+    def segundos(self, *nomes):
+        with self._trava:
+            return sum(self.etapas[nome][0] for nome in nomes if nome in self.etapas)
+
+    def incrementar(self, nome, valor=1):
+        with self._trava:
+            self.contadores[nome] = self.contadores.get(nome, 0) + valor
+
+    def exportar(self):
+        with self._trava:
+            execucao = {
+                'data': datetime.now().isoformat(timespec='seconds'),
+                'rotulos': dict(self.rotulos),
+                'etapas': {
+                    nome: {'segundos': round(segundos, 6), 'execucoes': execucoes}
+                    for nome, (segundos, execucoes) in self.etapas.items()
+                },
+                'contadores': dict(self.contadores),
+            }
+
+        diretorio = os.path.dirname(os.path.abspath(self.arquivo))
+        os.makedirs(diretorio, exist_ok=True)
+        if self.formato == "jsonl":
+            # Uma linha por execução, acumulando o histórico
+            with open(self.arquivo, 'a', encoding='utf-8') as arquivo:
+                arquivo.write(json.dumps(execucao, ensure_ascii=False) + "\n")
+        else:
+            # O coletor textfile lê o arquivo a qualquer momento: grava em um temporário e troca
+            temporario = f"{self.arquivo}.{os.getpid()}.tmp"
+            with open(temporario, 'w', encoding='utf-8') as arquivo:
+                arquivo.write(self._formatar_prometheus(execucao))
+            os.replace(temporario, self.arquivo)
+        return self.arquivo
+
+    @staticmethod
+    def _formatar_prometheus(execucao):
+        def rotulos(**extras):
+            todos = {**execucao['rotulos'], **extras}
+            if not todos:
+                return ""
+            pares = ",".join(
+                '%s="%s"' % (chave, valor.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n'))
+                for chave, valor in sorted(todos.items())
+            )
+            return "{%s}" % pares
+
+        linhas = [
+            f"# HELP {PREFIXO_PROMETHEUS}_etapa_segundos Tempo gasto em cada etapa da última geração de fatura.",
+            f"# TYPE {PREFIXO_PROMETHEUS}_etapa_segundos gauge",
+        ]
+        for nome, medicao in sorted(execucao['etapas'].items()):
+            linhas.append(f"{PREFIXO_PROMETHEUS}_etapa_segundos{rotulos(etapa=nome)} {medicao['segundos']}")
+        linhas += [
+            f"# HELP {PREFIXO_PROMETHEUS}_etapa_execucoes Vezes que cada etapa foi executada na última geração.",
+            f"# TYPE {PREFIXO_PROMETHEUS}_etapa_execucoes gauge",
+        ]
+        for nome, medicao in sorted(execucao['etapas'].items()):
+            linhas.append(f"{PREFIXO_PROMETHEUS}_etapa_execucoes{rotulos(etapa=nome)} {medicao['execucoes']}")
+        for nome, valor in sorted(execucao['contadores'].items()):
+            linhas.append(f"# TYPE {PREFIXO_PROMETHEUS}_{nome} gauge")
+            linhas.append(f"{PREFIXO_PROMETHEUS}_{nome}{rotulos()} {valor}")
+        linhas.append(f"# TYPE {PREFIXO_PROMETHEUS}_ultima_execucao_timestamp_segundos gauge")
+        linhas.append(f"{PREFIXO_PROMETHEUS}_ultima_execucao_timestamp_segundos{rotulos()} {int(time.time())}")
+        return "\n".join(linhas) + "\n"
+
+
+class MetricasDesligadas:
+    """Coletor usado quando as métricas estão desligadas: todas as operações são vazias."""
+
+    habilitada = False
+    _CONTEXTO_VAZIO = nullcontext()
+
+    def reiniciar(self, **rotulos):
+        pass
+
+    def etapa(self, nome):
+        return self._CONTEXTO_VAZIO
+
+    def registrar_etapa(self, nome, segundos):
+        pass
+
+    def segundos(self, *nomes):
+        return 0.0
+
+    def incrementar(self, nome, valor=1):
+        pass
+
+    def exportar(self):
+        return None
+
+
+METRICAS_DESLIGADAS = MetricasDesligadas()
@@ -0,0 +1,154 @@
+# perfis.py
+"""
+Perfis de faturamento (emissor, cliente, taxa, credenciais e parâmetros do mês).
+Permite faturar vários contratos em uma execução a partir de um arquivo JSON (ou TOML).
+"""
+
+import json
+import os
+from config import (
+    LOGIN_CREDENTIALS,
+    INFO_FATURA,
+    NUMERO_FATURA,
+    TAXA_HORA,
+    MES_COMPLETO,
+    TAGS_INTERESSE,
+    HORAS_EXTRA,
+    INTERNET_VALOR,
+    TRANSPORTE_VALOR,
+    WORKING_DAYS_BY_MONTH_NAME,
+    working_hours_by_month,
+)
+
+"""
+Formato do arquivo (chaves ausentes em um perfil vêm de "padrao" e, depois, do .env):
+
+{
+    "padrao": {"razao_social": "Minha Empresa LTDA", "cnpj": "...", "taxa_hora": 60.0},
+    "perfis": [
+        {
+            "nome": "cliente-a",
+            "email": "eu@exemplo.com",
+            "password_env": "SENHA_CLIENTE_A",
+            "cliente_nome": "Cliente A LTDA",
+            "cliente_cnpj": "...",
+            "cliente_endereco": "...",
+            "numero_fatura": 12,
+            "taxa_hora": 80.0,
+            "tags_interesse": ["development", "meeting"],
+            "horas_extra": 0.0,
+            "dias_uteis": {"JANUARY": 20}
+        }
+    ]
+}
+
+A senha pode vir de "password" ou, preferencialmente, do nome de uma variável de
+ambiente em "password_env", para não guardar segredos no arquivo de perfis.
+"""
+
+
+def perfil_padrao():
+    """Perfil único montado a partir do .env (comportamento de uma execução simples)."""
+    return {
+        'nome': 'padrao',
+        'credenciais': dict(LOGIN_CREDENTIALS),
+        'info_fatura': dict(INFO_FATURA),
+        'numero_fatura': NUMERO_FATURA,
+        'taxa_hora': TAXA_HORA,
+        'mes_completo': MES_COMPLETO,
+        'tags_interesse': list(TAGS_INTERESSE),
+        'horas_extra': HORAS_EXTRA,
+        'internet_valor': INTERNET_VALOR,
+        'transporte_valor': TRANSPORTE_VALOR,
+        'horas_por_mes': working_hours_by_month(WORKING_DAYS_BY_MONTH_NAME),
+    }
+
+
+def carregar_perfis(caminho):
+    conteudo = _ler_arquivo(caminho)
+
+    if isinstance(conteudo, list):
+        padrao, perfis = {}, conteudo
+    elif isinstance(conteudo, dict):
+        padrao, perfis = conteudo.get('padrao') or {}, conteudo.get('perfis')
+    else:
+        perfis = None
+
+    if not isinstance(perfis, list) or not perfis:
+        raise ValueError(f"Arquivo de perfis sem a lista 'perfis': {caminho}")
+
+    resultado = []
+    nomes = set()
+    for indice, dados in enumerate(perfis, start=1):
+        if not isinstance(dados, dict):
+            raise ValueError(f"Perfil #{indice} inválido em {caminho}: esperado um objeto.")
+        perfil = _montar_perfil({**padrao, **dados}, indice)
+        if perfil['nome'] in nomes:
+            raise ValueError(f"Nome de perfil repetido em {caminho}: {perfil['nome']}")
+        nomes.add(perfil['nome'])
+        resultado.append(perfil)
+
+    return resultado
+
+
+def _ler_arquivo(caminho):
+    try:
+        if caminho.endswith('.toml'):
+            import tomllib  # Python 3.11+
+            with open(caminho, 'rb') as arquivo:
+                return tomllib.load(arquivo)
+        with open(caminho, encoding='utf-8') as arquivo:
+            return json.load(arquivo)
+    except ImportError:
+        raise ValueError("Arquivos de perfis em TOML exigem Python 3.11 ou superior; use JSON.")
+    except (OSError, ValueError) as e:
+        raise ValueError(f"Não foi possível ler o arquivo de perfis {caminho}: {e}")
+
+
+def _montar_perfil(dados, indice):
+    perfil = perfil_padrao()
+    perfil['nome'] = str(dados.get('nome') or f"perfil-{indice}")
+
+    senha = dados.get('password')
+    if dados.get('password_env'):
+        senha = os.getenv(dados['password_env'])
+        if senha is None:
+            raise ValueError(
+                f"Perfil {perfil['nome']}: variável de ambiente {dados['password_env']} não definida."
+            )
+    perfil['credenciais'] = {
+        'email': dados.get('email', perfil['credenciais']['email']),
+        'password': perfil['credenciais']['password'] if senha is None else senha,
+    }
+
+    for campo in perfil['info_fatura']:
+        if campo in dados:
+            perfil['info_fatura'][campo] = dados[campo]
+
+    try:
+        for campo in ('taxa_hora', 'horas_extra', 'internet_valor', 'transporte_valor'):
+            if campo in dados:
+                perfil[campo] = float(dados[campo])
+    except (TypeError, ValueError):
+        raise ValueError(f"Perfil {perfil['nome']}: valor numérico inválido em '{campo}'.")
+
+    if 'numero_fatura' in dados:
+        perfil['numero_fatura'] = str(dados['numero_fatura'])
+    if 'mes_completo' in dados:
+        perfil['mes_completo'] = dados['mes_completo']
+
+    if 'tags_interesse' in dados:
+        tags = dados['tags_interesse']
+        if isinstance(tags, str):
+            tags = tags.split(',')
+        perfil['tags_interesse'] = [str(tag).strip() for tag in tags if str(tag).strip()]
+
+    if 'dias_uteis' in dados:
+        dias = dict(WORKING_DAYS_BY_MONTH_NAME)
+        for mes, quantidade in (dados['dias_uteis'] or {}).items():
+            if mes.upper() not in dias:
+                raise ValueError(f"Perfil {perfil['nome']}: mês desconhecido em 'dias_uteis': {mes}")
+            dias[mes.upper()] = int(quantidade)
+        perfil['horas_por_mes'] = working_hours_by_month(dias)
+
+    return perfil
@@ -4,76 +4,231 @@ Processador de dados para conversão dos dados da API
 para o formato necessário para geração da fatura.
 """
 
-import pandas as pd
-from datetime import datetime
-from config import TAGS_INTERESSE
+import math
+import re
+from array import array
+from datetime import date, datetime
+from itertools import islice
+from config import TAGS_INTERESSE, FILTRAR_POR_TAGS, BACKEND_AGREGACAO, AGREGACAO_LIMIAR_LEVE
+
+# Datas com hora que podem ser lidas pelo prefixo YYYY-MM-DD sem passar por fromisoformat
+REGEX_DATA_ISO = re.compile(
+    r'^\d{4}-\d{2}-\d{2}T([01]\d|2[0-3]):[0-5]\d(:[0-5]\d(\.\d{1,6})?)?(Z|[+-]([01]\d|2[0-3]):[0-5]\d)?$'
+)
+# Formatos aceitos para datas sem hora, na ordem de tentativa
+FORMATOS_DATA = ("%Y-%m-%d", "%d/%m/%Y", "%m/%d/%Y")
+# Backends de agregação: "pandas" (DataFrames), "leve" (dicts, sem pandas) ou "auto"
+BACKENDS_AGREGACAO = ("auto", "pandas", "leve")
 
 
 class ProcessarDados:
     
-    def __init__(self):
-        self.tags_interesse = TAGS_INTERESSE
+    TAMANHO_LOTE = 10000
+    
+    def __init__(self, tags_interesse=None, backend=None, limiar_leve=None):
+        self.tags_interesse = list(TAGS_INTERESSE if tags_interesse is None else tags_interesse)
+        self.filtrar_por_tags = FILTRAR_POR_TAGS
+        self.backend = backend or BACKEND_AGREGACAO
+        if self.backend not in BACKENDS_AGREGACAO:
+            raise ValueError(f"Backend de agregação inválido: {self.backend}. Use um de {', '.join(BACKENDS_AGREGACAO)}.")
+        self.limiar_leve = AGREGACAO_LIMIAR_LEVE if limiar_leve is None else limiar_leve
+        # Contagens da última chamada de processar_dados_api (registros lidos e dentro do período)
+        self.estatisticas = {'registros_lidos': 0, 'registros_no_periodo': 0}
     
     def processar_dados_api(self, dados_api, data_inicio, data_fim):
+        """
+        Normaliza os registros da API e devolve {task: tabela com 'description' e 'duration'},
+        uma tabela por task, ordenada por horas (decrescente).
+
+        No modo "auto", os registros são somados sem pandas à medida que chegam (o import
+        e a montagem de DataFrames custam mais do que o trabalho em faturas pequenas).
+        Se a fatura passar de `limiar_leve` linhas (task e descrição), as linhas já somadas
+        e o restante dos registros seguem pela normalização vetorizada com pandas, sem
+        reler nem acumular os registros recebidos.
+        """
         data_inicio_dt = datetime.strptime(data_inicio, "%d/%m/%Y")
         data_fim_dt = datetime.strptime(data_fim, "%d/%m/%Y")
+        registros = iter(dados_api)
         
-        registros_processados = []
+        if self.backend == "pandas":
+            return self._processar_pandas(registros, data_inicio_dt, data_fim_dt, data_inicio, data_fim)
         
-        for registro in dados_api:
-            dynamic_fields = registro.get('dynamicFields', {})
-            dynamic_associations = registro.get('dynamicAssociations', {})
-            
-            start_date_str = dynamic_fields.get('start_date', '')
-            description = dynamic_fields.get('description', '')
-            duration_str = dynamic_fields.get('duration', '0')
-            tag = dynamic_fields.get('tag', 'development')
-            # Nome da task vem de dynamicAssociations.task
-            task_name = dynamic_associations.get('task', '').strip() if isinstance(dynamic_associations.get('task', ''), str) else ''
+        limite_linhas = self.limiar_leve if self.backend == "auto" else None
+        horas = self._somar_leve(registros, data_inicio_dt, data_fim_dt, limite_linhas)
+        if limite_linhas is not None and len(horas) > limite_linhas:
+            return self._continuar_com_pandas(horas, registros, data_inicio_dt, data_fim_dt, data_inicio, data_fim)
+        return self._resultados_leve(horas, data_inicio, data_fim)
+    
+    def normalizar_registros(self, dados_api, data_inicio, data_fim):
+        """
+        Normaliza os registros da API (sempre com pandas) e devolve as linhas do período,
+        sem agrupar, em `RegistrosNormalizados` (ex.: para gravar no histórico colunar).
+        `agrupar_registros` produz a partir delas o resultado de `processar_dados_api`.
+        """
+        data_inicio_dt = datetime.strptime(data_inicio, "%d/%m/%Y")
+        data_fim_dt = datetime.strptime(data_fim, "%d/%m/%Y")
+        return self._normalizar_registros(iter(dados_api), data_inicio_dt, data_fim_dt)
+    
+    def agrupar_registros(self, registros_processados, data_inicio, data_fim):
+        """{task: tabela com 'description' e 'duration'} a partir de registros já normalizados."""
+        return self._agrupar_por_task(registros_processados, data_inicio, data_fim)
+    
+    def _processar_pandas(self, registros, data_inicio_dt, data_fim_dt, data_inicio, data_fim):
+        registros_processados = self._normalizar_registros(registros, data_inicio_dt, data_fim_dt)
+        return self._agrupar_por_task(registros_processados, data_inicio, data_fim)
+    
+    def _continuar_com_pandas(self, horas, registros, data_inicio_dt, data_fim_dt, data_inicio, data_fim):
+        # As linhas somadas pelo backend leve entram como registros normalizados (uma por
+        # task e descrição); o restante do iterador é normalizado em lotes logo depois delas
+        lidos, no_periodo = self.estatisticas['registros_lidos'], self.estatisticas['registros_no_periodo']
+        registros_processados = RegistrosNormalizados.de_horas(horas, data_inicio_dt)
+        self._normalizar_registros(registros, data_inicio_dt, data_fim_dt, registros_processados)
+        self.estatisticas = {
+            'registros_lidos': lidos + self.estatisticas['registros_lidos'],
+            'registros_no_periodo': no_periodo + self.estatisticas['registros_no_periodo'],
+        }
+        return self._agrupar_por_task(registros_processados, data_inicio, data_fim)
+    
+    def _normalizar_registros(self, registros, data_inicio_dt, data_fim_dt, registros_processados=None):
+        # Consome os registros em lotes (o iterável pode ser o gerador paginado da API),
+        # normaliza cada lote de forma vetorizada e acumula só as linhas do período em
+        # colunas compactas; o DataFrame do lote é descartado em seguida
+        if registros_processados is None:
+            registros_processados = RegistrosNormalizados()
+        ja_acumulados = len(registros_processados)
+        lidos = 0
+        while True:
+            lote = list(islice(registros, self.TAMANHO_LOTE))
+            if not lote:
+                break
+            lidos += len(lote)
+            lote_df = self._normalizar_lote(lote, data_inicio_dt, data_fim_dt)
+            if not lote_df.empty:
+                registros_processados.adicionar_lote(lote_df)
+        self.estatisticas = {
+            'registros_lidos': lidos, 'registros_no_periodo': len(registros_processados) - ja_acumulados
+        }
+        return registros_processados
+    
+    def _normalizar_lote(self, lote, data_inicio_dt, data_fim_dt):
+        import pandas as pd
+        
+        campos = [registro.get('dynamicFields') or {} for registro in lote]
+        # Nome da task vem de dynamicAssociations.task
+        tasks = [(registro.get('dynamicAssociations') or {}).get('task', '') for registro in lote]
+        
+        df = pd.DataFrame({
+            'start_date': [c.get('start_date', '') for c in campos],
+            'description': [c.get('description', '') for c in campos],
+            'duration': [c.get('duration', '0') for c in campos],
+            'tag': [c.get('tag', 'development') for c in campos],
+            'task_name': self._normalizar_tasks(tasks),
             # ID da task (quando existir) pode aparecer em dynamicFields.task
-            task_id = dynamic_fields.get('task', '')
-            
-            # Se não houver descrição, tenta usar o nome da task; se não houver, usa o id; caso contrário, marca como sem descrição
-            if not description and task_name:
-                description = task_name
-            elif not description and task_id:
-                description = str(task_id)
-            elif not description and not task:
-                description = 'Sem descrição'
-            
-            if start_date_str:
-                try:
-                    start_date_dt = self._processar_data(start_date_str)
-                    
-                    if not (data_inicio_dt <= start_date_dt <= data_fim_dt):
-                        continue
-                        
-                except Exception as e:
-                    print(f"Erro ao processar data {start_date_str}: {e}")
-                    continue
-            else:
-                continue
-            
+            'task_id': [c.get('task', '') for c in campos],
+        }, dtype=object)
+        
+        # Repete aqui o filtro de tags enviado à API, caso ela não o tenha aplicado
+        if self.filtrar_por_tags:
+            df = df[df['tag'].isin(self.tags_interesse)]
+        
+        # Se não houver descrição, tenta usar o nome da task; se não houver, usa o id; caso contrário, marca como sem descrição
+        sem_descricao = ~df['description'].astype(bool)
+        usa_task = sem_descricao & df['task_name'].astype(bool)
+        usa_id = sem_descricao & ~usa_task & df['task_id'].astype(bool)
+        df.loc[usa_task, 'description'] = df.loc[usa_task, 'task_name']
+        df.loc[usa_id, 'description'] = df.loc[usa_id, 'task_id'].map(str)
+        df.loc[sem_descricao & ~usa_task & ~usa_id, 'description'] = 'Sem descrição'
+        
+        df = df[df['start_date'].astype(bool)]
+        if df.empty:
+            return df
+        
+        datas = self._processar_datas(df['start_date'])
+        df = df.assign(start_date=datas)
+        df = df[(datas >= data_inicio_dt) & (datas <= data_fim_dt)]
+        
+        df = df.assign(duration=self._processar_duracoes(df['duration']))
+        
+        return df[['start_date', 'description', 'duration', 'tag', 'task_name']]
+    
+    @staticmethod
+    def _normalizar_tasks(tasks):
+        import numpy as np
+        import pandas as pd
+        
+        codigos, unicos = pd.factorize(np.asarray(tasks, dtype=object), use_na_sentinel=False)
+        nomes = np.array([t.strip() if isinstance(t, str) else '' for t in unicos], dtype=object)
+        return nomes[codigos]
+    
+    def _processar_datas(self, valores):
+        import pandas as pd
+        
+        # Um mês tem poucas datas distintas: converte cada valor único uma vez só
+        codigos, unicos = pd.factorize(valores.to_numpy(dtype=object), use_na_sentinel=False)
+        unicos = pd.Series(unicos, dtype=object)
+        
+        eh_texto = unicos.map(lambda v: isinstance(v, str)).astype(bool)
+        texto = unicos.where(eh_texto, '').astype(str)
+        datas = pd.Series(pd.NaT, index=unicos.index, dtype='datetime64[ns]')
+        
+        # ISO 8601 completo: a data é o prefixo YYYY-MM-DD, como em datetime.fromisoformat(...).date()
+        iso = eh_texto & texto.str.match(REGEX_DATA_ISO)
+        if iso.any():
+            datas[iso] = pd.to_datetime(texto[iso].str[:10], format='%Y-%m-%d', errors='coerce')
+        
+        sem_hora = eh_texto & ~texto.str.contains('T', regex=False)
+        prefixo = texto.str[:10]
+        for formato in FORMATOS_DATA:
+            pendentes = sem_hora & datas.isna()
+            if not pendentes.any():
+                break
+            datas[pendentes] = pd.to_datetime(prefixo[pendentes], format=formato, errors='coerce')
+        
+        datas = pd.Series(datas.to_numpy()[codigos], index=valores.index)
+        
+        # O que não foi reconhecido segue o caminho linha a linha (e suas mensagens de erro).
+        # É feito sobre o valor original, pois o factorize não distingue None de NaN.
+        for indice in datas.index[datas.isna()]:
+            valor = valores[indice]
             try:
-                duration = float(str(duration_str).replace(',', '.'))
-            except (ValueError, TypeError):
-                duration = 0.0
-            
-            registros_processados.append({
-                'start_date': start_date_dt,
-                'description': description,
-                'duration': duration,
-                'tag': tag,
-                'task_name': task_name
-            })
+                datas[indice] = self._processar_data(valor)
+            except Exception as e:
+                print(f"Erro ao processar data {valor}: {e}")
         
-        return self._agrupar_por_task(registros_processados, data_inicio, data_fim)
+        return datas
+    
+    def _processar_duracoes(self, valores):
+        import numpy as np
+        import pandas as pd
+        
+        codigos, unicos = pd.factorize(valores.to_numpy(dtype=object), use_na_sentinel=False)
+        unicos = pd.Series(unicos, dtype=object)
+        duracoes = pd.to_numeric(
+            unicos.map(str).str.replace(',', '.', regex=False), errors='coerce'
+        ).astype(float)
+        duracoes = pd.Series(duracoes.to_numpy()[codigos], index=valores.index)
+        
+        # Valores que a conversão vetorizada não entende (ex.: espaços, '1_000', None) seguem a regra
+        # original; 'nan' e 'inf' também, e contam como 0 hora
+        invalidas = ~np.isfinite(duracoes)
+        if invalidas.any():
+            duracoes[invalidas] = [self._processar_duracao(v) for v in valores[invalidas]]
+        
+        return duracoes
+    
+    @staticmethod
+    def _processar_duracao(duration_str):
+        try:
+            duracao = float(str(duration_str).replace(',', '.'))
+        except (ValueError, TypeError):
+            return 0.0
+        return duracao if math.isfinite(duracao) else 0.0
     
     def _processar_data(self, start_date_str):
         if 'T' in start_date_str:
             start_date = datetime.fromisoformat(start_date_str.replace('Z', '+00:00')).date()
         else:
-            for fmt in ["%Y-%m-%d", "%d/%m/%Y", "%m/%d/%Y"]:
+            for fmt in FORMATOS_DATA:
                 try:
                     start_date = datetime.strptime(start_date_str[:10], fmt).date()
                     break
@@ -85,32 +240,316 @@ class ProcessarDados:
         return datetime.combine(start_date, datetime.min.time())
     
     def _agrupar_por_task(self, registros_processados, data_inicio, data_fim):
-        df = pd.DataFrame(registros_processados)
+        import numpy as np
+        import pandas as pd
+        
+        if not isinstance(registros_processados, RegistrosNormalizados):
+            registros_processados = RegistrosNormalizados.de_tabela(registros_processados)
 
-        if df.empty:
+        if not len(registros_processados):
             print(f"Nenhum registro encontrado entre {data_inicio} e {data_fim}")
             return {}
 
-        # Considera todos os registros independentemente da tag; inclui também os sem nome de task
-        df = df.copy()
-        df['task_group'] = df['task_name'].fillna('').astype(str).str.strip()
-        df.loc[df['task_group'] == '', 'task_group'] = 'Sem task'
+        # Considera todos os registros independentemente da tag; inclui também os sem nome de task.
+        # Nome do grupo e ordem de tasks e descrições são calculados sobre os valores distintos;
+        # as linhas só carregam códigos inteiros.
+        # A posição extra no fim recebe o código -1 (task ausente), que vai para 'Sem task'
+        nomes_tasks = pd.Series(registros_processados.categorias['task_name'] + [None], dtype=object)
+        grupos = nomes_tasks.fillna('').astype(str).str.strip()
+        grupos = grupos.mask(grupos == '', 'Sem task').to_numpy(dtype=object)
+        codigos_grupo, nomes_grupo = pd.factorize(grupos, sort=True)
+        # A mesma ordem de `groupby(sort=True)`; descrições ausentes ficam de fora, como no groupby
+        codigos_descricao, descricoes = pd.factorize(
+            np.asarray(registros_processados.categorias['description'] + [None], dtype=object), sort=True
+        )
+        
+        linha_task = registros_processados.coluna_codigos('task_name')
+        linha_descricao = codigos_descricao[registros_processados.coluna_codigos('description')]
+        duracoes = registros_processados.coluna_duracoes()
+        presentes = linha_descricao >= 0
+        if not presentes.all():
+            linha_task, linha_descricao, duracoes = (
+                linha_task[presentes], linha_descricao[presentes], duracoes[presentes]
+            )
+        
+        # Uma única passada: soma por (grupo, descrição) em uma chave inteira, ordena por
+        # grupo e por horas (decrescente) e fatia o resultado em um DataFrame por task
+        chave = codigos_grupo[linha_task].astype(np.int64) * max(len(descricoes), 1) + linha_descricao
+        somas = pd.Series(duracoes).groupby(chave, sort=True).sum()
+        chaves = somas.index.to_numpy()
+        grupo, descricao = np.divmod(chaves, max(len(descricoes), 1))
+        horas = somas.to_numpy()
+        ordem = np.lexsort((-horas, grupo))
+        grupo, descricao, horas = grupo[ordem], descricao[ordem], horas[ordem]
+
+        limites = np.concatenate(([0], np.flatnonzero(grupo[1:] != grupo[:-1]) + 1, [len(grupo)]))
 
         resultados = {}
+        for inicio, fim in zip(limites[:-1], limites[1:]):
+            resultados[nomes_grupo[grupo[inicio]]] = pd.DataFrame({
+                'description': descricoes[descricao[inicio:fim]],
+                'duration': horas[inicio:fim],
+            })
 
-        # Para cada task, agrega as descrições e soma a duração
-        for task in sorted(df['task_group'].unique()):
-            task_df = df[df['task_group'] == task]
-            if task_df.empty:
+        return resultados
+    
+    def _somar_leve(self, registros, data_inicio_dt, data_fim_dt, limite_linhas=None):
+        """
+        Mesmas regras de `_normalizar_lote`, registro a registro, somando as horas em um
+        dict por (task, descrição). Com `limite_linhas`, para de ler logo depois de a soma
+        passar desse número de chaves; o iterador fica no registro seguinte.
+        """
+        horas = {}
+        datas = {}
+        duracoes = {}
+        # Nomes de task já normalizados, por texto recebido (há poucas tasks distintas por mês)
+        tasks = {}
+        lidos = no_periodo = 0
+        
+        for lidos, registro in enumerate(registros, 1):
+            campos = registro.get('dynamicFields') or {}
+            
+            # Repete aqui o filtro de tags enviado à API, caso ela não o tenha aplicado
+            if self.filtrar_por_tags and campos.get('tag', 'development') not in self.tags_interesse:
                 continue
+            
+            start_date = campos.get('start_date', '')
+            if not start_date:
+                continue
+            # Datas e durações se repetem muito em um mês: converte cada texto uma vez só
+            data = datas.get(start_date) if isinstance(start_date, str) else None
+            if data is None:
+                try:
+                    data = self._processar_data(start_date)
+                except Exception as e:
+                    print(f"Erro ao processar data {start_date}: {e}")
+                    continue
+                if isinstance(start_date, str):
+                    datas[start_date] = data
+            if not (data_inicio_dt <= data <= data_fim_dt):
+                continue
+            
+            task = (registro.get('dynamicAssociations') or {}).get('task', '')
+            if isinstance(task, str):
+                task_name = tasks.get(task)
+                if task_name is None:
+                    task_name = tasks[task] = task.strip()
+            else:
+                task_name = ''
+            
+            # Se não houver descrição, usa o nome da task, depois o id da task e, por fim, 'Sem descrição'
+            description = campos.get('description', '')
+            if not description:
+                task_id = campos.get('task', '')
+                description = task_name or (str(task_id) if task_id else 'Sem descrição')
+            
+            duration = campos.get('duration', '0')
+            if isinstance(duration, str):
+                if duration not in duracoes:
+                    duracoes[duration] = self._processar_duracao(duration)
+                duracao = duracoes[duration]
+            else:
+                duracao = self._processar_duracao(duration)
+            
+            chave = (task_name or 'Sem task', description)
+            no_periodo += 1
+            if chave in horas:
+                horas[chave] += duracao
+                continue
+            horas[chave] = duracao
+            if limite_linhas is not None and len(horas) > limite_linhas:
+                break
+        
+        self.estatisticas = {'registros_lidos': lidos, 'registros_no_periodo': no_periodo}
+        return horas
+    
+    def _resultados_leve(self, horas, data_inicio, data_fim):
+        """{task: TabelaTask} a partir das horas por (task, descrição), na ordem de `_agrupar_por_task`."""
+        if not horas:
+            print(f"Nenhum registro encontrado entre {data_inicio} e {data_fim}")
+            return {}
+        
+        # Ordena por task e descrição e, de forma estável, por horas (decrescente) dentro da task.
+        # Descrições que não são texto (ex.: números) vêm antes dos textos, como no factorize do pandas
+        agrupado = sorted(horas.items(), key=lambda item: (item[0][0], isinstance(item[0][1], str), item[0][1]))
+        agrupado.sort(key=lambda item: -item[1])
+        agrupado.sort(key=lambda item: item[0][0])
+        
+        resultados = {}
+        for (task, description), duracao in agrupado:
+            resultados.setdefault(task, ([], []))
+            resultados[task][0].append(description)
+            resultados[task][1].append(duracao)
+        
+        return {
+            task: TabelaTask({'description': descricoes, 'duration': duracoes})
+            for task, (descricoes, duracoes) in resultados.items()
+        }
 
-            agrupado = (
-                task_df.groupby('description')['duration']
-                .sum()
-                .reset_index()
-                .sort_values('duration', ascending=False)
-            )
 
-            resultados[task] = agrupado
+class RegistrosNormalizados:
+    """
+    Registros do período já normalizados, em colunas compactas: dias como ordinais
+    (`date.toordinal`) em array('i'), durações em array('d') e tag, task e descrição
+    como códigos inteiros (array('i')) sobre a lista de valores distintos de cada coluna,
+    como um Categorical do pandas; valores ausentes têm código -1.
+    Substitui a lista de DataFrames por lote + `pd.concat`, que mantinha duas cópias
+    de todas as linhas no pico de memória.
+    """
+    
+    __slots__ = ('dias', 'duracoes', 'codigos', 'categorias', '_indices')
+    
+    COLUNAS = ('start_date', 'description', 'duration', 'tag', 'task_name')
+    COLUNAS_CATEGORICAS = ('description', 'tag', 'task_name')
+    ORDINAL_EPOCA = date(1970, 1, 1).toordinal()
+    
+    def __init__(self):
+        self.dias = array('i')
+        self.duracoes = array('d')
+        self.codigos = {coluna: array('i') for coluna in self.COLUNAS_CATEGORICAS}
+        self.categorias = {coluna: [] for coluna in self.COLUNAS_CATEGORICAS}
+        self._indices = {coluna: {} for coluna in self.COLUNAS_CATEGORICAS}
+    
+    @classmethod
+    def de_tabela(cls, registros_processados):
+        """Converte registros normalizados avulsos (DataFrame ou lista de dicts com as COLUNAS)."""
+        import pandas as pd
+        
+        registros = cls()
+        df = pd.DataFrame(registros_processados)
+        if not df.empty:
+            registros.adicionar_lote(df)
+        return registros
+    
+    @classmethod
+    def de_horas(cls, horas, dia):
+        """
+        Uma linha por (task, descrição) de `horas` (as somas do backend leve), no dia
+        informado e sem tag, para continuar o agrupamento com pandas.
+        """
+        import pandas as pd
+        
+        registros = cls()
+        if horas:
+            chaves = list(horas)
+            registros.adicionar_lote(pd.DataFrame({
+                'start_date': pd.Series([dia] * len(chaves), dtype='datetime64[ns]'),
+                'description': pd.Series([descricao for _, descricao in chaves], dtype=object),
+                'duration': pd.Series(list(horas.values()), dtype=float),
+                'tag': pd.Series([None] * len(chaves), dtype=object),
+                'task_name': pd.Series([task for task, _ in chaves], dtype=object),
+            }))
+        return registros
+    
+    @classmethod
+    def de_colunas(cls, dias=None, duracoes=None, codigos=None, categorias=None):
+        """
+        Monta os registros a partir de colunas já codificadas (ex.: lidas do histórico
+        colunar): dias ordinais int32, durações float64 e, por coluna categórica, códigos
+        int32 (-1 para ausente) e a lista de valores. Colunas não informadas ficam vazias.
+        """
+        registros = cls()
+        if dias is not None:
+            registros.dias.frombytes(memoryview(dias).cast('B'))
+        if duracoes is not None:
+            registros.duracoes.frombytes(memoryview(duracoes).cast('B'))
+        for coluna, valores in (categorias or {}).items():
+            registros.codigos[coluna].frombytes(memoryview(codigos[coluna]).cast('B'))
+            registros.categorias[coluna] = list(valores)
+            registros._indices[coluna] = {valor: codigo for codigo, valor in enumerate(valores)}
+        return registros
+    
+    def __len__(self):
+        return len(self.duracoes)
+    
+    def _codificar(self, coluna, valores):
+        import numpy as np
+        import pandas as pd
+        
+        # Só os valores distintos do lote passam pelo dicionário da coluna
+        codigos, unicos = pd.factorize(valores.to_numpy(dtype=object))
+        indices = self._indices[coluna]
+        categorias = self.categorias[coluna]
+        mapa = np.empty(len(unicos) + 1, dtype=np.int32)
+        mapa[-1] = -1
+        for posicao, valor in enumerate(unicos):
+            codigo = indices.get(valor)
+            if codigo is None:
+                codigo = indices[valor] = len(categorias)
+                categorias.append(valor)
+            mapa[posicao] = codigo
+        self.codigos[coluna].frombytes(mapa[codigos].tobytes())
+    
+    def adicionar_lote(self, lote_df):
+        """Acrescenta as linhas de um lote normalizado por `ProcessarDados._normalizar_lote`."""
+        import numpy as np
+        
+        dias = lote_df['start_date'].to_numpy(dtype='datetime64[D]').astype(np.int64) + self.ORDINAL_EPOCA
+        self.dias.frombytes(dias.astype(np.int32).tobytes())
+        self.duracoes.frombytes(lote_df['duration'].to_numpy(dtype=np.float64).tobytes())
+        for coluna in self.COLUNAS_CATEGORICAS:
+            self._codificar(coluna, lote_df[coluna])
+    
+    def coluna_codigos(self, coluna):
+        """Códigos da coluna como ndarray int32 (visão sobre o array, sem cópia)."""
+        import numpy as np
+        return np.frombuffer(self.codigos[coluna], dtype=np.int32)
+    
+    def coluna_duracoes(self):
+        import numpy as np
+        return np.frombuffer(self.duracoes, dtype=np.float64)
+    
+    def para_dataframe(self, colunas=None):
+        """
+        DataFrame com as colunas pedidas (todas, por padrão); tag, task e descrição vêm
+        como Categorical. As visões sobre os arrays impedem acrescentar lotes depois disso.
+        """
+        import numpy as np
+        import pandas as pd
+        
+        dados = {}
+        for coluna in colunas or self.COLUNAS:
+            if coluna == 'start_date':
+                dias = np.frombuffer(self.dias, dtype=np.int32).astype(np.int64) - self.ORDINAL_EPOCA
+                dados[coluna] = dias.astype('datetime64[D]').astype('datetime64[ns]')
+            elif coluna == 'duration':
+                dados[coluna] = self.coluna_duracoes()
+            else:
+                categorias = pd.Index(self.categorias[coluna], dtype=object)
+                dados[coluna] = pd.Categorical.from_codes(self.coluna_codigos(coluna), categories=categorias)
+        return pd.DataFrame(dados, copy=False)
 
-        return resultados
+
+class ColunaTask(list):
+    """Coluna de TabelaTask: uma lista com o mínimo da API de pandas.Series usada na fatura."""
+    
+    def sum(self):
+        return sum(self)
+    
+    def tolist(self):
+        return list(self)
+
+
+class TabelaTask:
+    """
+    Resultado de uma task no backend leve. Expõe a parte da interface de DataFrame
+    consumida pelo GerarPDF (`empty`, `len`, colunas com `sum()`/`tolist()` e `iterrows()`).
+    """
+    
+    def __init__(self, colunas):
+        self._colunas = {nome: ColunaTask(valores) for nome, valores in colunas.items()}
+        self.columns = list(self._colunas)
+    
+    def __getitem__(self, coluna):
+        return self._colunas[coluna]
+    
+    def __len__(self):
+        return len(next(iter(self._colunas.values()), []))
+    
+    @property
+    def empty(self):
+        return len(self) == 0
+    
+    def iterrows(self):
+        for indice, valores in enumerate(zip(*self._colunas.values())):
+            yield indice, dict(zip(self.columns, valores))
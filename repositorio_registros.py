@@ -0,0 +1,104 @@
+# repositorio_registros.py
+"""
+Repositório local de registros de timesheet para sincronização incremental.
+Guarda os registros por período (chave: id) e a marca d'água de `updatedAt` de cada período.
+"""
+
+import json
+import os
+import sqlite3
+import time
+from itertools import islice
+from cache_respostas import ConexaoSQLite
+from config import REPOSITORIO_REGISTROS_ARQUIVO
+from decodificacao_json import carregar_json
+
+
+class RepositorioRegistros:
+
+    TAMANHO_LOTE = 500
+
+    def __init__(self, arquivo=None):
+        self.arquivo = arquivo or REPOSITORIO_REGISTROS_ARQUIVO
+        self._inicializado = False
+
+    def marca_dagua(self, periodo):
+        with self._conectar() as conn:
+            linha = conn.execute(
+                "SELECT updated_at FROM marcas WHERE periodo = ?", (periodo,)
+            ).fetchone()
+        return linha[0] if linha else None
+
+    def mesclar(self, periodo, registros):
+        """
+        Insere ou atualiza (por id) os registros recebidos e avança a marca d'água
+        do período. A marca só é gravada ao final, junto com o último lote.
+        """
+        quantidade = 0
+        maior_updated_at = self.marca_dagua(periodo)
+        registros = iter(registros)
+
+        with self._conectar() as conn:
+            while True:
+                lote = list(islice(registros, self.TAMANHO_LOTE))
+                if not lote:
+                    break
+
+                linhas = []
+                for registro in lote:
+                    updated_at = registro.get('updatedAt')
+                    if updated_at and (maior_updated_at is None or updated_at > maior_updated_at):
+                        maior_updated_at = updated_at
+                    linhas.append((
+                        periodo,
+                        str(registro.get('id')),
+                        updated_at,
+                        json.dumps(registro, ensure_ascii=False, separators=(',', ':')),
+                    ))
+
+                conn.executemany(
+                    "INSERT OR REPLACE INTO registros (periodo, id, updated_at, dados) VALUES (?, ?, ?, ?)",
+                    linhas,
+                )
+                quantidade += len(linhas)
+
+            if maior_updated_at is not None:
+                conn.execute(
+                    "INSERT OR REPLACE INTO marcas (periodo, updated_at, sincronizado_em) VALUES (?, ?, ?)",
+                    (periodo, maior_updated_at, time.time()),
+                )
+
+        return quantidade
+
+    def registros(self, periodo):
+        """Itera os registros do período direto do cursor, sem carregá-los todos."""
+        with self._conectar() as conn:
+            for (dados,) in conn.execute(
+                "SELECT dados FROM registros WHERE periodo = ? ORDER BY updated_at DESC", (periodo,)
+            ):
+                yield carregar_json(dados)
+
+    def limpar_periodo(self, periodo):
+        with self._conectar() as conn:
+            conn.execute("DELETE FROM registros WHERE periodo = ?", (periodo,))
+            conn.execute("DELETE FROM marcas WHERE periodo = ?", (periodo,))
+
+    def _conectar(self):
+        if not self._inicializado:
+            diretorio = os.path.dirname(self.arquivo)
+            if diretorio:
+                os.makedirs(diretorio, mode=0o700, exist_ok=True)
+        conn = sqlite3.connect(self.arquivo, timeout=30)
+        if not self._inicializado:
+            with conn:
+                conn.execute(
+                    "CREATE TABLE IF NOT EXISTS registros ("
+                    "periodo TEXT NOT NULL, id TEXT NOT NULL, updated_at TEXT, dados TEXT NOT NULL, "
+                    "PRIMARY KEY (periodo, id))"
+                )
+                conn.execute(
+                    "CREATE TABLE IF NOT EXISTS marcas ("
+                    "periodo TEXT PRIMARY KEY, updated_at TEXT NOT NULL, sincronizado_em REAL NOT NULL)"
+                )
+            self._inicializado = True
+        return ConexaoSQLite(conn)
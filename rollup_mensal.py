@@ -0,0 +1,110 @@
+# rollup_mensal.py
+"""
+Agregados mensais por task (rollup) para os relatórios de resumo.
+Cada período processado grava, em SQLite, as horas de cada task no mês e os
+parâmetros de cobrança daquele mês (limite de horas, taxa e adicionais). Um
+resumo de vários anos lê só esses agregados, sem voltar aos registros.
+Os agregados são separados por perfil e conta: perfis que usam o mesmo login
+têm taxas, limites e adicionais próprios.
+"""
+
+import os
+import sqlite3
+import time
+from cache_respostas import ConexaoSQLite
+from config import ROLLUP_MENSAL_ARQUIVO
+
+
+class RollupMensal:
+
+    def __init__(self, arquivo=None):
+        self.arquivo = arquivo or ROLLUP_MENSAL_ARQUIVO
+        self._inicializado = False
+
+    def registrar_mes(self, perfil, conta, mes, resultados, horas_mes, taxa_hora, adicionais):
+        """
+        Substitui o agregado do mês ('MM/YYYY') do perfil e da conta pelas horas por task de
+        `resultados` ({task: tabela com 'duration'}, como em processar_dados_api).
+        Um mês sem registros também é gravado, com zero horas.
+        """
+        chave = self._chave_mes(mes)
+        horas_por_task = [
+            (perfil, conta, chave, task, float(dados['duration'].sum()))
+            for task, dados in (resultados or {}).items()
+            if len(dados)
+        ]
+        with self._conectar() as conn:
+            conn.execute(
+                "DELETE FROM horas_task WHERE perfil = ? AND conta = ? AND mes = ?", (perfil, conta, chave)
+            )
+            conn.executemany(
+                "INSERT INTO horas_task (perfil, conta, mes, task, horas) VALUES (?, ?, ?, ?, ?)", horas_por_task
+            )
+            conn.execute(
+                "INSERT OR REPLACE INTO meses (perfil, conta, mes, horas_mes, taxa_hora, adicionais, atualizado_em) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (perfil, conta, chave, float(horas_mes), float(taxa_hora), float(adicionais), time.time()),
+            )
+
+    def meses(self, perfil, conta, mes_de, mes_ate):
+        """
+        {'MM/YYYY': {'horas_mes', 'taxa_hora', 'adicionais', 'tasks': {task: horas}}}
+        dos meses do perfil e da conta registrados entre mes_de e mes_ate (inclusive).
+        """
+        inicio, fim = self._chave_mes(mes_de), self._chave_mes(mes_ate)
+        with self._conectar() as conn:
+            meses = {
+                mes: {'horas_mes': horas_mes, 'taxa_hora': taxa_hora, 'adicionais': adicionais, 'tasks': {}}
+                for mes, horas_mes, taxa_hora, adicionais in conn.execute(
+                    "SELECT mes, horas_mes, taxa_hora, adicionais FROM meses "
+                    "WHERE perfil = ? AND conta = ? AND mes BETWEEN ? AND ? ORDER BY mes",
+                    (perfil, conta, inicio, fim),
+                )
+            }
+            for mes, task, horas in conn.execute(
+                "SELECT mes, task, horas FROM horas_task "
+                "WHERE perfil = ? AND conta = ? AND mes BETWEEN ? AND ? ORDER BY mes, task",
+                (perfil, conta, inicio, fim),
+            ):
+                if mes in meses:
+                    meses[mes]['tasks'][task] = horas
+        return {self._mes_da_chave(chave): dados for chave, dados in meses.items()}
+
+    def remover_mes(self, perfil, conta, mes):
+        chave = self._chave_mes(mes)
+        with self._conectar() as conn:
+            conn.execute("DELETE FROM horas_task WHERE perfil = ? AND conta = ? AND mes = ?", (perfil, conta, chave))
+            conn.execute("DELETE FROM meses WHERE perfil = ? AND conta = ? AND mes = ?", (perfil, conta, chave))
+
+    @staticmethod
+    def _chave_mes(mes):
+        # 'YYYY-MM' ordena cronologicamente no SQLite
+        numero, ano = mes.split('/')
+        return f"{int(ano):04d}-{int(numero):02d}"
+
+    @staticmethod
+    def _mes_da_chave(chave):
+        ano, numero = chave.split('-')
+        return f"{numero}/{ano}"
+
+    def _conectar(self):
+        if not self._inicializado:
+            diretorio = os.path.dirname(self.arquivo)
+            if diretorio:
+                os.makedirs(diretorio, mode=0o700, exist_ok=True)
+        conn = sqlite3.connect(self.arquivo, timeout=30)
+        if not self._inicializado:
+            with conn:
+                conn.execute(
+                    "CREATE TABLE IF NOT EXISTS meses ("
+                    "perfil TEXT NOT NULL, conta TEXT NOT NULL, mes TEXT NOT NULL, horas_mes REAL NOT NULL, "
+                    "taxa_hora REAL NOT NULL, adicionais REAL NOT NULL, atualizado_em REAL NOT NULL, "
+                    "PRIMARY KEY (perfil, conta, mes))"
+                )
+                conn.execute(
+                    "CREATE TABLE IF NOT EXISTS horas_task ("
+                    "perfil TEXT NOT NULL, conta TEXT NOT NULL, mes TEXT NOT NULL, task TEXT NOT NULL, "
+                    "horas REAL NOT NULL, PRIMARY KEY (perfil, conta, mes, task))"
+                )
+            self._inicializado = True
+        return ConexaoSQLite(conn)
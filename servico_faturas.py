@@ -0,0 +1,323 @@
+# servico_faturas.py
+"""
+Modo serviço (--servico): um processo de longa duração que atende pedidos de fatura
+(perfil + mês) por HTTP local ou por um socket Unix. Os imports (pandas, reportlab),
+a sessão HTTP, o token de cada perfil e os estilos do PDF ficam carregados entre os
+pedidos; cada fatura custa só a busca, o processamento e o PDF.
+
+Os pedidos entram em uma fila limitada e são atendidos por threads (busca e
+processamento); os PDFs são gerados em um pool de processos já aquecido.
+
+API (JSON):
+    POST /faturas        {"mes": "MM/YYYY", "perfil": "nome", "numero": 7, "atualizar": false, "aguardar": false}
+                         -> 202 com o pedido (ou 200 com o resultado, se "aguardar")
+    GET  /faturas/<id>   -> estado do pedido: na_fila, executando, concluida, sem_dados ou erro
+    GET  /saude          -> pedidos na fila, threads e processos
+"""
+
+import itertools
+import json
+import os
+import queue
+import socketserver
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from cliente_api import criar_sessao
+from gerador_fatura import GeradorFatura
+from gerador_lote import aquecer_gerador_pdf, renderizar_fatura
+from perfis import perfil_padrao
+from utils_data import UtilsData
+from config import SERVICO_ENDERECO, SERVICO_TRABALHADORES, SERVICO_FILA_MAXIMA
+
+# Pedidos concluídos mantidos para consulta em GET /faturas/<id>
+PEDIDOS_GUARDADOS = 1000
+# Tamanho máximo do corpo de um POST
+TAMANHO_MAXIMO_CORPO = 64 * 1024
+
+
+class FilaCheia(Exception):
+    pass
+
+
+class ServicoFaturas:
+
+    def __init__(self, perfis=None, trabalhadores=None, tamanho_fila=None, processos=None):
+        self.perfis = perfis or [perfil_padrao()]
+        self.trabalhadores = trabalhadores or SERVICO_TRABALHADORES
+        self.tamanho_fila = tamanho_fila or SERVICO_FILA_MAXIMA
+        # Sem processos (0), o PDF é gerado na própria thread do pedido
+        self.processos = (os.cpu_count() or 1) if processos is None else processos
+        self.utils_data = UtilsData()
+
+        # Um GeradorFatura (ClienteAPI, token, ProcessarDados e GerarPDF) por perfil, sobre a mesma sessão
+        self.sessao = criar_sessao(max(self.trabalhadores, 1))
+        self.geradores = {
+            perfil['nome']: GeradorFatura(perfil=perfil, sessao=self.sessao) for perfil in self.perfis
+        }
+        self.fila = queue.Queue(maxsize=self.tamanho_fila)
+        self.pedidos = OrderedDict()
+        self._trava = threading.Lock()
+        self._ids = itertools.count(1)
+        self._threads = []
+        self._executor_pdf = None
+        self._trava_executor = threading.Lock()
+
+    def iniciar(self):
+        """Aquece imports, estilos, pool de processos e tokens e inicia as threads de trabalho."""
+        inicio = time.perf_counter()
+        for nome, gerador in self.geradores.items():
+            gerador._carregar_dependencias()
+            try:
+                gerador.cliente_api.garantir_login()
+            except Exception as e:
+                # O login é refeito sob demanda no primeiro pedido do perfil
+                print(f"Login do perfil {nome} adiado: {e}")
+
+        if self.processos > 0:
+            self._executor_pdf = self._criar_executor_pdf()
+        else:
+            for gerador in self.geradores.values():
+                aquecer_gerador_pdf(gerador.parametros_pdf())
+
+        for indice in range(self.trabalhadores):
+            thread = threading.Thread(target=self._trabalhar, name=f"fatura-{indice + 1}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+        print(f"Serviço pronto em {time.perf_counter() - inicio:.2f} s: {len(self.geradores)} perfil(is), "
+              f"{self.trabalhadores} thread(s), {self.processos} processo(s) de PDF, fila de {self.tamanho_fila}")
+
+    def _criar_executor_pdf(self):
+        executor = ProcessPoolExecutor(max_workers=self.processos)
+        parametros = [gerador.parametros_pdf() for gerador in self.geradores.values()]
+        aquecimentos = [
+            executor.submit(aquecer_gerador_pdf, parametros[indice % len(parametros)])
+            for indice in range(self.processos)
+        ]
+        for aquecimento in aquecimentos:
+            aquecimento.result()
+        return executor
+
+    def parar(self):
+        for _ in self._threads:
+            self.fila.put(None)
+        for thread in self._threads:
+            thread.join()
+        self._threads = []
+        if self._executor_pdf is not None:
+            self._executor_pdf.shutdown()
+            self._executor_pdf = None
+        self.sessao.close()
+
+    def enviar(self, mes, perfil=None, numero=None, atualizar_cache=False):
+        """
+        Coloca um pedido na fila e devolve-o. Um pedido igual ainda na fila ou em execução
+        é devolvido em vez de duplicado; um pedido com `atualizar_cache` só reaproveita outro
+        que também ignore o cache. Com a fila cheia, levanta FilaCheia.
+        """
+        perfil = perfil or self.perfis[0]['nome']
+        if perfil not in self.geradores:
+            raise ValueError(f"Perfil desconhecido: {perfil}. Use um de {', '.join(self.geradores)}.")
+        self.utils_data.calcular_periodo(mes)
+        if numero is not None:
+            numero = int(numero)
+
+        with self._trava:
+            for pedido in reversed(self.pedidos.values()):
+                if (pedido['perfil'], pedido['mes'], pedido['numero']) == (perfil, mes, numero) \
+                        and (pedido['atualizar'] or not atualizar_cache) \
+                        and pedido['status'] in ("na_fila", "executando"):
+                    return pedido
+            pedido = {
+                'id': str(next(self._ids)), 'perfil': perfil, 'mes': mes, 'numero': numero,
+                'atualizar': bool(atualizar_cache), 'status': "na_fila", 'arquivo': None, 'total': None,
+                'erro': None, 'segundos': None, 'concluido': threading.Event(),
+            }
+            try:
+                self.fila.put_nowait(pedido)
+            except queue.Full:
+                raise FilaCheia(f"Fila cheia ({self.tamanho_fila} pedidos); tente novamente mais tarde.")
+            self.pedidos[pedido['id']] = pedido
+            while len(self.pedidos) > PEDIDOS_GUARDADOS:
+                self.pedidos.popitem(last=False)
+        return pedido
+
+    def consultar(self, identificador):
+        with self._trava:
+            return self.pedidos.get(identificador)
+
+    def _trabalhar(self):
+        while True:
+            pedido = self.fila.get()
+            if pedido is None:
+                return
+            inicio = time.perf_counter()
+            pedido['status'] = "executando"
+            try:
+                self._gerar(pedido)
+            except Exception as e:
+                print(f"Erro no pedido {pedido['id']} ({pedido['perfil']} {pedido['mes']}): {e}")
+                pedido['status'], pedido['erro'] = "erro", str(e)
+            finally:
+                pedido['segundos'] = round(time.perf_counter() - inicio, 3)
+                pedido['concluido'].set()
+
+    def _gerar(self, pedido):
+        gerador = self.geradores[pedido['perfil']]
+        data_inicio, data_fim = self.utils_data.calcular_periodo(pedido['mes'])
+        resultados = gerador.buscar_resultados(data_inicio, data_fim, pedido['atualizar'])
+        if not resultados:
+            pedido['status'] = "sem_dados"
+            return
+
+        numero = gerador.perfil['numero_fatura'] if pedido['numero'] is None else pedido['numero']
+        info_fatura = gerador._preparar_info_fatura(data_inicio, data_fim, numero)
+        nome_arquivo = self.utils_data.formatar_nome_arquivo(numero, data_inicio, data_fim)
+        if len(self.perfis) > 1:
+            # Com vários perfis, separa os PDFs por perfil, como no lote
+            diretorio, arquivo = os.path.split(nome_arquivo)
+            diretorio = os.path.join(diretorio, pedido['perfil'])
+            os.makedirs(diretorio, exist_ok=True)
+            nome_arquivo = os.path.join(diretorio, arquivo)
+
+        argumentos = (gerador.parametros_pdf(), resultados, info_fatura, nome_arquivo, gerador.perfil['taxa_hora'])
+        if self._executor_pdf is not None:
+            pedido['arquivo'], pedido['total'] = self._renderizar_no_pool(argumentos)
+        else:
+            pedido['arquivo'], pedido['total'] = renderizar_fatura(*argumentos)
+        pedido['status'] = "concluida"
+
+    def _renderizar_no_pool(self, argumentos):
+        for tentativa in range(1, 3):
+            executor = self._executor_pdf
+            try:
+                return executor.submit(renderizar_fatura, *argumentos).result()
+            except BrokenProcessPool as e:
+                # Um processo do pool morreu (falta de memória, sinal...) e o pool inteiro
+                # passa a recusar tarefas: recria-o uma vez e repete o PDF do pedido
+                with self._trava_executor:
+                    if self._executor_pdf is executor:
+                        print(f"Pool de processos de PDF interrompido ({e}). Recriando...")
+                        executor.shutdown(wait=False)
+                        self._executor_pdf = self._criar_executor_pdf()
+                if tentativa == 2:
+                    raise
+
+    @staticmethod
+    def descrever(pedido):
+        return {chave: valor for chave, valor in pedido.items() if chave != 'concluido'}
+
+
+class _ManipuladorServico(BaseHTTPRequestHandler):
+    servico = None
+
+    def do_GET(self):
+        if self.path == "/saude":
+            self._responder(200, {
+                'status': "ok", 'fila': self.servico.fila.qsize(),
+                'trabalhadores': self.servico.trabalhadores, 'processos': self.servico.processos,
+            })
+            return
+        if self.path.startswith("/faturas/"):
+            pedido = self.servico.consultar(self.path[len("/faturas/"):])
+            if pedido is None:
+                self._responder(404, {'erro': "Pedido não encontrado."})
+                return
+            self._responder(200, self.servico.descrever(pedido))
+            return
+        self._responder(404, {'erro': "Caminho não encontrado."})
+
+    def do_POST(self):
+        if self.path != "/faturas":
+            self._responder(404, {'erro': "Caminho não encontrado."})
+            return
+        try:
+            tamanho = int(self.headers.get('Content-Length') or 0)
+            if tamanho > TAMANHO_MAXIMO_CORPO:
+                raise ValueError("Corpo do pedido muito grande.")
+            corpo = json.loads(self.rfile.read(tamanho) or b"{}")
+            if not isinstance(corpo, dict) or not corpo.get('mes'):
+                raise ValueError('Informe o mês da fatura: {"mes": "MM/YYYY"}.')
+            pedido = self.servico.enviar(
+                corpo['mes'], corpo.get('perfil'), corpo.get('numero'), corpo.get('atualizar', False)
+            )
+        except FilaCheia as e:
+            self._responder(503, {'erro': str(e)})
+            return
+        except (ValueError, TypeError) as e:
+            self._responder(400, {'erro': str(e)})
+            return
+
+        if corpo.get('aguardar'):
+            pedido['concluido'].wait()
+            self._responder(200, self.servico.descrever(pedido))
+        else:
+            self._responder(202, self.servico.descrever(pedido))
+
+    def _responder(self, status, conteudo):
+        corpo = json.dumps(conteudo, ensure_ascii=False).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(corpo)))
+        self.end_headers()
+        self.wfile.write(corpo)
+
+    def address_string(self):
+        # Em sockets Unix, client_address é uma string vazia
+        return self.client_address[0] if isinstance(self.client_address, tuple) else "unix"
+
+    def log_message(self, formato, *args):
+        print(f"[servico] {self.address_string()} {formato % args}")
+
+
+class _ServidorUnix(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+    def server_bind(self):
+        socketserver.UnixStreamServer.server_bind(self)
+        # Só o próprio usuário fala com o serviço
+        os.chmod(self.server_address, 0o600)
+        self.server_name, self.server_port = "localhost", 0
+
+
+def criar_servidor(servico, endereco=None):
+    """
+    Servidor HTTP do serviço em "host:porta" ou "unix:/caminho/do.sock"
+    (padrão: SERVICO_ENDERECO).
+    """
+    endereco = endereco or SERVICO_ENDERECO
+    manipulador = type("ManipuladorServico", (_ManipuladorServico,), {'servico': servico})
+    if endereco.startswith("unix:"):
+        caminho = endereco[len("unix:"):]
+        if os.path.exists(caminho):
+            os.remove(caminho)
+        return _ServidorUnix(caminho, manipulador)
+
+    host, _, porta = endereco.rpartition(":")
+    try:
+        porta = int(porta)
+    except ValueError:
+        raise ValueError(f"Endereço do serviço inválido: {endereco}. Use host:porta ou unix:/caminho.")
+    return ThreadingHTTPServer((host or "127.0.0.1", porta), manipulador)
+
+
+def executar_servico(perfis=None, endereco=None, processos=None, trabalhadores=None, tamanho_fila=None):
+    """Inicia o serviço e atende pedidos até Ctrl+C."""
+    servico = ServicoFaturas(perfis, trabalhadores=trabalhadores, tamanho_fila=tamanho_fila, processos=processos)
+    servico.iniciar()
+    servidor = criar_servidor(servico, endereco)
+    local = servidor.server_address
+    local = f"unix:{local}" if isinstance(local, str) else f"http://{local[0]}:{local[1]}"
+    print(f"Atendendo pedidos de fatura em {local} (Ctrl+C para encerrar)")
+    try:
+        servidor.serve_forever()
+    except KeyboardInterrupt:
+        print("\nEncerrando o serviço...")
+    finally:
+        servidor.server_close()
+        if isinstance(servidor.server_address, str) and os.path.exists(servidor.server_address):
+            os.remove(servidor.server_address)
+        servico.parar()
@@ -27,12 +27,29 @@ class UtilsData:
         except ValueError:
             raise ValueError("Formato de mês inválido. Use MM/YYYY (ex: 05/2025)")
     
+    @staticmethod
+    def listar_meses(mes_de, mes_ate):
+        try:
+            mes_inicial, ano_inicial = (int(parte) for parte in mes_de.split('/'))
+            mes_final, ano_final = (int(parte) for parte in mes_ate.split('/'))
+        except ValueError:
+            raise ValueError("Formato de mês inválido. Use MM/YYYY (ex: 05/2025)")
+
+        if not (1 <= mes_inicial <= 12 and 1 <= mes_final <= 12):
+            raise ValueError("Formato de mês inválido. Use MM/YYYY (ex: 05/2025)")
+
+        indice_inicial = ano_inicial * 12 + mes_inicial - 1
+        indice_final = ano_final * 12 + mes_final - 1
+        if indice_final < indice_inicial:
+            raise ValueError(f"O mês final ({mes_ate}) é anterior ao inicial ({mes_de}).")
+
+        return [f"{indice % 12 + 1:02d}/{indice // 12}" for indice in range(indice_inicial, indice_final + 1)]
+    
     @staticmethod
     def formatar_nome_arquivo(numero_fatura, data_inicio, data_fim):
         # Criar diretório faturas se não existir
         faturas_dir = "faturas"
-        if not os.path.exists(faturas_dir):
-            os.makedirs(faturas_dir)
+        os.makedirs(faturas_dir, exist_ok=True)
         
         data_inicio_fmt = data_inicio.replace('/', '-')
         data_fim_fmt = data_fim.replace('/', '-')
@@ -40,6 +57,15 @@ class UtilsData:
         
         return os.path.join(faturas_dir, filename)
     
+    @staticmethod
+    def formatar_nome_resumo(agrupamento, mes_de, mes_ate):
+        faturas_dir = "faturas"
+        os.makedirs(faturas_dir, exist_ok=True)
+        
+        filename = f"Resumo_{agrupamento}_{mes_de.replace('/', '-')}_a_{mes_ate.replace('/', '-')}.pdf"
+        
+        return os.path.join(faturas_dir, filename)
+    
     @staticmethod
     def validar_formato_data(data_str, formato="%d/%m/%Y"):
         try: